@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import TaskPrediction, TaskRecommendation, WeeklySummary, AnomalyDetection
+from .models import (
+    TaskPrediction, TaskRecommendation, WeeklySummary, AnomalyDetection,
+    ScheduleSimulation,
+)
 
 
 @admin.register(TaskPrediction)
@@ -29,3 +32,10 @@ class AnomalyDetectionAdmin(admin.ModelAdmin):
     list_display = ['title', 'anomaly_type', 'severity', 'user', 'is_resolved', 'detected_at']
     list_filter = ['anomaly_type', 'severity', 'is_resolved']
     search_fields = ['title', 'description']
+
+
+@admin.register(ScheduleSimulation)
+class ScheduleSimulationAdmin(admin.ModelAdmin):
+    list_display = ['project', 'status', 'trials', 'created_at', 'completed_at']
+    list_filter = ['status']
+    search_fields = ['project__title']
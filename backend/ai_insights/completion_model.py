@@ -0,0 +1,193 @@
+"""
+Per-company completion-time models.
+
+A gradient-boosted regressor is fitted on each company's completed tasks to
+predict days from start to completion, from the task's priority, estimate
+and dependency count and its assignee's track record. Fitted models are
+written to ``COMPLETION_MODEL_DIR/company_<id>/<version>.joblib`` and read
+back lazily, at most once per worker process, through an LRU of recent
+company models. Companies with too few completed tasks have no model and
+ProgressPredictor falls back to its heuristic.
+"""
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error
+
+
+FEATURES = ['priority_rank', 'estimated_hours', 'assignee_tasks', 'assignee_mean_log_days', 'dependency_count']
+
+PRIORITY_RANK = {'low': 0, 'medium': 1, 'high': 2, 'urgent': 3}
+
+# Share of the most recently completed tasks held out to score the model
+HOLDOUT_FRACTION = 0.2
+
+# Artifact format; bump when FEATURES or the stored keys change
+ARTIFACT_FORMAT = 1
+
+
+def company_dir(company_id):
+    return Path(settings.COMPLETION_MODEL_DIR) / f'company_{company_id}'
+
+
+def latest_artifact_path(company_id):
+    """Path of the newest artifact for the company, or None."""
+    try:
+        names = sorted(name for name in os.listdir(company_dir(company_id)) if name.endswith('.joblib'))
+    except FileNotFoundError:
+        return None
+    return company_dir(company_id) / names[-1] if names else None
+
+
+@lru_cache(maxsize=settings.COMPLETION_MODEL_CACHE_SIZE)
+def _load_artifact(path):
+    artifact = joblib.load(path)
+    return artifact if artifact.get('format') == ARTIFACT_FORMAT else None
+
+
+def load_company_model(company_id):
+    """The company's latest fitted model, or None if it has not been trained."""
+    path = latest_artifact_path(company_id)
+    # Paths are versioned, so a retrained model is picked up on the next call
+    return _load_artifact(str(path)) if path else None
+
+
+def load_training_frame(company_id):
+    """Completed tasks of the company with their duration in days, one row per task."""
+    from tasks.models import Task
+
+    rows = Task.objects.filter(
+        project__company_id=company_id,
+        status='completed',
+        started_at__isnull=False,
+        completed_at__isnull=False,
+    ).annotate(
+        dependency_count=Count('predecessor_dependencies')
+    ).values_list(
+        'assigned_to_id', 'priority', 'estimated_hours', 'dependency_count', 'started_at', 'completed_at'
+    )
+    frame = pd.DataFrame.from_records(
+        list(rows),
+        columns=['assigned_to_id', 'priority', 'estimated_hours', 'dependency_count', 'started_at', 'completed_at'],
+    )
+    if frame.empty:
+        return frame
+    frame['days'] = (frame['completed_at'] - frame['started_at']).dt.total_seconds() / 86400
+    return frame[frame['days'] >= 0].sort_values('completed_at').reset_index(drop=True)
+
+
+def build_features(frame, assignee_stats):
+    """Model inputs for ``frame`` given ``{user_id: (completed_count, mean_log_days)}``."""
+    stats = frame['assigned_to_id'].map(assignee_stats)
+    return pd.DataFrame({
+        'priority_rank': frame['priority'].map(PRIORITY_RANK).fillna(1).astype(float),
+        'estimated_hours': frame['estimated_hours'].astype(float),
+        'assignee_tasks': stats.map(lambda s: s[0] if isinstance(s, tuple) else 0).astype(float),
+        'assignee_mean_log_days': stats.map(lambda s: s[1] if isinstance(s, tuple) else np.nan).astype(float),
+        'dependency_count': frame['dependency_count'].astype(float),
+    }, columns=FEATURES)
+
+
+def _training_features(frame, target):
+    """
+    Features for the training rows, with each row's assignee record taken
+    over the assignee's other tasks so a task never sees its own duration.
+    """
+    grouped = target.groupby(frame['assigned_to_id'].fillna(-1))
+    count = grouped.transform('count') - 1
+    total = grouped.transform('sum') - target
+    mean = (total / count).where(count > 0)
+    features = build_features(frame, {})
+    features['assignee_tasks'] = count.where(frame['assigned_to_id'].notna(), 0).astype(float)
+    features['assignee_mean_log_days'] = mean.where(frame['assigned_to_id'].notna())
+    return features
+
+
+def _fit(features, target):
+    model = HistGradientBoostingRegressor(max_iter=200, learning_rate=0.1, min_samples_leaf=10, random_state=0)
+    return model.fit(features, target)
+
+
+def train_company_model(company_id, force=False):
+    """
+    Fit and save a new model for the company.
+
+    Skipped (returns None) when the company has fewer than
+    ``COMPLETION_MODEL_MIN_SAMPLES`` usable completed tasks, or, unless
+    ``force``, when no task has been completed since the current model was
+    trained. Returns the saved artifact otherwise.
+    """
+    from tasks.models import Task
+
+    current = load_company_model(company_id)
+    if current and not force:
+        last_completed = Task.objects.filter(
+            project__company_id=company_id, status='completed'
+        ).aggregate(last=Max('completed_at'))['last']
+        if not last_completed or last_completed <= current['trained_through']:
+            return None
+
+    frame = load_training_frame(company_id)
+    if len(frame) < settings.COMPLETION_MODEL_MIN_SAMPLES:
+        return None
+
+    target = np.log1p(frame['days'])
+    features = _training_features(frame, target)
+
+    # Score on the most recent tasks with a model fitted on the older ones
+    split = int(len(frame) * (1 - HOLDOUT_FRACTION))
+    holdout_model = _fit(features.iloc[:split], target.iloc[:split])
+    predicted = np.expm1(holdout_model.predict(features.iloc[split:]))
+    mae_days = float(mean_absolute_error(frame['days'].iloc[split:], predicted))
+    mean_days = float(frame['days'].iloc[split:].mean()) or 1.0
+
+    assignee_target = target.groupby(frame['assigned_to_id'])
+    trained_at = timezone.now()
+    artifact = {
+        'format': ARTIFACT_FORMAT,
+        'version': f'{trained_at:%Y%m%d%H%M%S%f}-{len(frame)}',
+        'company_id': company_id,
+        'trained_at': trained_at,
+        'trained_through': frame['completed_at'].max().to_pydatetime(),
+        'samples': len(frame),
+        'mae_days': mae_days,
+        'confidence': float(np.clip(1 - mae_days / mean_days, 0.3, 0.9)),
+        'assignee_stats': {
+            int(user_id): (int(count), float(mean))
+            for user_id, count, mean in zip(
+                assignee_target.count().index, assignee_target.count(), assignee_target.mean()
+            )
+        },
+        'model': _fit(features, target),
+    }
+    save_artifact(company_id, artifact)
+    return artifact
+
+
+def save_artifact(company_id, artifact):
+    """Write the artifact atomically and prune all but the newest versions."""
+    directory = company_dir(company_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(handle)
+    joblib.dump(artifact, temp_path)
+    os.replace(temp_path, directory / f"{artifact['version']}.joblib")
+
+    versions = sorted(directory.glob('*.joblib'))
+    for old in versions[:-settings.COMPLETION_MODEL_KEEP_VERSIONS]:
+        old.unlink(missing_ok=True)
+
+
+def predict_days(artifact, frame):
+    """Predicted days from start to completion for rows of ``frame``."""
+    features = build_features(frame, artifact['assignee_stats'])
+    return np.maximum(np.expm1(artifact['model'].predict(features)), 0.0)
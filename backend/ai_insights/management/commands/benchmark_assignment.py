@@ -0,0 +1,110 @@
+"""
+Benchmark assignee recommendations at several company sizes.
+
+Seeds a throwaway test database per size with synthetic users, tasks and
+progress updates, then times TaskAssignmentRecommender: the first
+recommendation (which builds the feature matrix) and later ones (which
+reuse it).
+
+Usage:
+    python manage.py benchmark_assignment --sizes 50,500,5000
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+from django.utils import timezone
+
+
+PRIORITIES = ['low', 'medium', 'high', 'urgent']
+STATUSES = ['open', 'in_progress', 'blocked', 'completed', 'completed']
+
+
+class Command(BaseCommand):
+    help = 'Time assignee recommendations for companies of 50/500/5000 users.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='50,500,5000', help='Comma-separated user counts')
+        parser.add_argument('--tasks-per-user', type=int, default=10)
+        parser.add_argument('--recommendations', type=int, default=20, help='Tasks to recommend for per size')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.stdout.write(f"{'users':>7} {'first ms':>10} {'first queries':>14} {'next ms':>9} {'next queries':>13}")
+            for size in sizes:
+                self._benchmark(size, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def _seed(self, size, options):
+        from progress.models import ProgressUpdate
+        from projects.models import Project
+        from tasks.models import Task
+        from users.models import Company, User
+
+        company = Company.objects.create(name=f'Benchmark {size}')
+        User.objects.bulk_create([
+            User(email=f'bench{size}-{i}@example.com', name=f'User {i}', company=company,
+                 role='manager' if i % 10 == 0 else 'employee', password='!')
+            for i in range(size)
+        ], batch_size=1000)
+        users = list(User.objects.filter(company=company))
+        projects = [
+            Project.objects.create(title=f'Project {i}', company=company, created_by=users[0])
+            for i in range(max(1, size // 25))
+        ]
+
+        now = timezone.now()
+        tasks = []
+        for user in users:
+            for _ in range(options['tasks_per_user']):
+                status = random.choice(STATUSES)
+                started = now - timedelta(days=random.randint(1, 120))
+                tasks.append(Task(
+                    title='Benchmark task', project=random.choice(projects), created_by=users[0],
+                    assigned_to=user, priority=random.choice(PRIORITIES), status=status,
+                    started_at=started,
+                    completed_at=started + timedelta(days=random.randint(0, 20)) if status == 'completed' else None,
+                ))
+        Task.objects.bulk_create(tasks, batch_size=1000)
+
+        task_ids = list(Task.objects.filter(project__company=company).values_list('id', flat=True))
+        ProgressUpdate.objects.bulk_create([
+            ProgressUpdate(task_id=random.choice(task_ids), user=random.choice(users),
+                           progress_percentage=random.randint(0, 100), work_done='Benchmark')
+            for _ in range(size * 2)
+        ], batch_size=1000)
+
+        targets = list(Task.objects.filter(project__company=company, status='open')[:options['recommendations']])
+        return company, targets
+
+    def _benchmark(self, size, options):
+        from ai_insights.services import TaskAssignmentRecommender
+
+        company, targets = self._seed(size, options)
+        recommender = TaskAssignmentRecommender(company)
+
+        with CaptureQueriesContext(connection) as first_queries:
+            started = time.perf_counter()
+            recommender.recommend_assignee(targets[0])
+            first_ms = (time.perf_counter() - started) * 1000
+
+        rest = targets[1:] or targets
+        with CaptureQueriesContext(connection) as next_queries:
+            started = time.perf_counter()
+            for task in rest:
+                recommender.recommend_assignee(task)
+            next_ms = (time.perf_counter() - started) * 1000 / len(rest)
+
+        self.stdout.write(
+            f"{size:>7} {first_ms:>10.1f} {len(first_queries.captured_queries):>14} "
+            f"{next_ms:>9.2f} {len(next_queries.captured_queries) / len(rest):>13.1f}"
+        )
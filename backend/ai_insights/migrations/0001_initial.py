@@ -0,0 +1,250 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("projects", "0002_initial"),
+        ("tasks", "0002_initial"),
+        ("users", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnomalyDetection",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "anomaly_type",
+                    models.CharField(
+                        choices=[
+                            ("blocked_pattern", "Recurring Blocks"),
+                            ("productivity_drop", "Productivity Drop"),
+                            ("overtime", "Excessive Overtime"),
+                            ("missed_deadlines", "Pattern of Missed Deadlines"),
+                            ("workload_imbalance", "Workload Imbalance"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "severity",
+                    models.CharField(
+                        choices=[
+                            ("low", "Low"),
+                            ("medium", "Medium"),
+                            ("high", "High"),
+                            ("critical", "Critical"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("description", models.TextField()),
+                ("data_points", models.JSONField(default=list)),
+                ("suggested_actions", models.JSONField(default=list)),
+                ("is_resolved", models.BooleanField(default=False)),
+                ("resolved_at", models.DateTimeField(blank=True, null=True)),
+                ("resolution_notes", models.TextField(blank=True)),
+                ("detected_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomalies",
+                        to="users.company",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomalies",
+                        to="projects.project",
+                    ),
+                ),
+                (
+                    "resolved_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="resolved_anomalies",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomalies",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Anomaly Detection",
+                "verbose_name_plural": "Anomaly Detections",
+                "ordering": ["-detected_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="TaskPrediction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "predicted_completion_date",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                ("confidence_score", models.FloatField(default=0)),
+                ("estimated_hours_remaining", models.FloatField(blank=True, null=True)),
+                ("risk_score", models.FloatField(default=0)),
+                ("risk_factors", models.JSONField(blank=True, default=list)),
+                ("model_version", models.CharField(default="v1", max_length=50)),
+                ("generated_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="predictions",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-generated_at"],
+                "get_latest_by": "generated_at",
+            },
+        ),
+        migrations.CreateModel(
+            name="TaskRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "recommendation_type",
+                    models.CharField(
+                        choices=[
+                            ("assignment", "Task Assignment"),
+                            ("reassignment", "Task Reassignment"),
+                            ("workload", "Workload Balancing"),
+                            ("priority", "Priority Adjustment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("reason", models.TextField()),
+                ("confidence_score", models.FloatField(default=0)),
+                ("factors", models.JSONField(blank=True, default=dict)),
+                ("is_applied", models.BooleanField(default=False)),
+                ("applied_at", models.DateTimeField(blank=True, null=True)),
+                ("dismissed", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "dismissed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="dismissed_recommendations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "recommended_users",
+                    models.ManyToManyField(
+                        related_name="task_recommendations", to=settings.AUTH_USER_MODEL
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="WeeklySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("week_start", models.DateField()),
+                ("week_end", models.DateField()),
+                ("summary_text", models.TextField()),
+                ("highlights", models.JSONField(default=list)),
+                ("concerns", models.JSONField(default=list)),
+                ("recommendations", models.JSONField(default=list)),
+                ("metrics", models.JSONField(default=dict)),
+                ("email_sent", models.BooleanField(default=False)),
+                ("email_sent_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="weekly_summaries",
+                        to="users.company",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="weekly_summaries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-week_start"],
+                "unique_together": {("user", "week_start")},
+            },
+        ),
+    ]
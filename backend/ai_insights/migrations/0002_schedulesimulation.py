@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Databases set up with --run-syncdb may already have this table; --fake-initial skips it
+    initial = True
+
+    dependencies = [
+        ("ai_insights", "0001_initial"),
+        ("projects", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduleSimulation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("trials", models.IntegerField(default=5000)),
+                ("graph_version", models.CharField(blank=True, max_length=64)),
+                ("results", models.JSONField(blank=True, default=dict)),
+                ("error_message", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="schedule_simulations",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Schedule Simulation",
+                "verbose_name_plural": "Schedule Simulations",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
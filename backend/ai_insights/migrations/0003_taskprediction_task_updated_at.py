@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_insights", "0002_schedulesimulation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskprediction",
+            name="task_updated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
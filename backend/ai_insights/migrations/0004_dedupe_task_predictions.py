@@ -0,0 +1,24 @@
+from django.db import migrations
+from django.db.models import Max
+
+
+def keep_latest_prediction(apps, schema_editor):
+    """Predictions used to be added on every request; keep each task's newest."""
+    TaskPrediction = apps.get_model("ai_insights", "TaskPrediction")
+    latest_ids = (
+        TaskPrediction.objects.values("task_id")
+        .annotate(latest_id=Max("id"))
+        .values_list("latest_id", flat=True)
+    )
+    TaskPrediction.objects.exclude(id__in=list(latest_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_insights", "0003_taskprediction_task_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_latest_prediction, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_insights", "0004_dedupe_task_predictions"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="taskprediction",
+            constraint=models.UniqueConstraint(
+                fields=("task",), name="unique_task_prediction"
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
 
 
 class TaskPrediction(models.Model):
@@ -24,12 +26,27 @@ class TaskPrediction(models.Model):
     model_version = models.CharField(max_length=50, default='v1')
     generated_at = models.DateTimeField(auto_now_add=True)
     
+    # Task.updated_at the prediction was made from; later task edits make it stale
+    task_updated_at = models.DateTimeField(null=True, blank=True)
+    
+    # Predictions also go stale as history and the clock move on
+    MAX_AGE = timedelta(days=1)
+    
     class Meta:
         ordering = ['-generated_at']
         get_latest_by = 'generated_at'
+        constraints = [
+            models.UniqueConstraint(fields=['task'], name='unique_task_prediction'),
+        ]
     
     def __str__(self):
         return f"Prediction for {self.task.title}"
+    
+    @property
+    def is_stale(self):
+        if self.generated_at < timezone.now() - self.MAX_AGE:
+            return True
+        return self.task_updated_at is None or self.task.updated_at > self.task_updated_at
 
 
 class TaskRecommendation(models.Model):
@@ -195,3 +212,40 @@ class AnomalyDetection(models.Model):
     
     def __str__(self):
         return f"{self.get_anomaly_type_display()} - {self.severity}"
+
+
+class ScheduleSimulation(models.Model):
+    """Monte Carlo completion forecast for a project."""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    project = models.ForeignKey(
+        'projects.Project',
+        on_delete=models.CASCADE,
+        related_name='schedule_simulations'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    trials = models.IntegerField(default=5000)
+    
+    # Dependency graph version the results were computed for
+    graph_version = models.CharField(max_length=64, blank=True)
+    
+    # P50/P85/P95 completion dates for the project and its milestones
+    results = models.JSONField(default=dict, blank=True)
+    error_message = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Schedule Simulation'
+        verbose_name_plural = 'Schedule Simulations'
+    
+    def __str__(self):
+        return f"Simulation for {self.project.title} ({self.status})"
@@ -1,18 +1,23 @@
 from rest_framework import serializers
-from .models import TaskPrediction, TaskRecommendation, WeeklySummary, AnomalyDetection
+from .models import (
+    TaskPrediction, TaskRecommendation, WeeklySummary, AnomalyDetection,
+    ScheduleSimulation,
+)
 
 
 class TaskPredictionSerializer(serializers.ModelSerializer):
     """Serializer for task predictions."""
     
     task_title = serializers.CharField(source='task.title', read_only=True)
+    is_stale = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = TaskPrediction
         fields = [
             'id', 'task', 'task_title', 'predicted_completion_date',
             'confidence_score', 'estimated_hours_remaining',
-            'risk_score', 'risk_factors', 'model_version', 'generated_at'
+            'risk_score', 'risk_factors', 'model_version', 'generated_at',
+            'task_updated_at', 'is_stale'
         ]
 
 
@@ -65,3 +70,17 @@ class AnomalyDetectionSerializer(serializers.ModelSerializer):
             'title', 'description', 'data_points', 'suggested_actions',
             'is_resolved', 'resolved_at', 'resolution_notes', 'detected_at'
         ]
+
+
+class ScheduleSimulationSerializer(serializers.ModelSerializer):
+    """Serializer for schedule simulations."""
+    
+    project_title = serializers.CharField(source='project.title', read_only=True)
+    
+    class Meta:
+        model = ScheduleSimulation
+        fields = [
+            'id', 'project', 'project_title', 'status', 'trials',
+            'results', 'error_message', 'created_at', 'completed_at'
+        ]
+        read_only_fields = fields
@@ -2,10 +2,11 @@
 AI Services for Progress Tracker
 Implements smart task assignment, progress prediction, and automated insights.
 """
-from django.db.models import Avg, Sum
+from django.db.models import Avg, Count, Q, Sum
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 import statistics
+import numpy as np
 from tasks.models import Task
 from progress.models import ProgressUpdate
 from users.models import User
@@ -15,228 +16,375 @@ from analytics.models import TimeEntry
 class TaskAssignmentRecommender:
     """Smart task assignment recommendations based on workload and skills."""
     
+    # Factor weights, in the order of AssigneeFeatures.FACTORS
+    WEIGHTS = np.array([0.3, 0.25, 0.2, 0.15, 0.1])
+    
     def __init__(self, company):
         self.company = company
+        self._features = None
+    
+    @property
+    def features(self):
+        """Company-wide candidate features, loaded on first use and reused for every task."""
+        if self._features is None:
+            self._features = AssigneeFeatures(self.company)
+        return self._features
+    
+    def recommend_assignee(self, task, top_k=3):
+        """Recommend the best users to assign a task to."""
+        features = self.features
+        if not features.user_ids:
+            return []
+        
+        factor_scores = features.factor_scores(task)
+        totals = factor_scores @ self.WEIGHTS
+        # Stable sort keeps user order for ties
+        best = np.argsort(-totals, kind='stable')[:top_k]
+        
+        users = User.objects.in_bulk([features.user_ids[i] for i in best])
+        return [
+            {
+                'user': users[features.user_ids[i]],
+                'score': float(totals[i]),
+                'factors': features.describe(i, task, factor_scores[i], self.WEIGHTS),
+            }
+            for i in best
+        ]
+
+
+class AssigneeFeatures:
+    """
+    Per-company feature matrix for assignment candidates.
+    
+    Built from a handful of grouped queries: task counts per user and
+    priority (active, total, completed), per-user project task counts,
+    completed-task cycle times and recent progress updates. Scoring a task
+    is then pure array arithmetic over all candidates.
+    """
+    
+    FACTORS = ('workload', 'performance', 'speed', 'familiarity', 'activity')
     
-    def recommend_assignee(self, task):
-        """Recommend the best user to assign a task to."""
-        eligible_users = User.objects.filter(
-            company=self.company,
+    # Completed tasks considered for cycle times
+    CYCLE_TIME_WINDOW_DAYS = 180
+    
+    def __init__(self, company):
+        self.user_ids = list(User.objects.filter(
+            company=company,
             role__in=['employee', 'manager'],
             is_active=True
-        )
-        
-        scores = []
-        for user in eligible_users:
-            score = self._calculate_user_score(user, task)
-            scores.append({
-                'user': user,
-                'score': score['total'],
-                'factors': score['factors']
-            })
-        
-        # Sort by score descending
-        scores.sort(key=lambda x: x['score'], reverse=True)
-        return scores[:3]  # Return top 3 recommendations
+        ).order_by('id').values_list('id', flat=True))
+        self.index = {user_id: i for i, user_id in enumerate(self.user_ids)}
+        size = len(self.user_ids)
+        
+        self.active = np.zeros(size)
+        self.priority_total = {}
+        self.priority_completed = {}
+        for user_id, priority, total, completed, active in Task.objects.filter(
+            assigned_to_id__in=self.user_ids
+        ).values_list('assigned_to_id', 'priority').annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='completed')),
+            active=Count('id', filter=Q(status__in=['open', 'in_progress'])),
+        ).order_by():
+            i = self.index[user_id]
+            self.active[i] += active
+            self.priority_total.setdefault(priority, np.zeros(size))[i] = total
+            self.priority_completed.setdefault(priority, np.zeros(size))[i] = completed
+        
+        # Sparse: most users only ever work in a few projects
+        self.project_tasks = {}
+        for user_id, project_id, count in Task.objects.filter(
+            assigned_to_id__in=self.user_ids
+        ).values_list('assigned_to_id', 'project_id').annotate(count=Count('id')).order_by():
+            self.project_tasks.setdefault(project_id, {})[self.index[user_id]] = count
+        
+        self.median_cycle_days, self.has_history = self._median_cycle_days(size)
+        
+        self.recent_updates = np.zeros(size)
+        for user_id, count in ProgressUpdate.objects.filter(
+            user_id__in=self.user_ids,
+            created_at__gte=timezone.now() - timedelta(days=7)
+        ).values_list('user_id').annotate(count=Count('id')).order_by():
+            self.recent_updates[self.index[user_id]] = count
     
-    def _calculate_user_score(self, user, task):
-        """Calculate assignment score for a user."""
-        factors = {}
+    def _median_cycle_days(self, size):
+        """Median whole days from start to completion per user."""
+        rows = list(Task.objects.filter(
+            assigned_to_id__in=self.user_ids,
+            status='completed',
+            started_at__isnull=False,
+            completed_at__gte=timezone.now() - timedelta(days=self.CYCLE_TIME_WINDOW_DAYS)
+        ).values_list('assigned_to_id', 'started_at', 'completed_at'))
+        
+        medians = np.zeros(size)
+        has_history = np.zeros(size, dtype=bool)
+        if not rows:
+            return medians, has_history
+        
+        users = np.array([self.index[user_id] for user_id, _, _ in rows])
+        days = np.array([(completed - started).days for _, started, completed in rows], dtype=float)
+        order = np.lexsort((days, users))
+        users, days = users[order], days[order]
+        starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+        counts = np.diff(np.r_[starts, len(users)])
+        lower = days[starts + (counts - 1) // 2]
+        upper = days[starts + counts // 2]
+        medians[users[starts]] = (lower + upper) / 2
+        has_history[users[starts]] = True
+        return medians, has_history
+    
+    def factor_scores(self, task):
+        """0-100 score per factor, shape (candidates, factors)."""
+        size = len(self.user_ids)
+        zeros = np.zeros(size)
         
         # 1. Current workload (lower is better)
-        active_tasks = Task.objects.filter(
-            assigned_to=user,
-            status__in=['open', 'in_progress']
-        ).count()
-        workload_score = max(0, 100 - (active_tasks * 10))
-        factors['workload'] = {
-            'value': active_tasks,
-            'score': workload_score,
-            'weight': 0.3
-        }
+        workload = np.maximum(0, 100 - self.active * 10)
         
-        # 2. Historical performance on similar tasks
-        similar_tasks = Task.objects.filter(
-            assigned_to=user,
-            status='completed',
-            priority=task.priority
-        )
-        completion_rate = similar_tasks.count() / max(1, Task.objects.filter(
-            assigned_to=user,
-            priority=task.priority
-        ).count()) * 100
-        factors['performance'] = {
-            'value': f"{completion_rate:.1f}%",
-            'score': completion_rate,
-            'weight': 0.25
-        }
+        # 2. Historical completion rate on tasks of the same priority
+        total = self.priority_total.get(task.priority, zeros)
+        completed = self.priority_completed.get(task.priority, zeros)
+        performance = completed / np.maximum(1, total) * 100
         
-        # 3. Average completion time
-        completed_tasks = Task.objects.filter(
-            assigned_to=user,
-            status='completed',
-            started_at__isnull=False,
-            completed_at__isnull=False
-        )
-        if completed_tasks.exists():
-            avg_days = []
-            for t in completed_tasks[:20]:
-                delta = (t.completed_at - t.started_at).days
-                avg_days.append(delta)
-            avg_completion = statistics.mean(avg_days) if avg_days else 0
-            speed_score = max(0, 100 - (avg_completion * 5))
-        else:
-            speed_score = 50  # Neutral for new users
-            avg_completion = 0
-        factors['speed'] = {
-            'value': f"{avg_completion:.1f} days avg",
-            'score': speed_score,
-            'weight': 0.2
-        }
+        # 3. Median completion time; neutral for users without history
+        speed = np.where(self.has_history, np.maximum(0, 100 - self.median_cycle_days * 5), 50)
         
         # 4. Project familiarity
-        project_tasks = Task.objects.filter(
-            assigned_to=user,
-            project=task.project
-        ).count()
-        familiarity_score = min(100, project_tasks * 20)
-        factors['familiarity'] = {
-            'value': project_tasks,
-            'score': familiarity_score,
-            'weight': 0.15
-        }
+        project_tasks = np.zeros(size)
+        for i, count in self.project_tasks.get(task.project_id, {}).items():
+            project_tasks[i] = count
+        familiarity = np.minimum(100, project_tasks * 20)
         
         # 5. Recent activity (have they been active?)
-        recent_updates = ProgressUpdate.objects.filter(
-            user=user,
-            created_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        activity_score = min(100, recent_updates * 15)
-        factors['activity'] = {
-            'value': recent_updates,
-            'score': activity_score,
-            'weight': 0.1
-        }
-        
-        # Calculate weighted total
-        total = sum(f['score'] * f['weight'] for f in factors.values())
+        activity = np.minimum(100, self.recent_updates * 15)
         
-        return {'total': total, 'factors': factors}
+        return np.column_stack([workload, performance, speed, familiarity, activity])
+    
+    def describe(self, i, task, scores, weights):
+        """Factor breakdown for one candidate, as shown to users."""
+        total = self.priority_total.get(task.priority)
+        completed = self.priority_completed.get(task.priority)
+        completion_rate = completed[i] / max(1, total[i]) * 100 if total is not None else 0.0
+        values = {
+            'workload': int(self.active[i]),
+            'performance': f"{completion_rate:.1f}%",
+            'speed': f"{self.median_cycle_days[i]:.1f} days median",
+            'familiarity': self.project_tasks.get(task.project_id, {}).get(i, 0),
+            'activity': int(self.recent_updates[i]),
+        }
+        return {
+            name: {'value': values[name], 'score': float(score), 'weight': float(weight)}
+            for name, score, weight in zip(self.FACTORS, scores, weights)
+        }
 
 
 class ProgressPredictor:
     """Predict task completion dates and risk levels."""
     
+    # Completed tasks of the same assignee and priority needed to use their history
+    MIN_HISTORY = 3
+    
+    # Most recent completed tasks averaged per assignee and priority
+    HISTORY_SAMPLE = 20
+    
+    # Estimated days by priority when there is not enough history
+    DAYS_BY_PRIORITY = {
+        'low': 14,
+        'medium': 7,
+        'high': 3,
+        'urgent': 1
+    }
+    
     def predict_completion(self, task):
         """Predict when a task will be completed."""
-        if task.status == 'completed':
-            return {
-                'predicted_date': task.completed_at,
-                'confidence': 1.0,
-                'risk_score': 0,
-                'risk_factors': []
+        return self.predict_many([task])[task.id]
+    
+    def predict_many(self, tasks):
+        """
+        Predict completion for many tasks at once.
+        
+        Assignee history and workload are loaded once for all tasks, and
+        dates and risk scores are computed as arrays. Returns
+        ``{task_id: prediction}``.
+        """
+        predictions = {}
+        open_tasks = []
+        for task in tasks:
+            if task.status == 'completed':
+                predictions[task.id] = {
+                    'predicted_date': task.completed_at,
+                    'confidence': 1.0,
+                    'risk_score': 0,
+                    'risk_factors': []
+                }
+            else:
+                open_tasks.append(task)
+        if not open_tasks:
+            return predictions
+        
+        user_ids = {task.assigned_to_id for task in open_tasks if task.assigned_to_id}
+        history = self._history_stats(user_ids)
+        active_counts = dict(Task.objects.filter(
+            assigned_to_id__in=user_ids,
+            status__in=['open', 'in_progress']
+        ).values_list('assigned_to_id').annotate(count=Count('id')).order_by())
+        
+        now = timezone.now()
+        now_ts = now.timestamp()
+        stats = [history.get((task.assigned_to_id, task.priority), (0, 0.0)) for task in open_tasks]
+        count = np.array([similar for similar, _ in stats], dtype=float)
+        avg_days = np.array([days for _, days in stats])
+        has_history = np.array([bool(task.assigned_to_id) for task in open_tasks]) & (count >= self.MIN_HISTORY)
+        
+        # A trained company model takes precedence over the history heuristic
+        model_days, model_confidence, model_versions = self._model_estimates(open_tasks)
+        use_model = ~np.isnan(model_days)
+        base_days = np.where(use_model, model_days, avg_days)
+        has_history |= use_model
+        
+        default_days = np.array([self.DAYS_BY_PRIORITY.get(task.priority, 7) for task in open_tasks], dtype=float)
+        progress = np.array([task.progress_percentage for task in open_tasks], dtype=float)
+        started = np.array([task.started_at.timestamp() if task.started_at else np.nan for task in open_tasks])
+        deadline = np.array([task.deadline.timestamp() if task.deadline else np.nan for task in open_tasks])
+        blocked = np.array([task.status == 'blocked' for task in open_tasks])
+        active = np.array([active_counts.get(task.assigned_to_id, 0) for task in open_tasks])
+        
+        # Adjust based on current progress, starting from started_at or now
+        progress_factor = 1 - progress / 100
+        remaining_days = np.where(has_history, base_days, default_days) * progress_factor
+        predicted = np.where(np.isnan(started), now_ts, started) + remaining_days * 86400
+        
+        # Confidence grows with the amount of similar history
+        confidence = np.where(has_history, np.minimum(0.9, 0.5 + count * 0.05), 0.3)
+        confidence = np.where(use_model, model_confidence, confidence)
+        
+        # Risk factors (comparisons with NaN are False)
+        overdue = now_ts > deadline
+        late = ~overdue & (predicted > deadline)
+        days_elapsed = np.floor((now_ts - started) / 86400)
+        expected_progress = np.divide(
+            days_elapsed, base_days, out=np.full_like(base_days, np.inf), where=base_days > 0
+        ) * 100
+        slow = (days_elapsed > 0) & (progress < expected_progress * 0.5)
+        busy = active > 5
+        risk = np.minimum(1.0, 0.4 * overdue + 0.3 * late + 0.3 * blocked + 0.2 * slow + 0.1 * busy)
+        
+        for i, task in enumerate(open_tasks):
+            prediction = {
+                'predicted_date': datetime.fromtimestamp(predicted[i], tz=dt_timezone.utc),
+                'confidence': float(confidence[i]),
+                'estimated_hours_remaining': float(remaining_days[i] * 8),  # Assume 8-hour days
+                'model_version': model_versions[i] or 'v1',
             }
+            if not has_history[i]:
+                # Medium risk due to uncertainty
+                prediction.update(risk_score=0.5, risk_factors=['Limited historical data for prediction'])
+            else:
+                factors = []
+                if overdue[i]:
+                    factors.append('Task is already overdue')
+                elif late[i]:
+                    factors.append('Predicted completion after deadline')
+                if blocked[i]:
+                    factors.append('Task is currently blocked')
+                if slow[i]:
+                    factors.append('Progress slower than expected')
+                if busy[i]:
+                    factors.append(f'Assignee has {active[i]} active tasks')
+                prediction.update(risk_score=float(risk[i]), risk_factors=factors)
+            predictions[task.id] = prediction
+        
+        return predictions
+    
+    def _model_estimates(self, tasks):
+        """
+        Days to complete each task from its company's trained model, with the
+        model's confidence and version. Days are NaN for tasks whose company
+        has no model.
+        """
+        import pandas as pd
+        from automation.models import TaskDependency
+        from .completion_model import load_company_model, predict_days
+        
+        days = np.full(len(tasks), np.nan)
+        confidence = np.zeros(len(tasks))
+        versions = [None] * len(tasks)
+        
+        company_ids = dict(Task.objects.filter(
+            id__in=[task.id for task in tasks]
+        ).values_list('id', 'project__company_id'))
+        models = {}
+        for company_id in set(company_ids.values()):
+            artifact = load_company_model(company_id)
+            if artifact:
+                models[company_id] = artifact
+        if not models:
+            return days, confidence, versions
+        
+        dependency_counts = dict(TaskDependency.objects.filter(
+            successor_id__in=[task.id for task in tasks]
+        ).values_list('successor_id').annotate(count=Count('id')).order_by())
+        
+        for company_id, artifact in models.items():
+            positions = [i for i, task in enumerate(tasks) if company_ids.get(task.id) == company_id]
+            frame = pd.DataFrame({
+                'assigned_to_id': [tasks[i].assigned_to_id for i in positions],
+                'priority': [tasks[i].priority for i in positions],
+                'estimated_hours': [tasks[i].estimated_hours for i in positions],
+                'dependency_count': [dependency_counts.get(tasks[i].id, 0) for i in positions],
+            })
+            days[positions] = predict_days(artifact, frame)
+            confidence[positions] = artifact['confidence']
+            for i in positions:
+                versions[i] = artifact['version']
         
-        # Gather historical data
-        user = task.assigned_to
-        if not user:
-            return self._default_prediction(task)
-        
-        # Average completion time for similar tasks
-        similar_completed = Task.objects.filter(
-            assigned_to=user,
+        return days, confidence, versions
+    
+    def _history_stats(self, user_ids):
+        """``{(user_id, priority): (completed_count, mean_days_of_latest)}`` from one query."""
+        stats = {}
+        for user_id, priority, started_at, completed_at in Task.objects.filter(
+            assigned_to_id__in=user_ids,
             status='completed',
-            priority=task.priority,
             started_at__isnull=False,
             completed_at__isnull=False
-        )
-        
-        if similar_completed.count() < 3:
-            return self._default_prediction(task)
-        
-        completion_times = []
-        for t in similar_completed[:20]:
-            delta = (t.completed_at - t.started_at).total_seconds() / 86400  # Days
-            completion_times.append(delta)
-        
-        avg_days = statistics.mean(completion_times)
-        
-        # Adjust based on current progress
-        progress_factor = 1 - (task.progress_percentage / 100)
-        estimated_remaining_days = avg_days * progress_factor
-        
-        # Start from now or started_at
-        start_point = task.started_at or timezone.now()
-        predicted_date = start_point + timedelta(days=estimated_remaining_days)
-        
-        # Calculate confidence based on data quality
-        confidence = min(0.9, 0.5 + (similar_completed.count() * 0.05))
-        
-        # Risk factors
-        risk_factors = []
-        risk_score = 0
-        
-        # Check if already overdue
-        if task.deadline and timezone.now() > task.deadline:
-            risk_factors.append('Task is already overdue')
-            risk_score += 0.4
-        elif task.deadline and predicted_date > task.deadline:
-            risk_factors.append('Predicted completion after deadline')
-            risk_score += 0.3
-        
-        # Check for blockers
-        if task.status == 'blocked':
-            risk_factors.append('Task is currently blocked')
-            risk_score += 0.3
-        
-        # Check progress rate
-        if task.started_at:
-            days_elapsed = (timezone.now() - task.started_at).days
-            if days_elapsed > 0:
-                expected_progress = (days_elapsed / avg_days) * 100
-                if task.progress_percentage < expected_progress * 0.5:
-                    risk_factors.append('Progress slower than expected')
-                    risk_score += 0.2
-        
-        # High workload
-        active_tasks = Task.objects.filter(
-            assigned_to=user,
-            status__in=['open', 'in_progress']
-        ).count()
-        if active_tasks > 5:
-            risk_factors.append(f'Assignee has {active_tasks} active tasks')
-            risk_score += 0.1
-        
-        return {
-            'predicted_date': predicted_date,
-            'confidence': confidence,
-            'estimated_hours_remaining': estimated_remaining_days * 8,  # Assume 8-hour days
-            'risk_score': min(1.0, risk_score),
-            'risk_factors': risk_factors
-        }
+        ).order_by('-completed_at').values_list('assigned_to_id', 'priority', 'started_at', 'completed_at'):
+            count, durations = stats.setdefault((user_id, priority), [0, []])
+            stats[(user_id, priority)][0] = count + 1
+            if len(durations) < self.HISTORY_SAMPLE:
+                durations.append((completed_at - started_at).total_seconds() / 86400)
+        return {key: (count, statistics.mean(durations)) for key, (count, durations) in stats.items()}
     
-    def _default_prediction(self, task):
-        """Default prediction when not enough data."""
-        # Estimate based on priority
-        days_by_priority = {
-            'low': 14,
-            'medium': 7,
-            'high': 3,
-            'urgent': 1
-        }
-        estimated_days = days_by_priority.get(task.priority, 7)
-        progress_factor = 1 - (task.progress_percentage / 100)
-        
-        start_point = task.started_at or timezone.now()
-        predicted_date = start_point + timedelta(days=estimated_days * progress_factor)
-        
-        return {
-            'predicted_date': predicted_date,
-            'confidence': 0.3,  # Low confidence
-            'estimated_hours_remaining': estimated_days * progress_factor * 8,
-            'risk_score': 0.5,  # Medium risk due to uncertainty
-            'risk_factors': ['Limited historical data for prediction']
-        }
+    def refresh_predictions(self, tasks):
+        """Predict the given tasks and upsert one TaskPrediction per task. Returns the number stored."""
+        from .models import TaskPrediction
+        
+        tasks = list(tasks)
+        predictions = self.predict_many(tasks)
+        rows = [
+            TaskPrediction(
+                task=task,
+                predicted_completion_date=predictions[task.id]['predicted_date'],
+                confidence_score=predictions[task.id]['confidence'],
+                estimated_hours_remaining=predictions[task.id].get('estimated_hours_remaining'),
+                risk_score=predictions[task.id]['risk_score'],
+                risk_factors=predictions[task.id]['risk_factors'],
+                model_version=predictions[task.id].get('model_version', 'v1'),
+                task_updated_at=task.updated_at,
+            )
+            for task in tasks
+        ]
+        TaskPrediction.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['task'],
+            update_fields=[
+                'predicted_completion_date', 'confidence_score', 'estimated_hours_remaining',
+                'risk_score', 'risk_factors', 'model_version', 'generated_at', 'task_updated_at',
+            ],
+            batch_size=500,
+        )
+        return len(rows)
 
 
 class SummaryGenerator:
@@ -246,16 +394,48 @@ class SummaryGenerator:
         self.user = user
         self.company = user.company
     
+    @staticmethod
+    def last_week_start():
+        today = timezone.now().date()
+        return today - timedelta(days=today.weekday() + 7)
+    
     def generate_weekly_summary(self, week_start=None):
         """Generate a weekly summary for the user."""
-        if not week_start:
-            today = timezone.now().date()
-            week_start = today - timedelta(days=today.weekday() + 7)  # Last week
+        week_start = week_start or self.last_week_start()
+        week_end = week_start + timedelta(days=6)
+        metrics = self.gather_metrics([self.user.id], week_start, week_end)[self.user.id]
+        return self._render(metrics, week_start, week_end)
+    
+    @classmethod
+    def generate_company_summaries(cls, company, week_start=None):
+        """
+        Build and store WeeklySummary rows for every active user of the company.
+        
+        Metrics for all users come from one grouped query per source, and the
+        rows are written with a single upsert. Returns the number stored.
+        """
+        from .models import WeeklySummary
         
+        week_start = week_start or cls.last_week_start()
         week_end = week_start + timedelta(days=6)
+        users = list(User.objects.filter(company=company, is_active=True).select_related('company'))
+        metrics = cls.gather_metrics([user.id for user in users], week_start, week_end)
         
-        # Gather metrics
-        metrics = self._gather_metrics(week_start, week_end)
+        rows = []
+        for user in users:
+            summary = cls(user)._render(metrics[user.id], week_start, week_end)
+            rows.append(WeeklySummary(user=user, company=company, **summary))
+        
+        WeeklySummary.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'week_start'],
+            update_fields=['week_end', 'summary_text', 'highlights', 'concerns', 'recommendations', 'metrics'],
+            batch_size=500,
+        )
+        return len(rows)
+    
+    def _render(self, metrics, week_start, week_end):
         highlights = self._identify_highlights(metrics)
         concerns = self._identify_concerns(metrics)
         recommendations = self._generate_recommendations(metrics, concerns)
@@ -271,42 +451,59 @@ class SummaryGenerator:
             'metrics': metrics
         }
     
-    def _gather_metrics(self, week_start, week_end):
-        """Gather all relevant metrics for the week."""
-        tasks = Task.objects.filter(assigned_to=self.user)
-        time_entries = TimeEntry.objects.filter(
-            user=self.user,
+    @staticmethod
+    def gather_metrics(user_ids, week_start, week_end):
+        """Gather the week's metrics for each user, as ``{user_id: metrics}``."""
+        metrics = {
+            user_id: {
+                'tasks_completed': 0,
+                'tasks_in_progress': 0,
+                'tasks_blocked': 0,
+                'total_hours_logged': 0,
+                'progress_updates_submitted': 0,
+                'average_progress_increase': 0,
+                'average_sentiment': None,
+                'overdue_tasks': 0
+            }
+            for user_id in user_ids
+        }
+        
+        for row in Task.objects.filter(assigned_to_id__in=user_ids).values('assigned_to_id').annotate(
+            tasks_completed=Count('id', filter=Q(
+                completed_at__date__gte=week_start,
+                completed_at__date__lte=week_end
+            )),
+            tasks_in_progress=Count('id', filter=Q(status='in_progress')),
+            tasks_blocked=Count('id', filter=Q(status='blocked')),
+            overdue_tasks=Count('id', filter=Q(
+                deadline__lt=timezone.now(),
+                status__in=['open', 'in_progress']
+            )),
+        ).order_by():
+            metrics[row.pop('assigned_to_id')].update(row)
+        
+        for user_id, total_minutes in TimeEntry.objects.filter(
+            user_id__in=user_ids,
             start_time__date__gte=week_start,
             start_time__date__lte=week_end,
             is_running=False
-        )
-        progress_updates = ProgressUpdate.objects.filter(
-            user=self.user,
+        ).values_list('user_id').annotate(total=Sum('duration_minutes')).order_by():
+            metrics[user_id]['total_hours_logged'] = round((total_minutes or 0) / 60, 1)
+        
+        for user_id, count, average, sentiment in ProgressUpdate.objects.filter(
+            user_id__in=user_ids,
             created_at__date__gte=week_start,
             created_at__date__lte=week_end
-        )
-        
-        completed_this_week = tasks.filter(
-            completed_at__date__gte=week_start,
-            completed_at__date__lte=week_end
-        )
-        
-        total_minutes = time_entries.aggregate(total=Sum('duration_minutes'))['total'] or 0
-        
-        return {
-            'tasks_completed': completed_this_week.count(),
-            'tasks_in_progress': tasks.filter(status='in_progress').count(),
-            'tasks_blocked': tasks.filter(status='blocked').count(),
-            'total_hours_logged': round(total_minutes / 60, 1),
-            'progress_updates_submitted': progress_updates.count(),
-            'average_progress_increase': progress_updates.aggregate(
-                avg=Avg('progress_percentage')
-            )['avg'] or 0,
-            'overdue_tasks': tasks.filter(
-                deadline__lt=timezone.now(),
-                status__in=['open', 'in_progress']
-            ).count()
-        }
+        ).values_list('user_id').annotate(
+            count=Count('id'),
+            avg=Avg('progress_percentage'),
+            sentiment=Avg('sentiment_score'),
+        ).order_by():
+            metrics[user_id]['progress_updates_submitted'] = count
+            metrics[user_id]['average_progress_increase'] = average or 0
+            metrics[user_id]['average_sentiment'] = sentiment
+        
+        return metrics
     
     def _identify_highlights(self, metrics):
         """Identify positive achievements."""
@@ -342,6 +539,9 @@ class SummaryGenerator:
         if metrics['progress_updates_submitted'] < 2:
             concerns.append("Few progress updates submitted - consider more frequent updates")
         
+        if metrics.get('average_sentiment') is not None and metrics['average_sentiment'] < -0.3:
+            concerns.append("Progress updates mention frequent blockers or problems")
+        
         return concerns
     
     def _generate_recommendations(self, metrics, concerns):
@@ -380,151 +580,265 @@ class SummaryGenerator:
 class AnomalyDetector:
     """Detect anomalies in productivity and progress patterns."""
     
+    # Weeks of a user's own completion history compared with the latest week
+    HISTORY_WEEKS = 8
+    
+    # Team size below which team statistics are not meaningful
+    MIN_TEAM_SIZE = 4
+    
+    Z_THRESHOLD = 2.0
+    IQR_MULTIPLIER = 1.5
+    
+    SUGGESTED_ACTIONS = {
+        'blocked_pattern': [
+            'Review common blockers with team lead',
+            'Consider resource reallocation',
+            'Schedule blocker resolution meeting'
+        ],
+        'productivity_drop': [
+            'Check for blockers or challenges',
+            'Review workload distribution',
+            'Schedule 1:1 check-in'
+        ],
+        'workload_imbalance': [
+            'Consider redistributing tasks',
+            'Review task priorities',
+            'Discuss with team lead'
+        ],
+        'missed_deadlines': [
+            'Review deadline setting process',
+            'Improve estimation accuracy',
+            'Consider workload adjustment'
+        ],
+    }
+    
     def __init__(self, company):
         self.company = company
     
     def detect_anomalies(self):
-        """Run all anomaly detection checks."""
-        anomalies = []
-        
-        anomalies.extend(self._detect_recurring_blocks())
-        anomalies.extend(self._detect_productivity_drops())
-        anomalies.extend(self._detect_workload_imbalance())
-        anomalies.extend(self._detect_missed_deadline_patterns())
+        """
+        Run all anomaly detection checks.
+        
+        Metrics for every employee are loaded with a few grouped queries and
+        each rule is evaluated over all employees at once. A user gets at
+        most one anomaly of each type; fixed thresholds are checked first,
+        then statistical outliers against the team and the user's own history.
+        """
+        self.users = list(User.objects.filter(company=self.company, role='employee'))
+        if not self.users:
+            return []
+        self.metrics = self._load_metrics()
+        
+        anomalies = {}
+        for detect in (
+            self._detect_recurring_blocks,
+            self._detect_productivity_drops,
+            self._detect_workload_imbalance,
+            self._detect_missed_deadline_patterns,
+        ):
+            for anomaly in detect():
+                anomalies.setdefault((anomaly['type'], anomaly['user'].id), anomaly)
+        
+        return list(anomalies.values())
+    
+    def _load_metrics(self):
+        """Per-employee counts as arrays aligned with ``self.users``."""
+        now = timezone.now()
+        index = {user.id: i for i, user in enumerate(self.users)}
+        size = len(self.users)
+        columns = (
+            'blocked', 'active', 'overdue', 'with_deadline',
+            'completed_recent', 'completed_previous', 'recent_blocks',
+        )
+        metrics = {name: np.zeros(size) for name in columns}
         
-        return anomalies
+        for row in Task.objects.filter(assigned_to_id__in=index).values('assigned_to_id').annotate(
+            blocked=Count('id', filter=Q(status='blocked')),
+            active=Count('id', filter=Q(status__in=['open', 'in_progress'])),
+            overdue=Count('id', filter=Q(deadline__lt=now, status__in=['open', 'in_progress', 'blocked'])),
+            with_deadline=Count('id', filter=Q(deadline__isnull=False)),
+            # Compare last 2 weeks to previous 2 weeks
+            completed_recent=Count('id', filter=Q(completed_at__gte=now - timedelta(days=14))),
+            completed_previous=Count('id', filter=Q(
+                completed_at__gte=now - timedelta(days=28),
+                completed_at__lt=now - timedelta(days=14)
+            )),
+        ).order_by():
+            i = index[row['assigned_to_id']]
+            for name in columns[:-1]:
+                metrics[name][i] = row[name]
+        
+        for user_id, count in ProgressUpdate.objects.filter(
+            user_id__in=index,
+            status='blocked',
+            created_at__gte=now - timedelta(days=30)
+        ).values_list('user_id').annotate(count=Count('id')).order_by():
+            metrics['recent_blocks'][index[user_id]] = count
+        
+        # Completions per rolling week, column 0 being the last 7 days
+        weekly = np.zeros((size, self.HISTORY_WEEKS + 1))
+        rows = list(Task.objects.filter(
+            assigned_to_id__in=index,
+            completed_at__gte=now - timedelta(weeks=self.HISTORY_WEEKS + 1)
+        ).values_list('assigned_to_id', 'completed_at'))
+        if rows:
+            users = np.array([index[user_id] for user_id, _ in rows])
+            weeks = np.array([(now - completed_at).days // 7 for _, completed_at in rows])
+            weeks = np.clip(weeks, 0, self.HISTORY_WEEKS)
+            np.add.at(weekly, (users, weeks), 1)
+        metrics['weekly_completed'] = weekly
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['overdue_ratio'] = np.where(
+                metrics['with_deadline'] > 0, metrics['overdue'] / metrics['with_deadline'], 0.0
+            )
+        return metrics
+    
+    def _team_z_scores(self, values):
+        """Z-scores against the team, or zeros when the team is too small or uniform."""
+        std = values.std()
+        if len(values) < self.MIN_TEAM_SIZE or std == 0:
+            return np.zeros_like(values)
+        return (values - values.mean()) / std
+    
+    def _iqr_upper_fence(self, values):
+        """Upper Tukey fence over the team, or infinity when the team is too small."""
+        if len(values) < self.MIN_TEAM_SIZE:
+            return np.inf
+        q1, q3 = np.percentile(values, [25, 75])
+        return q3 + self.IQR_MULTIPLIER * (q3 - q1)
+    
+    def _anomaly(self, anomaly_type, severity, i, title, description, data_points):
+        user = self.users[i]
+        return {
+            'type': anomaly_type,
+            'severity': severity,
+            'user': user,
+            'title': title.format(name=user.name),
+            'description': description,
+            'data_points': data_points,
+            'suggested_actions': self.SUGGESTED_ACTIONS[anomaly_type]
+        }
     
     def _detect_recurring_blocks(self):
         """Detect users with recurring blocked tasks."""
-        anomalies = []
-        
-        users = User.objects.filter(company=self.company, role='employee')
-        for user in users:
-            blocked_count = Task.objects.filter(
-                assigned_to=user,
-                status='blocked'
-            ).count()
-            
-            recent_blocks = ProgressUpdate.objects.filter(
-                user=user,
-                status='blocked',
-                created_at__gte=timezone.now() - timedelta(days=30)
-            ).count()
-            
-            if blocked_count >= 3 or recent_blocks >= 5:
-                anomalies.append({
-                    'type': 'blocked_pattern',
-                    'severity': 'high' if blocked_count >= 5 else 'medium',
-                    'user': user,
-                    'title': f'{user.name} has recurring blocked tasks',
-                    'description': f'{blocked_count} currently blocked tasks, {recent_blocks} block reports in last 30 days',
-                    'suggested_actions': [
-                        'Review common blockers with team lead',
-                        'Consider resource reallocation',
-                        'Schedule blocker resolution meeting'
-                    ]
-                })
-        
-        return anomalies
+        blocked, recent_blocks = self.metrics['blocked'], self.metrics['recent_blocks']
+        z_scores = self._team_z_scores(recent_blocks)
+        flagged = (blocked >= 3) | (recent_blocks >= 5) | ((z_scores > self.Z_THRESHOLD) & (recent_blocks >= 2))
+        
+        return [
+            self._anomaly(
+                'blocked_pattern', 'high' if blocked[i] >= 5 else 'medium', i,
+                '{name} has recurring blocked tasks',
+                f'{blocked[i]:.0f} currently blocked tasks, {recent_blocks[i]:.0f} block reports in last 30 days',
+                [{'metric': 'recent_blocks', 'value': float(recent_blocks[i]), 'team_z_score': round(float(z_scores[i]), 2)}]
+            )
+            for i in np.flatnonzero(flagged)
+        ]
     
     def _detect_productivity_drops(self):
-        """Detect significant drops in productivity."""
-        anomalies = []
-        
-        users = User.objects.filter(company=self.company, role='employee')
-        for user in users:
-            # Compare last 2 weeks to previous 2 weeks
-            recent = Task.objects.filter(
-                assigned_to=user,
-                completed_at__gte=timezone.now() - timedelta(days=14)
-            ).count()
-            
-            previous = Task.objects.filter(
-                assigned_to=user,
-                completed_at__gte=timezone.now() - timedelta(days=28),
-                completed_at__lt=timezone.now() - timedelta(days=14)
-            ).count()
-            
-            if previous > 0 and recent < previous * 0.5:
-                anomalies.append({
-                    'type': 'productivity_drop',
-                    'severity': 'medium',
-                    'user': user,
-                    'title': f'Productivity drop detected for {user.name}',
-                    'description': f'Completed {recent} tasks vs {previous} in previous period (>50% drop)',
-                    'suggested_actions': [
-                        'Check for blockers or challenges',
-                        'Review workload distribution',
-                        'Schedule 1:1 check-in'
-                    ]
-                })
-        
+        """Detect significant drops in productivity, over two weeks and against the user's own history."""
+        recent, previous = self.metrics['completed_recent'], self.metrics['completed_previous']
+        anomalies = [
+            self._anomaly(
+                'productivity_drop', 'medium', i,
+                'Productivity drop detected for {name}',
+                f'Completed {recent[i]:.0f} tasks vs {previous[i]:.0f} in previous period (>50% drop)',
+                [{'metric': 'completed_two_weeks', 'value': float(recent[i]), 'previous': float(previous[i])}]
+            )
+            for i in np.flatnonzero((previous > 0) & (recent < previous * 0.5))
+        ]
+        
+        weekly = self.metrics['weekly_completed']
+        last_week, history = weekly[:, 0], weekly[:, 1:]
+        mean = history.mean(axis=1)
+        # Completions are counts, so allow at least Poisson noise around the mean
+        std = np.maximum(history.std(axis=1), np.sqrt(mean))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = np.where(std > 0, (last_week - mean) / std, 0.0)
+        for i in np.flatnonzero((z_scores < -self.Z_THRESHOLD) & (mean >= 1)):
+            anomalies.append(self._anomaly(
+                'productivity_drop', 'medium', i,
+                'Productivity drop detected for {name}',
+                f'Completed {last_week[i]:.0f} tasks in the last week vs a weekly average of '
+                f'{mean[i]:.1f} over the previous {self.HISTORY_WEEKS} weeks',
+                [{'metric': 'completed_last_week', 'value': float(last_week[i]), 'history_mean': round(float(mean[i]), 2),
+                  'history_z_score': round(float(z_scores[i]), 2)}]
+            ))
         return anomalies
     
     def _detect_workload_imbalance(self):
         """Detect workload imbalances in the team."""
-        anomalies = []
-        
-        users = User.objects.filter(company=self.company, role='employee')
-        workloads = []
-        
-        for user in users:
-            active_tasks = Task.objects.filter(
-                assigned_to=user,
-                status__in=['open', 'in_progress']
-            ).count()
-            workloads.append({'user': user, 'count': active_tasks})
-        
-        if len(workloads) >= 3:
-            counts = [w['count'] for w in workloads]
-            avg_workload = statistics.mean(counts)
-            
-            for w in workloads:
-                if w['count'] > avg_workload * 2 and w['count'] > 5:
-                    anomalies.append({
-                        'type': 'workload_imbalance',
-                        'severity': 'medium',
-                        'user': w['user'],
-                        'title': f"High workload for {w['user'].name}",
-                        'description': f"{w['count']} active tasks vs team average of {avg_workload:.1f}",
-                        'suggested_actions': [
-                            'Consider redistributing tasks',
-                            'Review task priorities',
-                            'Discuss with team lead'
-                        ]
-                    })
-        
-        return anomalies
+        active = self.metrics['active']
+        if len(active) < 3:
+            return []
+        avg_workload = active.mean()
+        fence = self._iqr_upper_fence(active)
+        flagged = (active > 5) & ((active > avg_workload * 2) | (active > fence))
+        
+        return [
+            self._anomaly(
+                'workload_imbalance', 'medium', i,
+                'High workload for {name}',
+                f'{active[i]:.0f} active tasks vs team average of {avg_workload:.1f}',
+                [{'metric': 'active_tasks', 'value': float(active[i]), 'team_mean': round(float(avg_workload), 2),
+                  'team_iqr_fence': None if np.isinf(fence) else round(float(fence), 2)}]
+            )
+            for i in np.flatnonzero(flagged)
+        ]
     
     def _detect_missed_deadline_patterns(self):
         """Detect patterns of missed deadlines."""
-        anomalies = []
-        
-        users = User.objects.filter(company=self.company, role='employee')
-        for user in users:
-            overdue = Task.objects.filter(
-                assigned_to=user,
-                deadline__lt=timezone.now(),
-                status__in=['open', 'in_progress', 'blocked']
-            ).count()
-            
-            total_with_deadline = Task.objects.filter(
-                assigned_to=user,
-                deadline__isnull=False
-            ).count()
-            
-            if total_with_deadline > 0 and overdue / total_with_deadline > 0.3:
-                anomalies.append({
-                    'type': 'missed_deadlines',
-                    'severity': 'high',
-                    'user': user,
-                    'title': f'Deadline concerns for {user.name}',
-                    'description': f'{overdue} of {total_with_deadline} deadlined tasks are overdue',
-                    'suggested_actions': [
-                        'Review deadline setting process',
-                        'Improve estimation accuracy',
-                        'Consider workload adjustment'
-                    ]
-                })
-        
-        return anomalies
+        overdue, total = self.metrics['overdue'], self.metrics['with_deadline']
+        ratio = self.metrics['overdue_ratio']
+        z_scores = self._team_z_scores(ratio)
+        flagged = (total > 0) & ((ratio > 0.3) | ((z_scores > self.Z_THRESHOLD) & (overdue >= 2)))
+        
+        return [
+            self._anomaly(
+                'missed_deadlines', 'high', i,
+                'Deadline concerns for {name}',
+                f'{overdue[i]:.0f} of {total[i]:.0f} deadlined tasks are overdue',
+                [{'metric': 'overdue_ratio', 'value': round(float(ratio[i]), 3),
+                  'team_z_score': round(float(z_scores[i]), 2)}]
+            )
+            for i in np.flatnonzero(flagged)
+        ]
+    
+    def save_anomalies(self, anomalies):
+        """
+        Store detected anomalies, skipping ones already open.
+        
+        An unresolved anomaly of the same type for the same user is refreshed
+        in place rather than duplicated. Returns ``(created, refreshed)``.
+        """
+        from .models import AnomalyDetection
+        
+        open_anomalies = {
+            (anomaly.anomaly_type, anomaly.user_id): anomaly
+            for anomaly in AnomalyDetection.objects.filter(company=self.company, is_resolved=False)
+        }
+        created, refreshed = [], []
+        for data in anomalies:
+            user = data.get('user')
+            existing = open_anomalies.get((data['type'], user.id if user else None))
+            if existing:
+                existing.severity = data['severity']
+                existing.description = data['description']
+                existing.data_points = data.get('data_points', [])
+                refreshed.append(existing)
+            else:
+                created.append(AnomalyDetection(
+                    anomaly_type=data['type'],
+                    severity=data['severity'],
+                    user=user,
+                    project=data.get('project'),
+                    company=self.company,
+                    title=data['title'],
+                    description=data['description'],
+                    data_points=data.get('data_points', []),
+                    suggested_actions=data['suggested_actions']
+                ))
+        
+        AnomalyDetection.objects.bulk_update(refreshed, ['severity', 'description', 'data_points'])
+        return AnomalyDetection.objects.bulk_create(created), refreshed
@@ -0,0 +1,112 @@
+"""
+Celery tasks for AI insights.
+"""
+from celery import shared_task
+from django.utils import timezone
+
+
+@shared_task
+def run_schedule_simulation(simulation_id):
+    """Run a queued Monte Carlo schedule simulation and store its results."""
+    from .models import ScheduleSimulation
+    from .simulation import ScheduleSimulator
+    
+    simulation = ScheduleSimulation.objects.select_related('project').get(id=simulation_id)
+    simulation.status = 'running'
+    simulation.save(update_fields=['status'])
+    
+    try:
+        simulation.results = ScheduleSimulator(simulation.project, trials=simulation.trials).run()
+        simulation.status = 'completed'
+    except Exception as e:
+        simulation.status = 'failed'
+        simulation.error_message = str(e)
+    
+    simulation.completed_at = timezone.now()
+    simulation.save(update_fields=['results', 'status', 'error_message', 'completed_at'])
+
+
+@shared_task
+def predict_open_tasks(company_id=None, project_id=None, chunk_size=2000):
+    """
+    Refresh TaskPrediction rows for every open task.
+    
+    Without a company or project this fans out one job per company. Tasks
+    are predicted in chunks so history and workload are loaded once per chunk.
+    """
+    from tasks.models import Task
+    from users.models import Company
+    from .services import ProgressPredictor
+    
+    if company_id is None and project_id is None:
+        company_ids = list(Company.objects.values_list('id', flat=True))
+        for company_id in company_ids:
+            predict_open_tasks.delay(company_id=company_id, chunk_size=chunk_size)
+        return f"Queued predictions for {len(company_ids)} companies"
+    
+    tasks = Task.objects.exclude(status='completed').order_by('id')
+    if company_id is not None:
+        tasks = tasks.filter(project__company_id=company_id)
+    if project_id is not None:
+        tasks = tasks.filter(project_id=project_id)
+    
+    predictor = ProgressPredictor()
+    stored = 0
+    last_id = 0
+    while True:
+        chunk = list(tasks.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        stored += predictor.refresh_predictions(chunk)
+        last_id = chunk[-1].id
+    
+    return f"Stored {stored} task predictions"
+
+
+@shared_task
+def train_completion_models(company_id=None, force=False):
+    """
+    Retrain per-company completion-time models.
+    
+    Without a company this fans out one job per company. A company is only
+    retrained when tasks have been completed since its current model, unless
+    ``force`` is set.
+    """
+    from users.models import Company
+    from .completion_model import train_company_model
+    
+    if company_id is None:
+        company_ids = list(Company.objects.values_list('id', flat=True))
+        for company_id in company_ids:
+            train_completion_models.delay(company_id=company_id, force=force)
+        return f"Queued model training for {len(company_ids)} companies"
+    
+    artifact = train_company_model(company_id, force=force)
+    if artifact is None:
+        return f"Company {company_id}: model unchanged"
+    return f"Company {company_id}: trained {artifact['version']} (MAE {artifact['mae_days']:.2f} days)"
+
+
+@shared_task
+def generate_weekly_summaries(company_id=None, week_start=None):
+    """
+    Generate last week's WeeklySummary for every user.
+    
+    Without a company this fans out one job per company. ``week_start`` is
+    an ISO date and defaults to the Monday of last week.
+    """
+    from datetime import date
+    from users.models import Company
+    from .services import SummaryGenerator
+    
+    if company_id is None:
+        company_ids = list(Company.objects.values_list('id', flat=True))
+        for company_id in company_ids:
+            generate_weekly_summaries.delay(company_id=company_id, week_start=week_start)
+        return f"Queued weekly summaries for {len(company_ids)} companies"
+    
+    company = Company.objects.get(id=company_id)
+    stored = SummaryGenerator.generate_company_summaries(
+        company, date.fromisoformat(week_start) if week_start else None
+    )
+    return f"Stored {stored} weekly summaries for {company.name}"
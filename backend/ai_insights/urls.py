@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     TaskPredictionViewSet, TaskRecommendationViewSet,
     WeeklySummaryViewSet, AnomalyDetectionViewSet,
-    AIInsightsDashboardView
+    ScheduleSimulationViewSet, AIInsightsDashboardView
 )
 
 router = DefaultRouter()
@@ -11,6 +11,7 @@ router.register(r'predictions', TaskPredictionViewSet, basename='prediction')
 router.register(r'recommendations', TaskRecommendationViewSet, basename='recommendation')
 router.register(r'summaries', WeeklySummaryViewSet, basename='summary')
 router.register(r'anomalies', AnomalyDetectionViewSet, basename='anomaly')
+router.register(r'schedule-simulations', ScheduleSimulationViewSet, basename='schedule-simulation')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -3,11 +3,17 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db import transaction
 from django.utils import timezone
-from .models import TaskPrediction, TaskRecommendation, WeeklySummary, AnomalyDetection
+from datetime import timedelta
+from .models import (
+    TaskPrediction, TaskRecommendation, WeeklySummary, AnomalyDetection,
+    ScheduleSimulation,
+)
 from .serializers import (
     TaskPredictionSerializer, TaskRecommendationSerializer,
-    WeeklySummarySerializer, AnomalyDetectionSerializer
+    WeeklySummarySerializer, AnomalyDetectionSerializer,
+    ScheduleSimulationSerializer,
 )
 from .services import (
     TaskAssignmentRecommender, ProgressPredictor,
@@ -26,31 +32,37 @@ class TaskPredictionViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return TaskPrediction.objects.filter(
             task__project__company=self.request.user.company
-        )
+        ).select_related('task')
     
     @action(detail=False, methods=['post'])
     def predict(self, request):
-        """Generate prediction for a specific task."""
+        """Return the prediction for a task, regenerating it if stale."""
         task_id = request.data.get('task_id')
         try:
             task = Task.objects.get(id=task_id, project__company=request.user.company)
         except Task.DoesNotExist:
             return Response({'detail': 'Task not found'}, status=404)
         
-        predictor = ProgressPredictor()
-        prediction_data = predictor.predict_completion(task)
-        
-        # Save prediction
-        prediction = TaskPrediction.objects.create(
-            task=task,
-            predicted_completion_date=prediction_data['predicted_date'],
-            confidence_score=prediction_data['confidence'],
-            estimated_hours_remaining=prediction_data.get('estimated_hours_remaining'),
-            risk_score=prediction_data['risk_score'],
-            risk_factors=prediction_data['risk_factors']
-        )
+        prediction = TaskPrediction.objects.filter(task=task).select_related('task').first()
+        if prediction is None or prediction.is_stale:
+            ProgressPredictor().refresh_predictions([task])
+            prediction = TaskPrediction.objects.select_related('task').get(task=task)
         
         return Response(TaskPredictionSerializer(prediction).data)
+    
+    @action(detail=False, methods=['post'])
+    def refresh(self, request):
+        """Queue a batch refresh of predictions for the company's open tasks."""
+        from projects.models import Project
+        from .tasks import predict_open_tasks
+        
+        project_id = request.data.get('project_id')
+        if project_id and not Project.objects.filter(id=project_id, company=request.user.company).exists():
+            return Response({'detail': 'Project not found'}, status=404)
+        
+        predict_open_tasks.delay(company_id=request.user.company_id, project_id=project_id or None)
+        
+        return Response({'detail': 'Prediction refresh queued'}, status=202)
 
 
 class TaskRecommendationViewSet(viewsets.ModelViewSet):
@@ -134,23 +146,24 @@ class WeeklySummaryViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['post'])
     def generate(self, request):
-        """Generate a new weekly summary."""
-        generator = SummaryGenerator(request.user)
-        summary_data = generator.generate_weekly_summary()
-        
-        summary, created = WeeklySummary.objects.update_or_create(
-            user=request.user,
-            week_start=summary_data['week_start'],
-            defaults={
-                'company': request.user.company,
-                'week_end': summary_data['week_end'],
-                'summary_text': summary_data['summary_text'],
-                'highlights': summary_data['highlights'],
-                'concerns': summary_data['concerns'],
-                'recommendations': summary_data['recommendations'],
-                'metrics': summary_data['metrics']
-            }
-        )
+        """Return last week's summary, generating it if the weekly job has not."""
+        week_start = SummaryGenerator.last_week_start()
+        summary = WeeklySummary.objects.filter(user=request.user, week_start=week_start).first()
+        if summary is None:
+            summary_data = SummaryGenerator(request.user).generate_weekly_summary(week_start)
+            summary, created = WeeklySummary.objects.get_or_create(
+                user=request.user,
+                week_start=week_start,
+                defaults={
+                    'company': request.user.company,
+                    'week_end': summary_data['week_end'],
+                    'summary_text': summary_data['summary_text'],
+                    'highlights': summary_data['highlights'],
+                    'concerns': summary_data['concerns'],
+                    'recommendations': summary_data['recommendations'],
+                    'metrics': summary_data['metrics']
+                }
+            )
         
         return Response(WeeklySummarySerializer(summary).data)
     
@@ -177,25 +190,12 @@ class AnomalyDetectionViewSet(viewsets.ModelViewSet):
     def scan(self, request):
         """Run anomaly detection scan."""
         detector = AnomalyDetector(request.user.company)
-        anomalies_data = detector.detect_anomalies()
-        
-        created_anomalies = []
-        for data in anomalies_data:
-            anomaly = AnomalyDetection.objects.create(
-                anomaly_type=data['type'],
-                severity=data['severity'],
-                user=data.get('user'),
-                project=data.get('project'),
-                company=request.user.company,
-                title=data['title'],
-                description=data['description'],
-                suggested_actions=data['suggested_actions']
-            )
-            created_anomalies.append(anomaly)
+        created_anomalies, refreshed_anomalies = detector.save_anomalies(detector.detect_anomalies())
         
         return Response({
             'scanned_at': timezone.now(),
             'anomalies_found': len(created_anomalies),
+            'already_open': len(refreshed_anomalies),
             'anomalies': AnomalyDetectionSerializer(created_anomalies, many=True).data
         })
     
@@ -212,6 +212,60 @@ class AnomalyDetectionViewSet(viewsets.ModelViewSet):
         return Response(AnomalyDetectionSerializer(anomaly).data)
 
 
+class ScheduleSimulationViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for Monte Carlo schedule simulations."""
+    
+    permission_classes = [IsAuthenticated]
+    serializer_class = ScheduleSimulationSerializer
+    
+    # Reuse results for an unchanged dependency graph for this long
+    MAX_AGE = timedelta(hours=24)
+    
+    def get_queryset(self):
+        queryset = ScheduleSimulation.objects.filter(
+            project__company=self.request.user.company
+        ).select_related('project')
+        project_id = self.request.query_params.get('project_id')
+        if project_id:
+            queryset = queryset.filter(project_id=project_id)
+        return queryset
+    
+    @action(detail=False, methods=['post'])
+    def simulate(self, request):
+        """Queue a simulation for a project, or return a recent one for the same graph."""
+        from automation.dependency_graph import graph_version
+        from projects.models import Project
+        from .tasks import run_schedule_simulation
+        
+        try:
+            project = Project.objects.get(id=request.data.get('project_id'), company=request.user.company)
+        except (Project.DoesNotExist, ValueError, TypeError):
+            return Response({'detail': 'Project not found'}, status=404)
+        
+        try:
+            trials = min(20000, max(100, int(request.data.get('trials', 5000))))
+        except (TypeError, ValueError):
+            return Response({'detail': 'trials must be an integer'}, status=400)
+        
+        version = graph_version(project.id)
+        simulation = ScheduleSimulation.objects.filter(
+            project=project,
+            trials=trials,
+            graph_version=version,
+            status__in=['pending', 'running', 'completed'],
+            created_at__gte=timezone.now() - self.MAX_AGE
+        ).first()
+        if simulation:
+            return Response(ScheduleSimulationSerializer(simulation).data)
+        
+        simulation = ScheduleSimulation.objects.create(
+            project=project, trials=trials, graph_version=version
+        )
+        transaction.on_commit(lambda: run_schedule_simulation.delay(simulation.id))
+        
+        return Response(ScheduleSimulationSerializer(simulation).data, status=202)
+
+
 class AIInsightsDashboardView(APIView):
     """Dashboard view for AI insights."""
     
@@ -111,6 +111,40 @@ def task_post_save(sender, instance, created, **kwargs):
             pass
 
 
+def log_task_assignments(tasks, old_states, company, user=None):
+    """
+    Bulk version of task_post_save's 'assign' entries, for tasks assigned
+    with bulk_update. ``old_states`` maps task id to serialize_instance()
+    taken before the change; ``user`` defaults to each task's creator, as
+    in the signal.
+    """
+    content_type = ContentType.objects.get_for_model(Task)
+    entries = []
+    for task in tasks:
+        actor = user or task.created_by
+        if not actor:
+            continue
+        old_state = old_states.get(task.pk, {})
+        new_state = serialize_instance(task)
+        entries.append(AuditLog(
+            user=actor,
+            user_email=actor.email,
+            user_name=actor.name,
+            company=company,
+            content_type=content_type,
+            object_id=str(task.pk),
+            object_repr=str(task),
+            action='assign',
+            action_category='task_assignment',
+            changes=get_model_diff(old_state, new_state),
+            old_values=old_state,
+            new_values=new_state,
+            message=f"Task '{task.title}' was assigned",
+        ))
+    AuditLog.objects.bulk_create(entries, batch_size=500)
+    return entries
+
+
 @receiver(post_delete, sender=Task)
 def task_post_delete(sender, instance, **kwargs):
     try:
@@ -3,7 +3,7 @@ Admin configuration for automation models.
 """
 from django.contrib import admin
 from .models import (
-    Workflow, WorkflowCondition, WorkflowAction, WorkflowExecution,
+    Workflow, WorkflowCondition, WorkflowAction, WorkflowExecution, WorkflowExecutionDailyStats,
     TaskDependency, DependencyBottleneck,
     EscalationRule, Escalation,
     CalendarEvent, ScheduleSuggestion,
@@ -41,10 +41,17 @@ class WorkflowAdmin(admin.ModelAdmin):
 
 @admin.register(WorkflowExecution)
 class WorkflowExecutionAdmin(admin.ModelAdmin):
-    list_display = ['workflow', 'status', 'started_at', 'completed_at']
+    list_display = ['workflow', 'status', 'queue_latency_ms', 'started_at', 'completed_at']
     list_filter = ['status', 'workflow']
 
 
+@admin.register(WorkflowExecutionDailyStats)
+class WorkflowExecutionDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['workflow', 'date', 'total', 'completed', 'failed', 'skipped', 'avg_duration_ms']
+    list_filter = ['workflow']
+    date_hierarchy = 'date'
+
+
 # ============================================================================
 # DEPENDENCY ADMIN
 # ============================================================================
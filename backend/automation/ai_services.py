@@ -2,9 +2,12 @@
 Advanced AI services for resource allocation, burnout detection, and predictions.
 """
 from django.utils import timezone
-from django.db.models import Avg, Sum, Count, Q
-from datetime import timedelta
+from django.db.models import Avg, Sum, Count, Q, F, Value, DurationField, ExpressionWrapper
+from django.db.models.functions import Coalesce, TruncWeek
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
 import statistics
+import numpy as np
 
 
 class BurnoutDetectionService:
@@ -27,226 +30,188 @@ class BurnoutDetectionService:
         Analyze burnout risk for a user over the past N days.
         Returns a BurnoutIndicator with risk level and factors.
         """
-        from .models import BurnoutIndicator, WorkloadSnapshot
-        from analytics.models import TimeEntry
-        from tasks.models import Task
-        from progress.models import ProgressUpdate
+        return self.analyze_users([self.user], days=days)[0]
+    
+    @classmethod
+    def analyze_users(cls, users, days=30):
+        """
+        Analyze burnout risk for many users at once.
         
+        Metrics come from one grouped query per source for all users, risk
+        scores are computed as arrays, and indicators and manager
+        notifications are inserted in bulk. Returns the indicators in the
+        order of ``users``.
+        """
+        from .models import BurnoutIndicator
+        
+        users = list(users)
+        if not users:
+            return []
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days)
         
-        # Gather metrics
-        metrics = self._calculate_metrics(start_date, end_date)
-        
-        # Calculate risk score
-        risk_score = self._calculate_risk_score(metrics)
-        
-        # Determine risk level
-        risk_level = self._determine_risk_level(risk_score)
-        
-        # Generate recommendations
-        recommendations = self._generate_recommendations(metrics, risk_level)
-        
-        # Create or update indicator
-        indicator = BurnoutIndicator.objects.create(
-            user=self.user,
-            risk_level=risk_level,
-            risk_score=risk_score,
-            factors=metrics,
-            avg_hours_per_week=metrics.get('avg_hours_per_week', 0),
-            consecutive_overtime_weeks=metrics.get('consecutive_overtime_weeks', 0),
-            tasks_overdue=metrics.get('overdue_tasks', 0),
-            no_break_days=metrics.get('no_break_days', 0),
-            meeting_hours=metrics.get('total_meeting_hours', 0),
-            progress_update_sentiment=metrics.get('avg_sentiment', 0),
-            recommendations=recommendations
-        )
+        # Gather metrics and calculate risk scores
+        columns = cls._calculate_metrics([user.id for user in users], start_date, end_date)
+        scores = cls._calculate_risk_scores(columns)
+        
+        indicators = []
+        for i, user in enumerate(users):
+            metrics = {name: values[i].item() for name, values in columns.items()}
+            risk_score = scores[i].item()
+            risk_level = cls(user)._determine_risk_level(risk_score)
+            indicators.append(BurnoutIndicator(
+                user=user,
+                risk_level=risk_level,
+                risk_score=risk_score,
+                factors=metrics,
+                avg_hours_per_week=metrics['avg_hours_per_week'],
+                consecutive_overtime_weeks=metrics['consecutive_overtime_weeks'],
+                tasks_overdue=metrics['overdue_tasks'],
+                no_break_days=metrics['no_break_days'],
+                meeting_hours=metrics['total_meeting_hours'],
+                progress_update_sentiment=metrics['avg_sentiment'],
+                recommendations=cls(user)._generate_recommendations(metrics, risk_level)
+            ))
         
         # Notify manager if high risk
-        if risk_level in ['high', 'critical'] and not indicator.manager_notified:
-            self._notify_manager(indicator)
+        notify = [
+            indicator for indicator in indicators
+            if indicator.risk_level in ['high', 'critical'] and indicator.user.manager_id
+        ]
+        now = timezone.now()
+        for indicator in notify:
+            indicator.manager_notified = True
+            indicator.manager_notified_at = now
         
-        return indicator
+        BurnoutIndicator.objects.bulk_create(indicators, batch_size=500)
+        cls._notify_managers(notify)
+        
+        return indicators
     
-    def _calculate_metrics(self, start_date, end_date):
-        """Calculate all metrics for burnout analysis."""
+    @staticmethod
+    def _calculate_metrics(user_ids, start_date, end_date):
+        """Calculate all metrics for burnout analysis, as arrays aligned with ``user_ids``."""
         from analytics.models import TimeEntry
         from tasks.models import Task
         from progress.models import ProgressUpdate
+        from .models import CalendarEvent
+        
+        index = {user_id: i for i, user_id in enumerate(user_ids)}
+        size = len(user_ids)
         
-        metrics = {}
+        # Weekly hours, one column per calendar week overlapping the period
+        first_week = start_date - timedelta(days=start_date.weekday())
+        week_count = (end_date - first_week).days // 7 + 1
+        weekly_hours = np.zeros((size, week_count))
         
-        # Time entries
         time_entries = TimeEntry.objects.filter(
-            user=self.user,
+            user_id__in=user_ids,
             start_time__date__gte=start_date,
             start_time__date__lte=end_date
         )
+        for user_id, week, minutes in time_entries.annotate(
+            week=TruncWeek('start_time')
+        ).values_list('user_id', 'week').annotate(total=Sum('duration_minutes')).order_by():
+            week_index = (timezone.localtime(week).date() - first_week).days // 7
+            weekly_hours[index[user_id], week_index] = (minutes or 0) / 60
         
-        total_hours = time_entries.aggregate(
-            total=Sum('duration_minutes')
-        )['total'] or 0
-        total_hours = total_hours / 60
-        
+        total_hours = weekly_hours.sum(axis=1)
         weeks = (end_date - start_date).days / 7
-        avg_hours_per_week = total_hours / max(1, weeks)
-        
-        metrics['total_hours'] = total_hours
-        metrics['avg_hours_per_week'] = avg_hours_per_week
         
         # Calculate overtime weeks
-        overtime_weeks = 0
-        consecutive_overtime = 0
-        max_consecutive = 0
-        
-        current_date = start_date
-        while current_date < end_date:
-            week_end = current_date + timedelta(days=7)
-            week_hours = time_entries.filter(
-                start_time__date__gte=current_date,
-                start_time__date__lt=week_end
-            ).aggregate(total=Sum('duration_minutes'))['total'] or 0
-            week_hours = week_hours / 60
-            
-            if week_hours > 45:  # Overtime threshold
-                overtime_weeks += 1
-                consecutive_overtime += 1
-                max_consecutive = max(max_consecutive, consecutive_overtime)
-            else:
-                consecutive_overtime = 0
-            
-            current_date = week_end
-        
-        metrics['overtime_weeks'] = overtime_weeks
-        metrics['consecutive_overtime_weeks'] = max_consecutive
-        
-        # Days without breaks
-        work_days = time_entries.values('start_time__date').annotate(
-            hours=Sum('duration_minutes')
-        ).filter(hours__gt=480)  # > 8 hours
-        
-        no_break_days = work_days.count()
-        metrics['no_break_days'] = no_break_days
+        overtime = weekly_hours > 45  # Overtime threshold
+        consecutive = np.zeros(size)
+        max_consecutive = np.zeros(size)
+        for week_index in range(week_count):
+            consecutive = np.where(overtime[:, week_index], consecutive + 1, 0)
+            np.maximum(max_consecutive, consecutive, out=max_consecutive)
+        
+        # Days without breaks (> 8 hours)
+        no_break_days = np.zeros(size)
+        for row in time_entries.values('user_id', 'start_time__date').annotate(
+            minutes=Sum('duration_minutes')
+        ).filter(minutes__gt=480).order_by():
+            no_break_days[index[row['user_id']]] += 1
         
         # Task metrics
-        tasks = Task.objects.filter(assigned_to=self.user)
-        
-        active_tasks = tasks.filter(status__in=['open', 'in_progress']).count()
-        overdue_tasks = tasks.filter(
-            deadline__lt=timezone.now(),
-            status__in=['open', 'in_progress', 'blocked']
-        ).count()
-        blocked_tasks = tasks.filter(status='blocked').count()
-        
-        metrics['active_tasks'] = active_tasks
-        metrics['overdue_tasks'] = overdue_tasks
-        metrics['blocked_tasks'] = blocked_tasks
-        
-        # Progress update frequency
-        updates = ProgressUpdate.objects.filter(
-            user=self.user,
+        active_tasks, overdue_tasks, blocked_tasks = np.zeros(size), np.zeros(size), np.zeros(size)
+        for user_id, active, overdue, blocked in Task.objects.filter(
+            assigned_to_id__in=user_ids
+        ).values_list('assigned_to_id').annotate(
+            active=Count('id', filter=Q(status__in=['open', 'in_progress'])),
+            overdue=Count('id', filter=Q(
+                deadline__lt=timezone.now(),
+                status__in=['open', 'in_progress', 'blocked']
+            )),
+            blocked=Count('id', filter=Q(status='blocked')),
+        ).order_by():
+            i = index[user_id]
+            active_tasks[i], overdue_tasks[i], blocked_tasks[i] = active, overdue, blocked
+        
+        # Progress update frequency and stored sentiment
+        progress_updates, avg_sentiment = np.zeros(size), np.zeros(size)
+        for user_id, count, sentiment in ProgressUpdate.objects.filter(
+            user_id__in=user_ids,
             created_at__date__gte=start_date,
             created_at__date__lte=end_date
-        )
-        metrics['progress_updates'] = updates.count()
-        
-        # Sentiment analysis (simplified)
-        avg_sentiment = self._analyze_sentiment(updates)
-        metrics['avg_sentiment'] = avg_sentiment
+        ).values_list('user_id').annotate(count=Count('id'), sentiment=Avg('sentiment_score')).order_by():
+            progress_updates[index[user_id]] = count
+            avg_sentiment[index[user_id]] = sentiment or 0.0
         
         # Meeting hours (if calendar events exist)
-        from .models import CalendarEvent
-        meetings = CalendarEvent.objects.filter(
-            user=self.user,
+        meeting_hours = np.zeros(size)
+        for user_id, duration in CalendarEvent.objects.filter(
+            user_id__in=user_ids,
             event_type='meeting',
             start_time__date__gte=start_date,
             start_time__date__lte=end_date
-        )
-        meeting_minutes = 0
-        for meeting in meetings:
-            if meeting.end_time:
-                delta = meeting.end_time - meeting.start_time
-                meeting_minutes += delta.total_seconds() / 60
-        
-        metrics['total_meeting_hours'] = meeting_minutes / 60
-        
-        return metrics
-    
-    def _analyze_sentiment(self, updates):
-        """
-        Simple sentiment analysis on progress updates.
-        Returns score from -1 (negative) to 1 (positive).
-        """
-        if not updates.exists():
-            return 0.0
-        
-        positive_words = [
-            'completed', 'done', 'finished', 'great', 'good', 'excellent',
-            'progress', 'achieved', 'success', 'ahead', 'smooth'
-        ]
-        negative_words = [
-            'blocked', 'stuck', 'issue', 'problem', 'delayed', 'difficult',
-            'challenge', 'failed', 'behind', 'overdue', 'struggle', 'frustrated'
-        ]
-        
-        total_score = 0
-        count = 0
-        
-        for update in updates:
-            text = (update.work_done + ' ' + update.blockers).lower()
-            
-            positive_count = sum(1 for word in positive_words if word in text)
-            negative_count = sum(1 for word in negative_words if word in text)
-            
-            if positive_count + negative_count > 0:
-                score = (positive_count - negative_count) / (positive_count + negative_count)
-                total_score += score
-                count += 1
-        
-        return total_score / max(1, count)
+        ).values_list('user_id').annotate(
+            duration=Sum(ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField()))
+        ).order_by():
+            if duration:
+                meeting_hours[index[user_id]] = duration.total_seconds() / 3600
+        
+        return {
+            'total_hours': total_hours,
+            'avg_hours_per_week': total_hours / max(1, weeks),
+            'overtime_weeks': overtime.sum(axis=1),
+            'consecutive_overtime_weeks': max_consecutive.astype(int),
+            'no_break_days': no_break_days.astype(int),
+            'active_tasks': active_tasks.astype(int),
+            'overdue_tasks': overdue_tasks.astype(int),
+            'blocked_tasks': blocked_tasks.astype(int),
+            'progress_updates': progress_updates.astype(int),
+            'avg_sentiment': avg_sentiment,
+            'total_meeting_hours': meeting_hours,
+        }
     
-    def _calculate_risk_score(self, metrics):
-        """Calculate overall risk score (0-100)."""
-        score = 0
-        
+    @staticmethod
+    def _calculate_risk_scores(metrics):
+        """Calculate overall risk scores (0-100) from metric arrays."""
         # Overtime factor (max 25 points)
-        avg_hours = metrics.get('avg_hours_per_week', 40)
-        if avg_hours > 50:
-            score += 25
-        elif avg_hours > 45:
-            score += 15
-        elif avg_hours > 40:
-            score += 5
+        avg_hours = metrics['avg_hours_per_week']
+        score = np.select([avg_hours > 50, avg_hours > 45, avg_hours > 40], [25, 15, 5], 0).astype(float)
         
         # Consecutive overtime (max 20 points)
-        consecutive = metrics.get('consecutive_overtime_weeks', 0)
-        score += min(20, consecutive * 5)
+        score += np.minimum(20, metrics['consecutive_overtime_weeks'] * 5)
         
         # No break days (max 15 points)
-        no_breaks = metrics.get('no_break_days', 0)
-        score += min(15, no_breaks * 2)
+        score += np.minimum(15, metrics['no_break_days'] * 2)
         
         # Overdue tasks (max 15 points)
-        overdue = metrics.get('overdue_tasks', 0)
-        score += min(15, overdue * 3)
+        score += np.minimum(15, metrics['overdue_tasks'] * 3)
         
         # Blocked tasks (max 10 points)
-        blocked = metrics.get('blocked_tasks', 0)
-        score += min(10, blocked * 2)
+        score += np.minimum(10, metrics['blocked_tasks'] * 2)
         
         # Negative sentiment (max 10 points)
-        sentiment = metrics.get('avg_sentiment', 0)
-        if sentiment < -0.3:
-            score += 10
-        elif sentiment < 0:
-            score += 5
+        sentiment = metrics['avg_sentiment']
+        score += np.select([sentiment < -0.3, sentiment < 0], [10, 5], 0)
         
-        # Meeting overload (max 5 points)
-        meeting_hours = metrics.get('total_meeting_hours', 0)
-        if meeting_hours > 20:  # > 20 hours of meetings per period
-            score += 5
+        # Meeting overload (max 5 points), > 20 hours of meetings per period
+        score += np.where(metrics['total_meeting_hours'] > 20, 5, 0)
         
-        return min(100, score)
+        return np.minimum(100, score)
     
     def _determine_risk_level(self, score):
         """Determine risk level from score."""
@@ -320,26 +285,23 @@ class BurnoutDetectionService:
         
         return recommendations
     
-    def _notify_manager(self, indicator):
-        """Notify manager about high burnout risk."""
+    @staticmethod
+    def _notify_managers(indicators):
+        """Notify managers about high burnout risk."""
         from users.models import Notification
         
-        if not self.user.manager:
-            return
-        
-        Notification.objects.create(
-            user=self.user.manager,
-            notification_type='reminder',
-            title=f'Burnout Risk Alert: {self.user.name}',
-            message=f'{self.user.name} has a {indicator.risk_level} burnout risk score. '
-                    f'Consider checking in with them about their workload.',
-            link=f'/analytics/burnout/{indicator.id}',
-            priority='high' if indicator.risk_level == 'critical' else 'normal'
-        )
-        
-        indicator.manager_notified = True
-        indicator.manager_notified_at = timezone.now()
-        indicator.save()
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=indicator.user.manager_id,
+                notification_type='reminder',
+                title=f'Burnout Risk Alert: {indicator.user.name}',
+                message=f'{indicator.user.name} has a {indicator.risk_level} burnout risk score. '
+                        f'Consider checking in with them about their workload.',
+                link=f'/analytics/burnout/{indicator.id}',
+                priority='high' if indicator.risk_level == 'critical' else 'normal'
+            )
+            for indicator in indicators
+        ])
 
 
 class ResourceAllocationService:
@@ -347,61 +309,72 @@ class ResourceAllocationService:
     AI service for optimal resource allocation and workload distribution.
     """
     
+    # Hours assumed for a task without an estimate
+    DEFAULT_TASK_HOURS = 4
+    
     def __init__(self, company):
         self.company = company
+        self._workload_cache = {}
     
     def generate_suggestions(self):
-        """Generate resource allocation suggestions."""
+        """
+        Generate resource allocation suggestions.
+        
+        Pending and upcoming hours for every user come from two grouped
+        queries, and all suggestions are derived from those vectors. Still-open
+        suggestions for the same task or user are not repeated. Returns the
+        newly created suggestions.
+        """
         from .models import ResourceAllocationSuggestion
-        from tasks.models import Task
-        from users.models import User
         
         suggestions = []
+        users, pending, _ = self._workloads()
+        pending = pending.copy()
+        position = {user.id: i for i, user in enumerate(users)}
         
-        # 1. Find overloaded users
+        # 1. Find overloaded users and move their open low-priority tasks to
+        # whoever has the least pending work, counting earlier moves
         overloaded = self._find_overloaded_users()
+        reassignable = self._get_reassignable_tasks([user for user, _ in overloaded])
         for user, workload in overloaded:
-            underloaded = self._find_underloaded_users(exclude=[user])
-            if underloaded:
-                target_user = underloaded[0][0]
-                tasks_to_reassign = self._get_reassignable_tasks(user)
-                
-                for task in tasks_to_reassign[:2]:  # Suggest max 2 reassignments
-                    suggestion = ResourceAllocationSuggestion.objects.create(
-                        company=self.company,
-                        suggestion_type='reassign',
-                        task=task,
-                        from_user=user,
-                        to_user=target_user,
-                        reason=f'{user.name} is overloaded ({workload:.0f}h pending). '
-                               f'{target_user.name} has capacity ({underloaded[0][1]:.0f}h pending).',
-                        impact_score=self._calculate_reassign_impact(task, user, target_user),
-                        confidence_score=0.8,
-                        supporting_data={
-                            'from_workload': workload,
-                            'to_workload': underloaded[0][1],
-                            'task_estimated_hours': task.estimated_hours or 0
-                        }
-                    )
-                    suggestions.append(suggestion)
+            for task in reassignable.get(user.id, [])[:2]:  # Suggest max 2 reassignments
+                candidates = np.flatnonzero((pending < 20) & (np.arange(len(users)) != position[user.id]))
+                if not len(candidates):
+                    break
+                target = candidates[np.argmin(pending[candidates])]
+                target_user, target_workload = users[target], float(pending[target])
+                suggestions.append(ResourceAllocationSuggestion(
+                    company=self.company,
+                    suggestion_type='reassign',
+                    task=task,
+                    from_user=user,
+                    to_user=target_user,
+                    reason=f'{user.name} is overloaded ({workload:.0f}h pending). '
+                           f'{target_user.name} has capacity ({target_workload:.0f}h pending).',
+                    impact_score=self._calculate_reassign_impact(task, user, target_user),
+                    confidence_score=0.8,
+                    supporting_data={
+                        'from_workload': workload,
+                        'to_workload': target_workload,
+                        'task_estimated_hours': task.estimated_hours or 0
+                    }
+                ))
+                pending[target] += task.estimated_hours or self.DEFAULT_TASK_HOURS
         
         # 2. Find skill gaps
-        skill_gaps = self._detect_skill_gaps()
-        for gap in skill_gaps:
-            suggestion = ResourceAllocationSuggestion.objects.create(
+        for gap in self._detect_skill_gaps():
+            suggestions.append(ResourceAllocationSuggestion(
                 company=self.company,
                 suggestion_type='skill_gap',
                 reason=gap['description'],
                 impact_score=gap['impact'],
                 confidence_score=gap['confidence'],
                 supporting_data=gap
-            )
-            suggestions.append(suggestion)
+            ))
         
         # 3. Predict overload
-        future_overloads = self._predict_future_overload()
-        for user, predicted_hours in future_overloads:
-            suggestion = ResourceAllocationSuggestion.objects.create(
+        for user, predicted_hours in self._predict_future_overload():
+            suggestions.append(ResourceAllocationSuggestion(
                 company=self.company,
                 suggestion_type='overload',
                 from_user=user,
@@ -413,68 +386,274 @@ class ResourceAllocationService:
                     'predicted_hours': predicted_hours,
                     'capacity': 40
                 }
-            )
-            suggestions.append(suggestion)
+            ))
+        
+        # Skip suggestions that are still open from an earlier run
+        open_keys = set(ResourceAllocationSuggestion.objects.filter(
+            company=self.company,
+            is_applied=False,
+            is_dismissed=False
+        ).values_list('suggestion_type', 'task_id', 'from_user_id'))
+        new_suggestions = [
+            suggestion for suggestion in suggestions
+            if (suggestion.suggestion_type, suggestion.task_id, suggestion.from_user_id) not in open_keys
+        ]
         
-        return suggestions
+        return ResourceAllocationSuggestion.objects.bulk_create(new_suggestions)
+    
+    def _workloads(self, days_ahead=7):
+        """
+        Active users with their pending hours and hours due in the next
+        ``days_ahead`` days, as ``(users, pending, upcoming)`` arrays.
+        """
+        if days_ahead not in self._workload_cache:
+            from tasks.models import Task
+            from users.models import User
+            
+            users = list(User.objects.filter(company=self.company, is_active=True).order_by('id'))
+            index = {user.id: i for i, user in enumerate(users)}
+            hours = Sum(Coalesce('estimated_hours', Value(float(self.DEFAULT_TASK_HOURS))))
+            pending_tasks = Task.objects.filter(
+                assigned_to_id__in=index,
+                status__in=['open', 'in_progress']
+            )
+            
+            pending = np.zeros(len(users))
+            for user_id, total in pending_tasks.values_list('assigned_to_id').annotate(total=hours).order_by():
+                pending[index[user_id]] = total
+            
+            # Tasks with deadline in next N days
+            upcoming = np.zeros(len(users))
+            for user_id, total in pending_tasks.filter(
+                deadline__lte=timezone.now() + timedelta(days=days_ahead)
+            ).values_list('assigned_to_id').annotate(total=hours).order_by():
+                upcoming[index[user_id]] = total
+            
+            self._workload_cache[days_ahead] = (users, pending, upcoming)
+        return self._workload_cache[days_ahead]
     
     def _find_overloaded_users(self, threshold_hours=50):
         """Find users with too much pending work."""
+        users, pending, _ = self._workloads()
+        order = np.argsort(-pending, kind='stable')
+        return [(users[i], float(pending[i])) for i in order if pending[i] > threshold_hours]
+    
+    def _get_reassignable_tasks(self, users, limit=5):
+        """Get tasks that can be reassigned from each user, as ``{user_id: [task, ...]}``."""
         from tasks.models import Task
-        from users.models import User
         
-        users = User.objects.filter(company=self.company, is_active=True)
-        overloaded = []
+        reassignable = defaultdict(list)
+        # Get tasks that are not yet started and not urgent
+        for task in Task.objects.filter(
+            assigned_to__in=users,
+            status='open',  # Not started
+            priority__in=['low', 'medium']
+        ).order_by('priority', 'deadline'):
+            if len(reassignable[task.assigned_to_id]) < limit:
+                reassignable[task.assigned_to_id].append(task)
+        return reassignable
+    
+    # Order in which tasks with the same deadline are planned
+    PRIORITY_ORDER = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+    
+    # Furthest deadline, in days, that capacity is projected to
+    MAX_PLANNING_DAYS = 365
+    
+    def plan_assignments(self, project=None, horizon_days=14):
+        """
+        Propose assignees for all unassigned open tasks of the company or project.
+        
+        Tasks are planned earliest deadline first, then by priority. Each
+        task goes to the candidate with the best assignment score (as in
+        TaskAssignmentRecommender, with workload replaced by utilization)
+        among those whose pending hours plus the task still fit in their
+        capacity before its deadline, or within ``horizon_days`` (at most
+        MAX_PLANNING_DAYS) when it has none. Capacity comes from
+        resources.UserCapacity (40h/week by default) less time off.
+        Nothing is saved; pass ``plan['assignments']`` to apply_assignments.
+        """
+        from ai_insights.services import AssigneeFeatures, TaskAssignmentRecommender
+        from tasks.models import Task
         
-        for user in users:
-            pending_tasks = Task.objects.filter(
-                assigned_to=user,
-                status__in=['open', 'in_progress']
-            )
+        horizon_days = min(max(1, horizon_days), self.MAX_PLANNING_DAYS)
+        now = timezone.now()
+        tasks = Task.objects.filter(
+            project__company=self.company,
+            assigned_to__isnull=True,
+            status='open'
+        )
+        if project is not None:
+            tasks = tasks.filter(project=project)
+        tasks = sorted(tasks, key=lambda t: (
+            t.deadline is None, t.deadline or now, self.PRIORITY_ORDER.get(t.priority, 2), t.id
+        ))
+        
+        features = AssigneeFeatures(self.company)
+        plan = {'assignments': [], 'unassigned': [], 'utilization': []}
+        if not tasks:
+            return plan
+        if not features.user_ids:
+            plan['unassigned'] = [
+                {'task_id': task.id, 'task_title': task.title, 'reason': 'No eligible assignees'}
+                for task in tasks
+            ]
+            return plan
+        
+        users, pending, _ = self._workloads()
+        position = {user.id: i for i, user in enumerate(users)}
+        candidates = [users[position[user_id]] for user_id in features.user_ids]
+        load = np.array([pending[position[user.id]] for user in candidates])
+        planned = np.zeros(len(candidates))
+        
+        # Days from today to each task's deadline (at least 1), or the horizon
+        today = timezone.localdate()
+        windows = [
+            min(self.MAX_PLANNING_DAYS, max(1, (timezone.localtime(task.deadline).date() - today).days))
+            if task.deadline else horizon_days
+            for task in tasks
+        ]
+        capacity = self._capacity_curves(candidates, today, max(max(windows), horizon_days))
+        
+        weights = TaskAssignmentRecommender.WEIGHTS
+        for task, window in zip(tasks, windows):
+            hours = task.estimated_hours or self.DEFAULT_TASK_HOURS
+            available = capacity[:, window]
+            fits = load + hours <= available
+            if not fits.any():
+                plan['unassigned'].append({
+                    'task_id': task.id,
+                    'task_title': task.title,
+                    'reason': 'No candidate has capacity before the deadline' if task.deadline
+                              else f'No candidate has capacity in the next {horizon_days} days'
+                })
+                continue
             
-            total_hours = sum(t.estimated_hours or 4 for t in pending_tasks)  # Default 4 hours
+            scores = features.factor_scores(task)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores[:, 0] = np.clip(1 - (load + hours) / available, 0, 1) * 100
+            totals = np.where(fits, scores @ weights, -np.inf)
+            best = int(np.argmax(totals))
             
-            if total_hours > threshold_hours:
-                overloaded.append((user, total_hours))
+            load[best] += hours
+            planned[best] += hours
+            plan['assignments'].append({
+                'task_id': task.id,
+                'task_title': task.title,
+                'project_id': task.project_id,
+                'user_id': candidates[best].id,
+                'user_name': candidates[best].name,
+                'estimated_hours': float(hours),
+                'deadline': task.deadline,
+                'score': round(float(totals[best]), 2),
+            })
         
-        return sorted(overloaded, key=lambda x: x[1], reverse=True)
+        for i in np.flatnonzero(planned):
+            plan['utilization'].append({
+                'user_id': candidates[i].id,
+                'user_name': candidates[i].name,
+                'planned_hours': float(planned[i]),
+                'pending_hours': float(load[i]),
+                'capacity_hours': round(float(capacity[i, horizon_days]), 2),
+            })
+        return plan
     
-    def _find_underloaded_users(self, threshold_hours=20, exclude=None):
-        """Find users with capacity for more work."""
+    def _capacity_curves(self, users, start_date, days):
+        """Working hours each user has from ``start_date`` through each day offset, shape (users, days + 1)."""
+        from resources.models import UserCapacity
+        
+        index = {user.id: i for i, user in enumerate(users)}
+        weekly = np.full(len(users), 40.0)
+        off_days = np.zeros((len(users), days + 1))
+        for user_id, hours_per_week, time_off_days in UserCapacity.objects.filter(
+            user_id__in=index
+        ).values_list('user_id', 'hours_per_week', 'time_off_days'):
+            i = index[user_id]
+            weekly[i] = float(hours_per_week)
+            for day in time_off_days or []:
+                try:
+                    offset = (date.fromisoformat(str(day)[:10]) - start_date).days
+                except ValueError:
+                    continue
+                if 0 <= offset < days:
+                    off_days[i, offset + 1] += 1
+        
+        offsets = np.arange(days + 1)
+        # Spread over the calendar week; each day off removes one working day
+        return np.maximum(
+            0, weekly[:, None] / 7 * offsets - weekly[:, None] / 5 * np.cumsum(off_days, axis=1)
+        )
+    
+    def apply_assignments(self, assignments, user=None):
+        """
+        Assign tasks from a plan with one bulk update.
+        
+        ``assignments`` is a list of ``{'task_id', 'user_id'}``. Tasks that
+        have been assigned since the plan was made, or users outside the
+        company, are skipped. Returns the ids of the tasks assigned.
+        
+        bulk_update sends no Task signals, so their effects are reproduced
+        in bulk: 'assign' audit entries (by ``user``, else the task's
+        creator), graph version bumps, task_assigned workflows and, once
+        committed, task.updated webhooks and overdue notification rules.
+        """
+        from django.db import transaction
+        from audit.signals import log_task_assignments, serialize_instance
         from tasks.models import Task
         from users.models import User
+        from .dependency_graph import bump_graph_version
+        from .services import WorkflowTriggerService
         
-        exclude_ids = [u.id for u in (exclude or [])]
-        users = User.objects.filter(
+        wanted = {int(a['task_id']): int(a['user_id']) for a in assignments}
+        valid_users = set(User.objects.filter(
             company=self.company,
-            is_active=True
-        ).exclude(id__in=exclude_ids)
-        
-        underloaded = []
-        
-        for user in users:
-            pending_tasks = Task.objects.filter(
-                assigned_to=user,
-                status__in=['open', 'in_progress']
-            )
-            
-            total_hours = sum(t.estimated_hours or 4 for t in pending_tasks)
+            is_active=True,
+            id__in=set(wanted.values())
+        ).values_list('id', flat=True))
+        
+        with transaction.atomic():
+            tasks = list(Task.objects.select_for_update(of=('self',)).select_related('created_by').filter(
+                id__in=wanted,
+                project__company=self.company,
+                assigned_to__isnull=True
+            ))
+            tasks = [task for task in tasks if wanted[task.id] in valid_users]
+            old_states = {task.id: serialize_instance(task) for task in tasks}
+            now = timezone.now()
+            for task in tasks:
+                task.assigned_to_id = wanted[task.id]
+                task.updated_at = now
+            Task.objects.bulk_update(tasks, ['assigned_to', 'updated_at'], batch_size=500)
             
-            if total_hours < threshold_hours:
-                underloaded.append((user, total_hours))
-        
-        return sorted(underloaded, key=lambda x: x[1])
+            # bulk_update skips Task signals, so do their work here
+            log_task_assignments(tasks, old_states, self.company, user=user)
+            transaction.on_commit(lambda: self._notify_assignments(tasks))
+            for project_id in {task.project_id for task in tasks}:
+                bump_graph_version(project_id)
+            for task in tasks:
+                WorkflowTriggerService.enqueue(
+                    'task_assigned',
+                    task_id=task.id,
+                    old_assignee_id=None,
+                    new_assignee_id=task.assigned_to_id
+                )
+        
+        return [task.id for task in tasks]
     
-    def _get_reassignable_tasks(self, user):
-        """Get tasks that can be reassigned from user."""
+    def _notify_assignments(self, tasks):
+        """Webhooks and notification rules the Task post_save signals would have sent."""
+        from integrations.signals import task_payload, trigger_webhooks_many
+        from notifications.signals import task_saved_notification
         from tasks.models import Task
         
-        # Get tasks that are not yet started and not urgent
-        return Task.objects.filter(
-            assigned_to=user,
-            status='open',  # Not started
-            priority__in=['low', 'medium']
-        ).order_by('priority', 'deadline')[:5]
+        if not tasks:
+            return
+        trigger_webhooks_many(
+            'task.updated', [task_payload(task, 'task.updated') for task in tasks], self.company
+        )
+        for task in tasks:
+            # The notification signal only evaluates rules for an open task when it is overdue
+            if task.is_overdue:
+                task_saved_notification(Task, task, created=False)
     
     def _calculate_reassign_impact(self, task, from_user, to_user):
         """Calculate positive impact of reassignment."""
@@ -506,43 +685,25 @@ class ResourceAllocationService:
             project__company=self.company,
             assigned_to__isnull=True,
             status='open'
-        )
+        ).count()
         
-        if unassigned.count() > 5:
+        if unassigned > 5:
             gaps.append({
                 'type': 'unassigned_tasks',
-                'description': f'{unassigned.count()} tasks are unassigned. Consider hiring or training.',
-                'impact': min(100, unassigned.count() * 5),
+                'description': f'{unassigned} tasks are unassigned. Consider hiring or training.',
+                'impact': min(100, unassigned * 5),
                 'confidence': 0.9,
-                'task_count': unassigned.count()
+                'task_count': unassigned
             })
         
         return gaps
     
     def _predict_future_overload(self, days_ahead=7):
         """Predict which users will be overloaded in the future."""
-        from tasks.models import Task
-        from users.models import User
-        
-        future_date = timezone.now() + timedelta(days=days_ahead)
-        overloads = []
-        
-        users = User.objects.filter(company=self.company, is_active=True)
-        
-        for user in users:
-            # Tasks with deadline in next N days
-            upcoming_tasks = Task.objects.filter(
-                assigned_to=user,
-                status__in=['open', 'in_progress'],
-                deadline__lte=future_date
-            )
-            
-            total_hours = sum(t.estimated_hours or 4 for t in upcoming_tasks)
-            
-            if total_hours > 40:  # More than a week's work
-                overloads.append((user, total_hours))
-        
-        return sorted(overloads, key=lambda x: x[1], reverse=True)
+        users, _, upcoming = self._workloads(days_ahead)
+        order = np.argsort(-upcoming, kind='stable')
+        # More than a week's work
+        return [(users[i], float(upcoming[i])) for i in order if upcoming[i] > 40]
     
     def recommend_assignee(self, task):
         """Recommend the best user to assign a task to."""
@@ -652,6 +813,12 @@ class ResourceAllocationService:
 class CalendarSchedulingService:
     """Service for smart calendar scheduling and conflict avoidance."""
     
+    # Event types that take up time; deadlines, milestones and reminders do not
+    BUSY_EVENT_TYPES = ('meeting', 'external')
+    
+    # Working day for users without a UserCapacity row
+    DEFAULT_WORK_DAY = (time(9, 0), time(18, 0))
+    
     def __init__(self, user):
         self.user = user
     
@@ -665,8 +832,9 @@ class CalendarSchedulingService:
         
         events = CalendarEvent.objects.filter(
             user=self.user,
-            start_time__gte=start_date,
-            start_time__lte=end_date
+            event_type__in=self.BUSY_EVENT_TYPES,
+            start_time__lt=end_date,
+            end_time__gt=start_date
         ).order_by('start_time')
         
         # Find available slots
@@ -705,59 +873,128 @@ class CalendarSchedulingService:
         
         return suggestion
     
-    def _find_available_slots(self, events, start_date, end_date, duration_hours):
-        """Find available time slots."""
-        slots = []
+    def _find_available_slots(self, events, start_date, end_date, duration_hours, limit=10):
+        """Find available time slots starting on the hour, within free windows."""
+        duration = timedelta(hours=duration_hours)
+        busy = [
+            (e.start_time, e.end_time or e.start_time + timedelta(hours=1))
+            for e in events if e.event_type in self.BUSY_EVENT_TYPES
+        ]
+        busy += self._unavailable_intervals([self.user], start_date, end_date)
         
-        # Work hours: 9 AM to 6 PM
-        work_start_hour = 9
-        work_end_hour = 18
+        slots = []
+        for window_start, window_end in self._free_windows(busy, start_date, end_date, duration):
+            # Round up to the next full hour
+            current = window_start.replace(minute=0, second=0, microsecond=0)
+            if current < window_start:
+                current += timedelta(hours=1)
+            while current + duration <= window_end and len(slots) < limit:
+                slots.append({
+                    'start': current,
+                    'end': current + duration
+                })
+                current += timedelta(hours=1)
         
-        current = start_date.replace(hour=work_start_hour, minute=0, second=0)
-        if current < start_date:
-            current = start_date
+        return slots
+    
+    @classmethod
+    def find_team_availability(cls, users, duration_minutes=60, days=30, start=None, limit=None):
+        """
+        Common free windows of at least ``duration_minutes`` for all ``users``.
         
-        event_list = list(events)
-        event_idx = 0
+        Busy calendar events of the whole team are loaded in one query and,
+        together with everyone's time outside work hours, merged in a single
+        sort-and-sweep; the gaps left are free for every attendee.
+        """
+        from .models import CalendarEvent
         
-        while current < end_date:
-            # Skip non-work hours
-            if current.hour < work_start_hour:
-                current = current.replace(hour=work_start_hour, minute=0)
-            if current.hour >= work_end_hour:
-                current = current.replace(hour=work_start_hour, minute=0) + timedelta(days=1)
-                continue
-            
-            # Skip weekends
-            if current.weekday() >= 5:
-                current += timedelta(days=1)
+        users = list(users)
+        start = start or timezone.now()
+        end = start + timedelta(days=days)
+        
+        busy = list(CalendarEvent.objects.filter(
+            user__in=users,
+            event_type__in=cls.BUSY_EVENT_TYPES,
+            start_time__lt=end,
+            end_time__gt=start
+        ).values_list('start_time', 'end_time'))
+        busy += cls._unavailable_intervals(users, start, end)
+        
+        windows = cls._free_windows(busy, start, end, timedelta(minutes=duration_minutes))
+        return [
+            {
+                'start': window_start,
+                'end': window_end,
+                'duration_minutes': int((window_end - window_start).total_seconds() // 60)
+            }
+            for window_start, window_end in windows[:limit]
+        ]
+    
+    @classmethod
+    def _unavailable_intervals(cls, users, start, end):
+        """
+        Time outside work hours for any of ``users`` between start and end:
+        nights, weekends and time off, from resources.UserCapacity where set.
+        Users sharing a working day contribute its intervals once.
+        """
+        from resources.models import UserCapacity
+        
+        schedules = set()
+        days_off = set()
+        capacities = {
+            capacity.user_id: capacity
+            for capacity in UserCapacity.objects.filter(user__in=users).only(
+                'user_id', 'work_day_start', 'work_day_end', 'time_off_days'
+            )
+        }
+        for user in users:
+            capacity = capacities.get(user.id)
+            if capacity is None:
+                schedules.add(cls.DEFAULT_WORK_DAY)
                 continue
-            
-            slot_end = current + timedelta(hours=duration_hours)
-            
-            # Check if slot conflicts with any event
-            has_conflict = False
-            while event_idx < len(event_list):
-                event = event_list[event_idx]
-                if event.end_time and event.end_time <= current:
-                    event_idx += 1
+            schedules.add((capacity.work_day_start, capacity.work_day_end))
+            for day in capacity.time_off_days or []:
+                try:
+                    days_off.add(date.fromisoformat(str(day)[:10]))
+                except ValueError:
                     continue
-                if event.start_time >= slot_end:
-                    break
-                # Conflict
-                has_conflict = True
-                current = event.end_time or event.start_time + timedelta(hours=1)
-                break
-            
-            if not has_conflict and slot_end.hour <= work_end_hour:
-                slots.append({
-                    'start': current,
-                    'end': slot_end
-                })
-            
-            current += timedelta(hours=1)
         
-        return slots[:10]  # Return top 10 slots
+        tz = timezone.get_current_timezone()
+        
+        def at(day, clock):
+            return timezone.make_aware(datetime.combine(day, clock), tz)
+        
+        intervals = []
+        day = timezone.localtime(start, tz).date()
+        last_day = timezone.localtime(end, tz).date()
+        while day <= last_day:
+            next_day = day + timedelta(days=1)
+            if day.weekday() >= 5 or day in days_off:
+                intervals.append((at(day, time.min), at(next_day, time.min)))
+            else:
+                for work_start, work_end in schedules:
+                    intervals.append((at(day, time.min), at(day, work_start)))
+                    intervals.append((at(day, work_end), at(next_day, time.min)))
+            day = next_day
+        return intervals
+    
+    @staticmethod
+    def _free_windows(busy, start, end, duration):
+        """Gaps of at least ``duration`` between start and end not covered by any busy interval."""
+        windows = []
+        cursor = start
+        for busy_start, busy_end in sorted(busy):
+            if cursor >= end:
+                break
+            if busy_start > cursor:
+                window_end = min(busy_start, end)
+                if window_end - cursor >= duration:
+                    windows.append((cursor, window_end))
+            if busy_end > cursor:
+                cursor = busy_end
+        if end - cursor >= duration:
+            windows.append((cursor, end))
+        return windows
     
     def _score_time_slot(self, slot, task):
         """Score a time slot based on various factors."""
@@ -526,3 +526,10 @@ class ProjectConsumer(AsyncWebsocketConsumer):
             'type': 'progress_update',
             **event
         }))
+    
+    async def timeline_updated(self, event):
+        """Handle recalculated task deadlines."""
+        await self.send(text_data=json.dumps({
+            'type': 'timeline_updated',
+            **event
+        }))
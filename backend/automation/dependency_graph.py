@@ -0,0 +1,336 @@
+"""
+In-memory dependency graph for a project's tasks.
+
+The graph is loaded with one query for the dependency edges and one for the
+scheduling fields of the tasks they touch, then held as adjacency lists so
+timeline calculations never go back to the database per node. Tasks in
+other projects that are linked to this one are loaded as plain nodes.
+
+Results derived from a project's graph can be cached under
+``graph_version(project_id)``, which changes whenever a task or dependency
+of the project is saved or deleted.
+"""
+import uuid
+from collections import defaultdict, deque, namedtuple
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+
+Edge = namedtuple('Edge', 'predecessor_id successor_id dependency_type lag_days auto_adjust_dates')
+
+# Task fields held on each node
+NODE_FIELDS = (
+    'id', 'project_id', 'title', 'status', 'priority', 'assigned_to_id',
+    'estimated_hours', 'progress_percentage', 'deadline', 'started_at', 'completed_at',
+)
+
+# Working hours in a day when converting estimates to durations
+HOURS_PER_DAY = 8
+
+# Slack below this many days counts as zero
+SLACK_TOLERANCE = 1e-6
+
+
+class TaskNode:
+    """Scheduling fields of one task."""
+
+    __slots__ = NODE_FIELDS
+
+    def __init__(self, **fields):
+        for name in NODE_FIELDS:
+            setattr(self, name, fields.get(name))
+
+
+def successor_deadline(edge, predecessor, now):
+    """Earliest deadline the edge allows for its successor, or None."""
+    if edge.dependency_type in ('finish_to_start', 'finish_to_finish'):
+        base_date = predecessor.completed_at or predecessor.deadline
+        if base_date:
+            return base_date + timedelta(days=edge.lag_days)
+    elif edge.dependency_type == 'start_to_start':
+        base_date = predecessor.started_at or now
+        return base_date + timedelta(days=edge.lag_days)
+    return None
+
+
+def duration_days(node):
+    """Remaining duration of a task in days: 0 once completed, else its estimate."""
+    if node.status == 'completed':
+        return 0.0
+    if node.estimated_hours:
+        return node.estimated_hours / HOURS_PER_DAY
+    if node.started_at and node.deadline and node.deadline > node.started_at:
+        return (node.deadline - node.started_at).total_seconds() / 86400
+    return 1.0
+
+
+def graph_version(project_id):
+    """Opaque token that changes whenever the project's graph changes."""
+    key = f'dependency_graph_version:{project_id}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_graph_version(project_id):
+    cache.set(f'dependency_graph_version:{project_id}', uuid.uuid4().hex, None)
+
+
+class DependencyGraph:
+    """Adjacency lists over task ids with topological ordering."""
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.successors = defaultdict(list)
+        self.predecessors = defaultdict(list)
+        for edge in edges:
+            self.successors[edge.predecessor_id].append(edge)
+            self.predecessors[edge.successor_id].append(edge)
+        self._order = None
+
+    @classmethod
+    def for_project(cls, project):
+        return cls.for_projects([project.id])
+
+    @classmethod
+    def for_projects(cls, project_ids):
+        from tasks.models import Task
+        from .models import TaskDependency
+
+        edges = [
+            Edge(*row) for row in TaskDependency.objects.filter(
+                Q(predecessor__project_id__in=project_ids) | Q(successor__project_id__in=project_ids)
+            ).values_list('predecessor_id', 'successor_id', 'dependency_type', 'lag_days', 'auto_adjust_dates')
+        ]
+        linked_ids = {edge.predecessor_id for edge in edges} | {edge.successor_id for edge in edges}
+        nodes = {
+            row['id']: TaskNode(**row)
+            for row in Task.objects.filter(
+                Q(project_id__in=project_ids) | Q(id__in=linked_ids)
+            ).values(*NODE_FIELDS)
+        }
+        # Edges to tasks that vanished between the two queries are dropped
+        return cls(nodes, [e for e in edges if e.predecessor_id in nodes and e.successor_id in nodes])
+
+    @classmethod
+    def for_tasks(cls, task_ids, company_id=None):
+        """
+        Graph of the given tasks' projects, extended with any project linked
+        to them so that every path between loaded tasks is present. With
+        ``company_id``, only that company's projects are loaded.
+        """
+        from projects.models import Project
+        from tasks.models import Task
+
+        tasks = Task.objects.filter(id__in=task_ids)
+        if company_id is not None:
+            tasks = tasks.filter(project__company_id=company_id)
+        project_ids = set(tasks.values_list('project_id', flat=True))
+        while True:
+            graph = cls.for_projects(project_ids)
+            linked = {node.project_id for node in graph.nodes.values()} - project_ids
+            if company_id is not None and linked:
+                linked = set(Project.objects.filter(id__in=linked, company_id=company_id).values_list('id', flat=True))
+            if not linked:
+                return graph
+            project_ids |= linked
+
+    def add_edge(self, edge):
+        self.successors[edge.predecessor_id].append(edge)
+        self.predecessors[edge.successor_id].append(edge)
+        self._order = None
+
+    def remove_edge(self, predecessor_id, successor_id):
+        self.successors[predecessor_id] = [
+            edge for edge in self.successors[predecessor_id] if edge.successor_id != successor_id
+        ]
+        self.predecessors[successor_id] = [
+            edge for edge in self.predecessors[successor_id] if edge.predecessor_id != predecessor_id
+        ]
+        self._order = None
+
+    def has_edge(self, predecessor_id, successor_id):
+        return any(edge.successor_id == successor_id for edge in self.successors[predecessor_id])
+
+    def would_create_cycle(self, predecessor_id, successor_id):
+        """True if ``predecessor -> successor`` would close a loop."""
+        return predecessor_id == successor_id or predecessor_id in self.descendants([successor_id])
+
+    def topological_order(self):
+        """Task ids with every predecessor before its successors; tasks on a cycle are left out."""
+        if self._order is None:
+            in_degree = {task_id: len(self.predecessors[task_id]) for task_id in self.nodes}
+            queue = deque(task_id for task_id, degree in in_degree.items() if degree == 0)
+            order = []
+            while queue:
+                task_id = queue.popleft()
+                order.append(task_id)
+                for edge in self.successors[task_id]:
+                    in_degree[edge.successor_id] -= 1
+                    if in_degree[edge.successor_id] == 0:
+                        queue.append(edge.successor_id)
+            self._order = order
+        return self._order
+
+    def descendants(self, task_ids, auto_adjust_only=False):
+        """Ids reachable from ``task_ids``, including the starting tasks."""
+        seen = set(task_ids)
+        stack = list(seen)
+        while stack:
+            for edge in self.successors[stack.pop()]:
+                if auto_adjust_only and not edge.auto_adjust_dates:
+                    continue
+                if edge.successor_id not in seen:
+                    seen.add(edge.successor_id)
+                    stack.append(edge.successor_id)
+        return seen
+
+    def propagate_deadlines(self, task_ids, now=None):
+        """
+        Push deadlines forward from ``task_ids`` along auto-adjusting edges.
+
+        Each task is visited once, after all its predecessors, so it ends up
+        with the latest deadline any of them requires. Deadlines only move
+        later. Updates the nodes in place and returns ``{task_id: deadline}``
+        for the tasks that changed.
+        """
+        now = now or timezone.now()
+        affected = self.descendants(task_ids, auto_adjust_only=True)
+        changed = {}
+        for task_id in self.topological_order():
+            if task_id not in affected:
+                continue
+            node = self.nodes[task_id]
+            for edge in self.successors[task_id]:
+                if not edge.auto_adjust_dates:
+                    continue
+                new_deadline = successor_deadline(edge, node, now)
+                successor = self.nodes[edge.successor_id]
+                if new_deadline and (not successor.deadline or new_deadline > successor.deadline):
+                    successor.deadline = new_deadline
+                    changed[successor.id] = new_deadline
+        return changed
+
+    def cascade_delays(self, task_ids=None):
+        """
+        Days of knock-on delay if each task slips: ``lag_days + 1`` summed over
+        every dependency leaving the task or anything downstream of it.
+
+        Reachable sets are built once for the whole graph in reverse
+        topological order, as bitsets over topological positions, so shared
+        downstream work is neither re-walked nor double counted.
+        """
+        order = self.topological_order()
+        position = {task_id: index for index, task_id in enumerate(order)}
+        weight = [sum(edge.lag_days + 1 for edge in self.successors[task_id]) for task_id in order]
+
+        reach = [0] * len(order)
+        for index in range(len(order) - 1, -1, -1):
+            bits = 1 << index
+            for edge in self.successors[order[index]]:
+                bits |= reach[position[edge.successor_id]]
+            reach[index] = bits
+
+        def weighted_sum(bits):
+            total = 0
+            while bits:
+                low = bits & -bits
+                total += weight[low.bit_length() - 1]
+                bits ^= low
+            return total
+
+        delays = {}
+        for task_id in (self.nodes if task_ids is None else task_ids):
+            if task_id in position:
+                delays[task_id] = weighted_sum(reach[position[task_id]])
+            elif task_id in self.nodes:
+                # On a cycle: fall back to a plain walk
+                delays[task_id] = sum(
+                    edge.lag_days + 1
+                    for node_id in self.descendants([task_id])
+                    for edge in self.successors[node_id]
+                )
+        return delays
+
+    def critical_path(self):
+        """
+        Critical path method over task durations, in days from project start.
+
+        A forward pass gives each task's earliest start/finish and a
+        backward pass from the project finish its latest start/finish; all
+        four dependency types and lag days are honoured. Returns a dict with
+        the project duration, per-task schedule and slack, the critical task
+        ids in topological order, and any tasks skipped because they sit on
+        a cycle.
+        """
+        order = self.topological_order()
+        duration = {task_id: duration_days(self.nodes[task_id]) for task_id in order}
+
+        earliest_start, earliest_finish = {}, {}
+        for task_id in order:
+            start = 0.0
+            for edge in self.predecessors[task_id]:
+                if edge.predecessor_id not in earliest_start:
+                    continue
+                pred_start, pred_finish = earliest_start[edge.predecessor_id], earliest_finish[edge.predecessor_id]
+                if edge.dependency_type == 'start_to_start':
+                    start = max(start, pred_start + edge.lag_days)
+                elif edge.dependency_type == 'finish_to_finish':
+                    start = max(start, pred_finish + edge.lag_days - duration[task_id])
+                elif edge.dependency_type == 'start_to_finish':
+                    start = max(start, pred_start + edge.lag_days - duration[task_id])
+                else:
+                    start = max(start, pred_finish + edge.lag_days)
+            earliest_start[task_id] = start
+            earliest_finish[task_id] = start + duration[task_id]
+
+        project_finish = max(earliest_finish.values(), default=0.0)
+
+        latest_start, latest_finish = {}, {}
+        for task_id in reversed(order):
+            finish = project_finish
+            for edge in self.successors[task_id]:
+                if edge.successor_id not in latest_start:
+                    continue
+                succ_start, succ_finish = latest_start[edge.successor_id], latest_finish[edge.successor_id]
+                if edge.dependency_type == 'start_to_start':
+                    finish = min(finish, succ_start - edge.lag_days + duration[task_id])
+                elif edge.dependency_type == 'finish_to_finish':
+                    finish = min(finish, succ_finish - edge.lag_days)
+                elif edge.dependency_type == 'start_to_finish':
+                    finish = min(finish, succ_finish - edge.lag_days + duration[task_id])
+                else:
+                    finish = min(finish, succ_start - edge.lag_days)
+            latest_finish[task_id] = finish
+            latest_start[task_id] = finish - duration[task_id]
+
+        tasks = []
+        critical = []
+        for task_id in order:
+            slack = latest_start[task_id] - earliest_start[task_id]
+            is_critical = slack <= SLACK_TOLERANCE
+            if is_critical:
+                critical.append(task_id)
+            tasks.append({
+                'task_id': task_id,
+                'title': self.nodes[task_id].title,
+                'duration_days': round(duration[task_id], 2),
+                'earliest_start': round(earliest_start[task_id], 2),
+                'earliest_finish': round(earliest_finish[task_id], 2),
+                'latest_start': round(latest_start[task_id], 2),
+                'latest_finish': round(latest_finish[task_id], 2),
+                'slack_days': round(max(slack, 0.0), 2),
+                'is_critical': is_critical,
+            })
+
+        return {
+            'project_duration_days': round(project_finish, 2),
+            'critical_path': critical,
+            'tasks': tasks,
+            'cyclic_task_ids': sorted(set(self.nodes) - set(order)),
+        }
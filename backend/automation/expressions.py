@@ -0,0 +1,273 @@
+"""
+Sandboxed expression language for custom workflow conditions.
+
+Expressions use a small, safe subset of Python syntax::
+
+    priority in ['high', 'urgent'] and deadline - now() < days(2)
+    not (status == 'blocked' or progress_percentage >= 80)
+
+Supported: literals (numbers, strings, True/False/None, lists), names from
+the flat condition context (dotted names such as ``task.status`` are looked
+up as a single key), comparisons including ``in``/``not in``/``is``,
+``and``/``or``/``not``, arithmetic (``+ - * /``) and a few whitelisted
+functions (``now``, ``today``, ``days``, ``hours``, ``len``, ``lower``,
+``upper``).
+
+An expression is parsed once into a tree of closures; compiled expressions
+are cached by source text, so an edited condition is recompiled
+automatically. Evaluation never touches attributes, imports or builtins.
+"""
+import ast
+import json
+import operator
+from datetime import timedelta
+from functools import lru_cache
+
+from django.utils import timezone
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is malformed or uses unsupported syntax."""
+
+
+MAX_EXPRESSION_LENGTH = 1000
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+def _multiply(a, b):
+    # Numbers only: repeating strings or lists could exhaust memory
+    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+        raise TypeError("Only numbers can be multiplied")
+    return a * b
+
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _multiply,
+    ast.Div: operator.truediv,
+}
+
+FUNCTIONS = {
+    'now': timezone.now,
+    'today': lambda: timezone.now().date(),
+    'days': lambda n: timedelta(days=n),
+    'hours': lambda n: timedelta(hours=n),
+    'len': len,
+    'lower': lambda s: str(s).lower(),
+    'upper': lambda s: str(s).upper(),
+}
+
+
+def _dotted_name(node):
+    """Return ``a.b.c`` for a chain of Attribute nodes on a Name, else None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+
+def _compile_node(node):
+    """Translate an AST node into a closure taking the flat context."""
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if not isinstance(value, (str, int, float, bool, type(None))):
+            raise ExpressionError(f"Unsupported literal: {value!r}")
+        return lambda ctx: value
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        items = [_compile_node(element) for element in node.elts]
+        return lambda ctx: [item(ctx) for item in items]
+
+    if isinstance(node, (ast.Name, ast.Attribute)):
+        name = _dotted_name(node)
+        if name is None or any(part.startswith('_') for part in name.split('.')):
+            raise ExpressionError("Only plain context names are allowed")
+        return lambda ctx: ctx.get(name)
+
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_node(value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda ctx: all(operand(ctx) for operand in operands)
+        return lambda ctx: any(operand(ctx) for operand in operands)
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda ctx: not operand(ctx)
+        if isinstance(node.op, ast.USub):
+            return lambda ctx: -operand(ctx)
+        raise ExpressionError("Unsupported unary operator")
+
+    if isinstance(node, ast.BinOp):
+        op = _BINARY_OPS.get(type(node.op))
+        if op is None:
+            raise ExpressionError("Unsupported arithmetic operator")
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        return lambda ctx: op(left(ctx), right(ctx))
+
+    if isinstance(node, ast.Compare):
+        left = _compile_node(node.left)
+        steps = []
+        for op_node, comparator in zip(node.ops, node.comparators):
+            op = _COMPARE_OPS.get(type(op_node))
+            if op is None:
+                raise ExpressionError("Unsupported comparison")
+            if isinstance(op_node, (ast.In, ast.NotIn)):
+                steps.append((op, _compile_membership(comparator)))
+            else:
+                steps.append((op, _compile_node(comparator)))
+
+        def compare(ctx):
+            current = left(ctx)
+            for op, right in steps:
+                value = right(ctx)
+                if not op(current, value):
+                    return False
+                current = value
+            return True
+        return compare
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise ExpressionError("Only whitelisted functions may be called")
+        function = FUNCTIONS[node.func.id]
+        args = [_compile_node(arg) for arg in node.args]
+        return lambda ctx: function(*(arg(ctx) for arg in args))
+
+    raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def _compile_membership(node):
+    """Constant lists on the right of ``in`` become a frozenset for O(1) lookups."""
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)) and all(
+        isinstance(element, ast.Constant) for element in node.elts
+    ):
+        for element in node.elts:
+            _compile_node(element)  # validates literal types
+        members = frozenset(element.value for element in node.elts)
+        return lambda ctx: members
+    return _compile_node(node)
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source):
+    """
+    Compile an expression into a predicate ``f(flat_context) -> bool``.
+
+    Raises ExpressionError for invalid or unsafe expressions. Runtime errors
+    (e.g. comparing a missing deadline with a date) evaluate to False.
+    """
+    if not source or not source.strip():
+        raise ExpressionError("Expression is empty")
+    if len(source) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError("Expression is too long")
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}")
+
+    evaluate = _compile_node(tree.body)
+
+    def predicate(ctx):
+        try:
+            return bool(evaluate(ctx))
+        except (TypeError, ValueError, ArithmeticError):
+            return False
+    return predicate
+
+
+# Task fields exposed to conditions, both as ``task.<field>`` and bare ``<field>``
+TASK_CONTEXT_FIELDS = [
+    'id', 'title', 'status', 'priority', 'tags', 'progress_percentage',
+    'estimated_hours', 'actual_hours', 'deadline', 'started_at',
+    'completed_at', 'created_at', 'project_id', 'assigned_to_id', 'created_by_id',
+]
+
+
+def build_condition_context(context):
+    """
+    Flatten a workflow context into the dict conditions are evaluated against.
+
+    Scalar context values keep their keys; the task's fields and the user's
+    role are copied in so no expression ever needs to follow a relation.
+    """
+    flat = dict(context)
+    task = context.get('task')
+    if task is not None:
+        for field in TASK_CONTEXT_FIELDS:
+            value = getattr(task, field, None)
+            flat[f'task.{field}'] = value
+            flat.setdefault(field, value)
+    user = context.get('user')
+    if user is not None:
+        flat['user.id'] = user.pk
+        flat['user.role'] = getattr(user, 'role', None)
+    return flat
+
+
+def compile_condition(condition_type, config):
+    """
+    Compile a WorkflowCondition into a predicate over the flat context.
+
+    Compiled predicates are cached by type and configuration, so each
+    version of a condition is compiled once per process.
+    """
+    return _compile_condition(condition_type, json.dumps(config, sort_keys=True, default=str))
+
+
+def _as_set(values):
+    try:
+        return frozenset(values)
+    except TypeError:
+        return list(values)
+
+
+@lru_cache(maxsize=1024)
+def _compile_condition(condition_type, config_json):
+    config = json.loads(config_json)
+
+    if condition_type == 'field_equals':
+        field, expected = config.get('field'), config.get('value')
+        return lambda ctx: ctx.get(field) == expected
+
+    elif condition_type == 'field_contains':
+        field, expected = config.get('field'), config.get('value')
+        return lambda ctx: expected in str(ctx.get(field, ''))
+
+    elif condition_type == 'field_in_list':
+        field, allowed = config.get('field'), _as_set(config.get('values', []))
+        return lambda ctx: ctx.get(field) in allowed
+
+    elif condition_type == 'user_role':
+        roles = _as_set(config.get('roles', []))
+        return lambda ctx: ctx.get('user') is not None and ctx.get('user.role') in roles
+
+    elif condition_type == 'time_range':
+        start_hour = config.get('start_hour', 0)
+        end_hour = config.get('end_hour', 24)
+        return lambda ctx: start_hour <= timezone.now().hour < end_hour
+
+    elif condition_type == 'custom':
+        try:
+            return compile_expression(config.get('expression', ''))
+        except ExpressionError:
+            # Invalid expressions are rejected on save; fail closed if one slips through
+            return lambda ctx: False
+
+    return lambda ctx: True
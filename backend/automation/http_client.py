@@ -0,0 +1,160 @@
+"""
+Shared outbound HTTP client for workflow actions.
+
+Keeps one pooled keep-alive session per destination host, always applies a
+timeout, dispatches batches of requests with bounded concurrency and keeps
+per-destination latency/error metrics for the worker process.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+
+@dataclass
+class OutboundRequest:
+    """A single outbound HTTP call prepared by a workflow action."""
+    url: str
+    method: str = 'POST'
+    json: dict = None
+    headers: dict = field(default_factory=dict)
+    timeout: float = None
+
+
+@dataclass
+class OutboundResponse:
+    """Outcome of an outbound call; ``ok`` is False on HTTP or network errors."""
+    url: str
+    ok: bool
+    status_code: int = None
+    elapsed_ms: float = 0.0
+    error: str = ''
+
+
+class DestinationStats:
+    """Running latency/error counters for one destination host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_error = ''
+
+    def record(self, response):
+        self.requests += 1
+        self.total_ms += response.elapsed_ms
+        self.max_ms = max(self.max_ms, response.elapsed_ms)
+        if not response.ok:
+            self.errors += 1
+            self.last_error = response.error or f'HTTP {response.status_code}'
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+            'max_ms': round(self.max_ms, 2),
+            'last_error': self.last_error,
+        }
+
+
+class OutboundHTTPClient:
+    """Pooled HTTP client with mandatory timeouts and per-host metrics."""
+
+    def __init__(self, timeout=None, pool_size=None, max_concurrency=None):
+        self.timeout = timeout or getattr(settings, 'OUTBOUND_HTTP_TIMEOUT', 5.0)
+        self.pool_size = pool_size or getattr(settings, 'OUTBOUND_HTTP_POOL_SIZE', 10)
+        self.max_concurrency = max_concurrency or getattr(settings, 'OUTBOUND_HTTP_MAX_CONCURRENCY', 4)
+        self._sessions = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def destination(self, url):
+        """Pool/metrics key for a URL: scheme plus host and port."""
+        parts = urlsplit(url)
+        return f'{parts.scheme}://{parts.netloc}'
+
+    def _session(self, destination):
+        """Return the keep-alive session for a destination, creating it once."""
+        with self._lock:
+            session = self._sessions.get(destination)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[destination] = session
+            return session
+
+    def send(self, request):
+        """Send one request; never raises for HTTP or network failures."""
+        destination = self.destination(request.url)
+        session = self._session(destination)
+        started = time.perf_counter()
+        try:
+            response = session.request(
+                request.method,
+                request.url,
+                json=request.json,
+                headers=request.headers,
+                timeout=request.timeout or self.timeout,
+            )
+            result = OutboundResponse(
+                url=request.url,
+                ok=response.ok,
+                status_code=response.status_code,
+            )
+        except requests.RequestException as e:
+            result = OutboundResponse(url=request.url, ok=False, error=str(e))
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            self._stats.setdefault(destination, DestinationStats()).record(result)
+        return result
+
+    def send_many(self, outbound_requests):
+        """Send requests concurrently (bounded by max_concurrency), preserving order."""
+        if len(outbound_requests) <= 1:
+            return [self.send(request) for request in outbound_requests]
+
+        workers = min(self.max_concurrency, len(outbound_requests))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.send, outbound_requests))
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        return self.send(OutboundRequest(url=url, json=json, headers=headers or {}, timeout=timeout))
+
+    def metrics(self):
+        """Snapshot of per-destination stats for this process."""
+        with self._lock:
+            return {destination: stats.as_dict() for destination, stats in self._stats.items()}
+
+    def reset_metrics(self):
+        with self._lock:
+            self._stats.clear()
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide outbound client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OutboundHTTPClient()
+    return _client
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark for workflow condition evaluation.
+
+Usage:
+    python manage.py benchmark_conditions --iterations 200000
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from automation.expressions import build_condition_context, compile_condition, compile_expression
+from tasks.models import Task
+from users.models import User
+
+
+SAMPLE_CONDITIONS = [
+    ('field_equals', {'field': 'new_status', 'value': 'completed'}),
+    ('field_in_list', {'field': 'priority', 'values': ['low', 'medium', 'high', 'urgent']}),
+    ('user_role', {'roles': ['manager', 'admin']}),
+    ('custom', {'expression': "priority in ['high', 'urgent'] and status != 'completed'"}),
+    ('custom', {'expression': 'deadline - now() < days(2) and progress_percentage < 80'}),
+    ('custom', {'expression': "not (lower(title) == 'x' or estimated_hours > 40) and user.role in ['manager']"}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Measure compiled workflow condition throughput (conditions/second).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Unsaved instances: the benchmark never touches the database
+        task = Task(
+            id=1, title='Benchmark task', status='in_progress', priority='high',
+            progress_percentage=40, estimated_hours=8,
+            deadline=timezone.now() + timedelta(days=1),
+        )
+        user = User(id=1, name='Benchmark', role='manager')
+        flat = build_condition_context({'task': task, 'user': user, 'new_status': 'in_progress'})
+
+        started = time.perf_counter()
+        for _, config in SAMPLE_CONDITIONS:
+            if 'expression' in config:
+                compile_expression.__wrapped__(config['expression'])
+        compile_us = (time.perf_counter() - started) * 1e6 / len(SAMPLE_CONDITIONS)
+        self.stdout.write(f'Average compile time: {compile_us:.1f} µs per expression')
+
+        total_evaluations = 0
+        total_seconds = 0.0
+        for condition_type, config in SAMPLE_CONDITIONS:
+            predicate = compile_condition(condition_type, config)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                predicate(flat)
+            elapsed = time.perf_counter() - started
+            total_evaluations += iterations
+            total_seconds += elapsed
+            label = config.get('expression', condition_type)
+            self.stdout.write(f'{iterations / elapsed:>14,.0f} conditions/s  {label}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Overall: {total_evaluations / total_seconds:,.0f} conditions/s'
+        ))
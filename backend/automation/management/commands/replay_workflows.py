@@ -0,0 +1,313 @@
+"""
+Replay task/progress events through the workflow engine and report throughput.
+
+Runs against a throwaway test database seeded with a synthetic company, so
+it is safe to point at any settings module. Outbound Slack/Teams/webhook
+calls are routed to a local stub HTTP server.
+
+Usage:
+    python manage.py replay_workflows --events 2000 --tasks 200
+    python manage.py replay_workflows --workflows workflows.json --events-file events.jsonl
+
+``--workflows`` takes a JSON list in the workflow API's create format
+(name, trigger_type, trigger_config, conditions, actions). ``--events-file``
+takes JSON lines of ``{"trigger": "...", "params": {...}}``, the same shape
+WorkflowTriggerService.enqueue sends to the worker. ``task_id``,
+``progress_update_id`` and user ids are mapped onto the seeded objects.
+"""
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from celery import current_app
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_databases, teardown_databases,
+)
+
+from automation import http_client
+from automation.http_client import OutboundHTTPClient
+
+
+DEFAULT_WORKFLOWS = [
+    {
+        'name': 'Notify assignee on status change',
+        'trigger_type': 'task_status_change',
+        'trigger_config': {},
+        'actions': [{
+            'action_type': 'send_notification',
+            'config': {'notify_assignee': True, 'title': '{{task_title}} is now {{task_status}}'},
+        }],
+    },
+    {
+        'name': 'Escalate urgent blocked work',
+        'trigger_type': 'task_status_change',
+        'trigger_config': {'to_status': 'blocked'},
+        'conditions': [{
+            'condition_type': 'custom',
+            'config': {'expression': "priority in ['high', 'urgent']"},
+        }],
+        'actions': [
+            {'action_type': 'send_slack', 'config': {'message': '{{task_title}} is blocked'}},
+            {'action_type': 'send_webhook', 'config': {'url': 'https://hooks.example.com/blocked'}},
+            {'action_type': 'add_comment', 'config': {'comment': 'Escalated by workflow'}},
+        ],
+    },
+    {
+        'name': 'Welcome new tasks',
+        'trigger_type': 'task_created',
+        'trigger_config': {},
+        'actions': [{'action_type': 'send_teams', 'config': {'message': 'New: {{task_title}}'}}],
+    },
+    {
+        'name': 'Progress digest',
+        'trigger_type': 'progress_update',
+        'trigger_config': {},
+        'actions': [{'action_type': 'send_email', 'config': {'notify_creator': True, 'subject': '{{task_title}}'}}],
+    },
+]
+
+STATUSES = ['open', 'in_progress', 'blocked', 'review', 'completed']
+PRIORITIES = ['low', 'medium', 'high', 'urgent']
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.hits += 1
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubRoutedClient(OutboundHTTPClient):
+    """Sends every outbound request to the stub server, keeping the path."""
+
+    def __init__(self, stub_url, **kwargs):
+        super().__init__(**kwargs)
+        self.stub_url = stub_url
+
+    def send(self, request):
+        path = urlsplit(request.url).path or '/'
+        return super().send(replace(request, url=f'{self.stub_url}{path}'))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Replay synthetic or recorded events through WorkflowTriggerService and report throughput.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000, help='Synthetic events to generate')
+        parser.add_argument('--events-file', help='JSON lines of recorded events to replay')
+        parser.add_argument('--workflows', help='JSON file of workflow definitions')
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--tasks', type=int, default=100)
+        parser.add_argument('--stub-delay-ms', type=float, default=0, help='Latency added by the stub server')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        server = self._start_stub(options['stub_delay_ms'] / 1000)
+        stub_url = f'http://127.0.0.1:{server.server_address[1]}'
+        previous_client = http_client._client
+        previous_eager = current_app.conf.task_always_eager
+        http_client._client = StubRoutedClient(stub_url)
+        # Workflows that update tasks trigger further workflows; run those inline
+        current_app.conf.task_always_eager = True
+
+        try:
+            with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+                fixtures = self._seed(options, stub_url)
+                events = self._load_events(options, fixtures)
+                self._replay(events, fixtures, server)
+        finally:
+            http_client._client = previous_client
+            current_app.conf.task_always_eager = previous_eager
+            server.shutdown()
+            server.server_close()
+            teardown_databases(old_config, verbosity=0)
+
+    def _start_stub(self, delay):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        server.daemon_threads = True
+        server.lock = threading.Lock()
+        server.hits = 0
+        server.delay = delay
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _seed(self, options, stub_url):
+        from automation.models import ChatIntegration
+        from automation.serializers import WorkflowCreateSerializer
+        from progress.models import ProgressUpdate
+        from projects.models import Project
+        from tasks.models import Task
+        from users.models import Company, User
+
+        company = Company.objects.create(name='Replay Co')
+        users = [
+            User.objects.create_user(
+                email=f'replay{i}@example.com', password=None, name=f'Replay User {i}',
+                company=company, role='manager' if i % 5 == 0 else 'employee',
+            )
+            for i in range(options['users'])
+        ]
+        project = Project.objects.create(title='Replay project', company=company, created_by=users[0])
+        tasks = [
+            Task.objects.create(
+                title=f'Replay task {i}', project=project, created_by=random.choice(users),
+                assigned_to=random.choice(users), priority=random.choice(PRIORITIES),
+            )
+            for i in range(options['tasks'])
+        ]
+        updates = [
+            ProgressUpdate.objects.create(
+                task=task, user=task.assigned_to, progress_percentage=random.randint(0, 100),
+                work_done='Replay progress',
+            )
+            for task in tasks
+        ]
+        for platform in ('slack', 'teams'):
+            ChatIntegration.objects.create(
+                company=company, platform=platform, access_token='replay',
+                workspace_id='replay', workspace_name='Replay',
+                default_channel_id=f'{stub_url}/{platform}',
+            )
+
+        definitions = DEFAULT_WORKFLOWS
+        if options['workflows']:
+            with open(options['workflows']) as f:
+                definitions = json.load(f)
+        for definition in definitions:
+            serializer = WorkflowCreateSerializer(data=definition)
+            if not serializer.is_valid():
+                raise CommandError(f"Invalid workflow {definition.get('name')}: {serializer.errors}")
+            serializer.save(company=company, created_by=users[0])
+
+        return {'users': users, 'tasks': tasks, 'updates': updates}
+
+    def _load_events(self, options, fixtures):
+        task_ids = [task.id for task in fixtures['tasks']]
+        update_ids = [update.id for update in fixtures['updates']]
+        user_ids = [user.id for user in fixtures['users']]
+
+        if options['events_file']:
+            def remap(value, ids):
+                return ids[int(value) % len(ids)] if value is not None else None
+
+            events = []
+            with open(options['events_file']) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    params = dict(event.get('params', {}))
+                    if 'task_id' in params:
+                        params['task_id'] = remap(params['task_id'], task_ids)
+                    if 'progress_update_id' in params:
+                        params['progress_update_id'] = remap(params['progress_update_id'], update_ids)
+                    for key in ('user_id', 'old_assignee_id', 'new_assignee_id'):
+                        if key in params:
+                            params[key] = remap(params[key], user_ids)
+                    events.append((event['trigger'], params))
+            return events
+
+        events = []
+        for _ in range(options['events']):
+            roll = random.random()
+            if roll < 0.5:
+                old_status, new_status = random.sample(STATUSES, 2)
+                events.append(('task_status_change', {
+                    'task_id': random.choice(task_ids), 'old_status': old_status, 'new_status': new_status,
+                }))
+            elif roll < 0.7:
+                events.append(('progress_update', {
+                    'progress_update_id': random.choice(update_ids), 'user_id': random.choice(user_ids),
+                }))
+            elif roll < 0.85:
+                events.append(('task_assigned', {
+                    'task_id': random.choice(task_ids),
+                    'old_assignee_id': random.choice(user_ids),
+                    'new_assignee_id': random.choice(user_ids),
+                }))
+            else:
+                events.append(('task_created', {'task_id': random.choice(task_ids)}))
+        return events
+
+    def _replay(self, events, fixtures, server):
+        from automation.models import WorkflowAction, WorkflowExecution
+        from automation.services import WorkflowActionExecutor, WorkflowTriggerService
+
+        action_timings = defaultdict(list)
+        original_execute = WorkflowActionExecutor.execute
+
+        def timed_execute(executor):
+            started = time.perf_counter()
+            try:
+                return original_execute(executor)
+            finally:
+                action_timings[executor.action.action_type].append((time.perf_counter() - started) * 1000)
+
+        first_execution_id = (WorkflowExecution.objects.order_by('-id').values_list('id', flat=True).first() or 0)
+        latencies, query_counts = [], []
+        WorkflowActionExecutor.execute = timed_execute
+        try:
+            started = time.perf_counter()
+            for trigger_name, params in events:
+                event_started = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    WorkflowTriggerService.dispatch(trigger_name, params)
+                latencies.append((time.perf_counter() - event_started) * 1000)
+                query_counts.append(len(queries.captured_queries))
+            elapsed = time.perf_counter() - started
+        finally:
+            WorkflowActionExecutor.execute = original_execute
+
+        # Outbound actions are sent in batches; take their timings from the execution log
+        action_types = dict(WorkflowAction.objects.values_list('id', 'action_type'))
+        executions = WorkflowExecution.objects.filter(id__gt=first_execution_id)
+        statuses = defaultdict(int)
+        for status, result_data in executions.values_list('status', 'result_data'):
+            statuses[status] += 1
+            for outbound in (result_data or {}).get('outbound', []):
+                action_timings[action_types.get(outbound['action_id'], 'outbound')].append(outbound['elapsed_ms'])
+
+        write = self.stdout.write
+        write(f"Events replayed:     {len(events)}")
+        write(f"Elapsed:             {elapsed:.2f} s")
+        write(self.style.SUCCESS(f"Throughput:          {len(events) / elapsed:,.1f} events/s" if elapsed else 'n/a'))
+        write(f"Dispatch latency:    p50 {percentile(latencies, 50):.2f} ms, "
+              f"p95 {percentile(latencies, 95):.2f} ms, max {max(latencies, default=0):.2f} ms")
+        write(f"Queries per event:   avg {statistics.mean(query_counts) if query_counts else 0:.1f}, "
+              f"p95 {percentile(query_counts, 95)}, max {max(query_counts, default=0)}")
+        write(f"Executions:          {dict(statuses)}")
+        write(f"Stub HTTP requests:  {server.hits}")
+        write('Per-action timings:')
+        for action_type, timings in sorted(action_timings.items()):
+            write(f"  {action_type:<24} n={len(timings):<6} avg {statistics.mean(timings):.2f} ms  "
+                  f"p95 {percentile(timings, 95):.2f} ms")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("automation", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workflowexecution",
+            name="enqueued_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="workflowexecution",
+            name="queue_latency_ms",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:14
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def plan_scheduled_workflows(apps, schema_editor):
+    from automation.scheduling import CronSchedule, ScheduleError
+
+    Workflow = apps.get_model("automation", "Workflow")
+    now = timezone.now()
+    workflows = list(Workflow.objects.filter(trigger_type="schedule", is_active=True))
+    for workflow in workflows:
+        try:
+            schedule = CronSchedule.from_trigger_config(workflow.trigger_config)
+            workflow.next_run_at = schedule.next_after(now)
+        except ScheduleError:
+            workflow.next_run_at = None
+    Workflow.objects.bulk_update(workflows, ["next_run_at"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("automation", "0002_workflowexecution_queue_latency"),
+        ("projects", "0002_initial"),
+        ("users", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workflow",
+            name="next_run_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="workflow",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("trigger_type", "schedule")),
+                fields=["next_run_at"],
+                name="workflow_schedule_due_idx",
+            ),
+        ),
+        migrations.RunPython(plan_scheduled_workflows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("automation", "0003_workflow_next_run_at"),
+        ("tasks", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadlineTriggerFiring",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("deadline", models.DateTimeField(db_index=True)),
+                ("fired_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deadline_firings",
+                        to="tasks.task",
+                    ),
+                ),
+                (
+                    "workflow",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deadline_firings",
+                        to="automation.workflow",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("workflow", "task", "deadline")},
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("automation", "0004_deadlinetriggerfiring"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workflowexecution",
+            name="duration_ms",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="workflowexecution",
+            name="started_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+        migrations.CreateModel(
+            name="WorkflowExecutionDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("total", models.IntegerField(default=0)),
+                ("completed", models.IntegerField(default=0)),
+                ("failed", models.IntegerField(default=0)),
+                ("skipped", models.IntegerField(default=0)),
+                ("avg_duration_ms", models.FloatField(blank=True, null=True)),
+                ("max_duration_ms", models.FloatField(blank=True, null=True)),
+                ("avg_queue_latency_ms", models.FloatField(blank=True, null=True)),
+                (
+                    "workflow",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="automation.workflow",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Workflow execution daily stats",
+                "ordering": ["-date"],
+                "unique_together": {("workflow", "date")},
+            },
+        ),
+    ]
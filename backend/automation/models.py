@@ -67,6 +67,9 @@ class Workflow(models.Model):
     execution_count = models.IntegerField(default=0)
     last_executed = models.DateTimeField(null=True, blank=True)
     
+    # Next due run for 'schedule' workflows (computed from trigger_config)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -75,49 +78,128 @@ class Workflow(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Workflow'
         verbose_name_plural = 'Workflows'
+        indexes = [
+            models.Index(
+                fields=['next_run_at'],
+                name='workflow_schedule_due_idx',
+                condition=models.Q(trigger_type='schedule', is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.get_trigger_type_display()})"
     
-    def execute(self, context):
-        """Execute all workflow steps in order."""
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_schedule = instance._schedule_state()
+        return instance
+    
+    def _schedule_state(self):
+        if not hasattr(self, 'trigger_config') or 'trigger_config' in self.get_deferred_fields():
+            return None
+        return (self.trigger_type, self.is_active, json.dumps(self.trigger_config, sort_keys=True))
+    
+    def get_schedule(self):
+        """Parsed schedule for a 'schedule' workflow."""
+        from .scheduling import CronSchedule
+        return CronSchedule.from_trigger_config(self.trigger_config)
+    
+    def compute_next_run(self, after=None):
+        """Next scheduled run strictly after ``after`` (default: now)."""
+        from .scheduling import ScheduleError
+        
+        if self.trigger_type != 'schedule' or not self.is_active:
+            return None
+        try:
+            return self.get_schedule().next_after(after or timezone.now())
+        except ScheduleError:
+            return None
+    
+    def save(self, *args, **kwargs):
+        # Re-plan the next run when the schedule, trigger or active flag changes
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'trigger_type', 'trigger_config', 'is_active'} & set(update_fields):
+            state = self._schedule_state()
+            if state != getattr(self, '_loaded_schedule', None) or (
+                self.trigger_type == 'schedule' and self.is_active and self.next_run_at is None
+            ):
+                self.next_run_at = self.compute_next_run()
+                self._loaded_schedule = state
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | {'next_run_at'}
+        super().save(*args, **kwargs)
+    
+    def execute(self, context, enqueued_at=None, log_buffer=None):
+        """
+        Execute all workflow steps in order.
+        
+        With a ``log_buffer`` (see services.ExecutionLogBuffer) the execution
+        record and the execution counters are written in bulk by the buffer
+        instead of row by row.
+        """
+        from .services import serialize_context
+        
         if not self.is_active:
             return None
         
-        execution = WorkflowExecution.objects.create(
+        queue_latency_ms = None
+        if enqueued_at:
+            queue_latency_ms = (timezone.now() - enqueued_at).total_seconds() * 1000
+        
+        execution = WorkflowExecution(
             workflow=self,
-            trigger_data=context
+            status='running',
+            trigger_data=serialize_context(
+                context, compact=getattr(settings, 'WORKFLOW_EXECUTION_COMPACT', False)
+            ),
+            enqueued_at=enqueued_at,
+            queue_latency_ms=queue_latency_ms
         )
+        if log_buffer is None:
+            execution.save()
         
         try:
-            # Check conditions
+            # Check conditions against one flattened copy of the context
+            from .expressions import build_condition_context
+            flat_context = build_condition_context(context)
             for condition in self.conditions.filter(is_active=True):
-                if not condition.evaluate(context):
+                if not condition.evaluate(context, flat_context):
                     execution.status = 'skipped'
                     execution.result_data = {'reason': 'Condition not met'}
-                    execution.completed_at = timezone.now()
-                    execution.save()
+                    self._finish_execution(execution, log_buffer)
                     return execution
             
-            # Execute actions
-            for action in self.actions.filter(is_active=True).order_by('order'):
-                action.execute(context, execution)
+            # Execute actions (consecutive outbound HTTP actions are sent concurrently)
+            from .services import WorkflowActionExecutor
+            WorkflowActionExecutor.execute_all(
+                self.actions.filter(is_active=True).order_by('order'),
+                context,
+                execution
+            )
             
             execution.status = 'completed'
-            execution.completed_at = timezone.now()
-            execution.save()
+            self._finish_execution(execution, log_buffer)
             
-            self.execution_count += 1
-            self.last_executed = timezone.now()
-            self.save(update_fields=['execution_count', 'last_executed'])
+            if log_buffer is None:
+                self.execution_count += 1
+                self.last_executed = timezone.now()
+                self.save(update_fields=['execution_count', 'last_executed'])
             
         except Exception as e:
             execution.status = 'failed'
-            execution.result_data = {'error': str(e)}
-            execution.completed_at = timezone.now()
-            execution.save()
+            execution.result_data['error'] = str(e)
+            self._finish_execution(execution, log_buffer)
         
         return execution
+    
+    def _finish_execution(self, execution, log_buffer):
+        execution.completed_at = timezone.now()
+        execution.duration_ms = (execution.completed_at - execution.started_at).total_seconds() * 1000
+        if log_buffer is None:
+            execution.save()
+        else:
+            log_buffer.add(execution)
 
 
 class WorkflowCondition(models.Model):
@@ -144,40 +226,24 @@ class WorkflowCondition(models.Model):
     )
     is_active = models.BooleanField(default=True)
     
-    def evaluate(self, context):
+    def evaluate(self, context, flat_context=None):
         """Evaluate if condition is met."""
-        if self.condition_type == 'field_equals':
-            field = self.config.get('field')
-            expected = self.config.get('value')
-            actual = context.get(field)
-            return actual == expected
-        
-        elif self.condition_type == 'field_contains':
-            field = self.config.get('field')
-            expected = self.config.get('value')
-            actual = context.get(field, '')
-            return expected in str(actual)
+        from .expressions import build_condition_context, compile_condition
         
-        elif self.condition_type == 'field_in_list':
-            field = self.config.get('field')
-            allowed = self.config.get('values', [])
-            actual = context.get(field)
-            return actual in allowed
-        
-        elif self.condition_type == 'user_role':
-            required_roles = self.config.get('roles', [])
-            user = context.get('user')
-            if user:
-                return user.role in required_roles
-            return False
-        
-        elif self.condition_type == 'time_range':
-            start_hour = self.config.get('start_hour', 0)
-            end_hour = self.config.get('end_hour', 24)
-            current_hour = timezone.now().hour
-            return start_hour <= current_hour < end_hour
+        if flat_context is None:
+            flat_context = build_condition_context(context)
+        return compile_condition(self.condition_type, self.config)(flat_context)
+    
+    def clean(self):
+        """Reject custom expressions that do not compile."""
+        from django.core.exceptions import ValidationError
+        from .expressions import compile_expression, ExpressionError
         
-        return True
+        if self.condition_type == 'custom':
+            try:
+                compile_expression(self.config.get('expression', ''))
+            except ExpressionError as e:
+                raise ValidationError({'config': str(e)})
     
     class Meta:
         ordering = ['id']
@@ -233,10 +299,10 @@ class WorkflowAction(models.Model):
     class Meta:
         ordering = ['order']
     
-    def execute(self, context, execution):
+    def execute(self, context, execution, render_context=None):
         """Execute this action."""
         from .services import WorkflowActionExecutor
-        executor = WorkflowActionExecutor(self, context, execution)
+        executor = WorkflowActionExecutor(self, context, execution, render_context)
         return executor.execute()
 
 
@@ -260,13 +326,73 @@ class WorkflowExecution(models.Model):
     trigger_data = models.JSONField(default=dict)
     result_data = models.JSONField(default=dict)
     
-    started_at = models.DateTimeField(auto_now_add=True)
+    # Time the trigger spent waiting on the workflow queue
+    enqueued_at = models.DateTimeField(null=True, blank=True)
+    queue_latency_ms = models.FloatField(null=True, blank=True)
+    
+    started_at = models.DateTimeField(default=timezone.now, db_index=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
     
     class Meta:
         ordering = ['-started_at']
 
 
+class WorkflowExecutionDailyStats(models.Model):
+    """
+    Per-workflow daily rollup of executions.
+    
+    Written by the retention job before old WorkflowExecution rows are
+    deleted, so long-term success/failure/latency history survives.
+    """
+    
+    workflow = models.ForeignKey(
+        Workflow,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+    
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    
+    avg_duration_ms = models.FloatField(null=True, blank=True)
+    max_duration_ms = models.FloatField(null=True, blank=True)
+    avg_queue_latency_ms = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['workflow', 'date']
+        verbose_name_plural = 'Workflow execution daily stats'
+
+
+class DeadlineTriggerFiring(models.Model):
+    """
+    Records that a deadline_approaching workflow already fired for a task.
+    
+    Keyed on the task deadline as well, so moving a deadline lets the
+    workflow fire again for the new date.
+    """
+    
+    workflow = models.ForeignKey(
+        Workflow,
+        on_delete=models.CASCADE,
+        related_name='deadline_firings'
+    )
+    task = models.ForeignKey(
+        'tasks.Task',
+        on_delete=models.CASCADE,
+        related_name='deadline_firings'
+    )
+    deadline = models.DateTimeField(db_index=True)
+    fired_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['workflow', 'task', 'deadline']
+
+
 # ============================================================================
 # 2. INTELLIGENT TASK DEPENDENCY MANAGEMENT
 # ============================================================================
@@ -332,19 +458,9 @@ class TaskDependency(models.Model):
     
     def _creates_cycle(self):
         """Check if adding this dependency would create a cycle."""
-        visited = set()
-        stack = [self.predecessor]
-        
-        while stack:
-            current = stack.pop()
-            if current == self.successor:
-                return True
-            if current.id not in visited:
-                visited.add(current.id)
-                # Get all predecessors of current task
-                for dep in TaskDependency.objects.filter(successor=current):
-                    stack.append(dep.predecessor)
-        return False
+        from .dependency_graph import DependencyGraph
+        graph = DependencyGraph.for_tasks([self.predecessor_id, self.successor_id])
+        return graph.would_create_cycle(self.predecessor_id, self.successor_id)
 
 
 class DependencyBottleneck(models.Model):
@@ -0,0 +1,157 @@
+"""
+Schedule parsing for ``schedule``-triggered workflows.
+
+A schedule comes from the workflow's ``trigger_config``, either as a cron
+expression (``{"cron": "*/15 9-17 * * 1-5"}``) or as the simple form
+``{"hour": 9, "minute": 0, "days": [0, 1, 2, 3, 4]}`` where days use
+Python weekdays (Monday = 0). All times are UTC, matching Celery beat.
+"""
+from datetime import datetime, time, timedelta
+
+
+class ScheduleError(ValueError):
+    """Raised for schedules that cannot be parsed or never fire."""
+
+
+# How far ahead to search for the next occurrence (covers leap days)
+MAX_LOOKAHEAD_DAYS = 366 * 5
+
+
+def _parse_field(field, low, high):
+    """Parse one cron field (``*``, ``a-b``, ``*/n``, ``a-b/n``, lists) into a set."""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise ScheduleError(f"Invalid step in '{field}'")
+            step = int(step_text)
+        if part in ('*', ''):
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise ScheduleError(f"Invalid range in '{field}'")
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = end = int(part)
+        else:
+            raise ScheduleError(f"Invalid value '{part}'")
+        if start < low or end > high or start > end:
+            raise ScheduleError(f"'{field}' is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Minute-resolution schedule with standard cron day-matching rules."""
+
+    def __init__(self, minutes, hours, days_of_month=None, months=None, weekdays=None):
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days_of_month = days_of_month  # None means any day
+        self.months = months or set(range(1, 13))
+        self.weekdays = weekdays  # Python weekdays, None means any day
+        if not self.minutes or not self.hours:
+            raise ScheduleError("Schedule has no valid times")
+
+    @classmethod
+    def from_cron(cls, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ScheduleError("Cron expressions need 5 fields: minute hour day month weekday")
+        minute, hour, day, month, weekday = fields
+        # Cron weekdays count from Sunday = 0 (7 is also Sunday); Python from Monday = 0
+        cron_weekdays = _parse_field(weekday, 0, 7)
+        return cls(
+            minutes=_parse_field(minute, 0, 59),
+            hours=_parse_field(hour, 0, 23),
+            days_of_month=None if day == '*' else _parse_field(day, 1, 31),
+            months=_parse_field(month, 1, 12),
+            weekdays=None if weekday == '*' else {(d - 1) % 7 for d in cron_weekdays},
+        )
+
+    @classmethod
+    def from_trigger_config(cls, config):
+        """Build the schedule described by a workflow's trigger_config."""
+        if config.get('cron'):
+            return cls.from_cron(str(config['cron']))
+        try:
+            hour = int(config.get('hour', 9))
+            minute = int(config.get('minute', 0))
+            days = {int(d) for d in config.get('days', [0, 1, 2, 3, 4])}
+        except (TypeError, ValueError):
+            raise ScheduleError("hour, minute and days must be integers")
+        if not (0 <= hour <= 23 and 0 <= minute <= 59) or not days <= set(range(7)):
+            raise ScheduleError("hour must be 0-23, minute 0-59 and days 0-6")
+        return cls(minutes={minute}, hours={hour}, weekdays=days)
+
+    def _day_matches(self, day):
+        if day.month not in self.months:
+            return False
+        dom_ok = self.days_of_month is None or day.day in self.days_of_month
+        dow_ok = self.weekdays is None or day.weekday() in self.weekdays
+        if self.days_of_month is not None and self.weekdays is not None:
+            # Cron rule: when both are restricted, either may match
+            return dom_ok or dow_ok
+        return dom_ok and dow_ok
+
+    def next_after(self, moment):
+        """First occurrence strictly after ``moment`` (an aware datetime)."""
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for offset in range(MAX_LOOKAHEAD_DAYS):
+            day = start.date() + timedelta(days=offset)
+            if not self._day_matches(day):
+                continue
+            for hour in self.hours:
+                if offset == 0 and hour < start.hour:
+                    continue
+                for minute in self.minutes:
+                    if offset == 0 and hour == start.hour and minute < start.minute:
+                        continue
+                    return datetime.combine(day, time(hour, minute), tzinfo=moment.tzinfo)
+        raise ScheduleError("Schedule never fires")
+
+    def previous_at_or_before(self, moment, not_before):
+        """Last occurrence at or before ``moment`` and not before ``not_before``, or None."""
+        end = moment.replace(second=0, microsecond=0)
+        for offset in range((end.date() - not_before.date()).days + 1):
+            day = end.date() - timedelta(days=offset)
+            if not self._day_matches(day):
+                continue
+            for hour in reversed(self.hours):
+                if offset == 0 and hour > end.hour:
+                    continue
+                for minute in reversed(self.minutes):
+                    if offset == 0 and hour == end.hour and minute > end.minute:
+                        continue
+                    occurrence = datetime.combine(day, time(hour, minute), tzinfo=moment.tzinfo)
+                    return occurrence if occurrence >= not_before else None
+        return None
+
+    def latest_between(self, start, end, limit):
+        """The last ``limit`` occurrences in ``[start, end]``, oldest first, found walking back from ``end``."""
+        occurrences = []
+        current = self.previous_at_or_before(end, start)
+        while current is not None and len(occurrences) < limit:
+            occurrences.append(current)
+            current = self.previous_at_or_before(current - timedelta(minutes=1), start)
+        return occurrences[::-1]
+
+    def count_between(self, start, end):
+        """Number of occurrences in ``[start, end]``, counted a day at a time."""
+        per_day = len(self.hours) * len(self.minutes)
+        total = 0
+        day, last_day = start.date(), end.date()
+        while day <= last_day:
+            if self._day_matches(day):
+                if start.date() < day < last_day:
+                    total += per_day
+                else:
+                    total += sum(
+                        1 for hour in self.hours for minute in self.minutes
+                        if start <= datetime.combine(day, time(hour, minute), tzinfo=start.tzinfo) <= end
+                    )
+            day += timedelta(days=1)
+        return total
@@ -2,8 +2,9 @@
 Serializers for automation models.
 """
 from rest_framework import serializers
+from django.utils import timezone
 from .models import (
-    Workflow, WorkflowCondition, WorkflowAction, WorkflowExecution,
+    Workflow, WorkflowCondition, WorkflowAction, WorkflowExecution, WorkflowExecutionDailyStats,
     TaskDependency, DependencyBottleneck,
     EscalationRule, Escalation,
     CalendarEvent, ScheduleSuggestion,
@@ -25,6 +26,16 @@ class WorkflowConditionSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkflowCondition
         fields = ['id', 'condition_type', 'config', 'is_active']
+    
+    def validate(self, data):
+        from .expressions import compile_expression, ExpressionError
+        
+        if data.get('condition_type') == 'custom':
+            try:
+                compile_expression((data.get('config') or {}).get('expression', ''))
+            except ExpressionError as e:
+                raise serializers.ValidationError({'config': str(e)})
+        return data
 
 
 class WorkflowActionSerializer(serializers.ModelSerializer):
@@ -43,9 +54,9 @@ class WorkflowSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'description', 'trigger_type', 'trigger_type_display',
             'trigger_config', 'project_filter', 'is_active', 'execution_count',
-            'last_executed', 'conditions', 'actions', 'created_at', 'updated_at'
+            'last_executed', 'next_run_at', 'conditions', 'actions', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['execution_count', 'last_executed', 'created_at', 'updated_at']
+        read_only_fields = ['execution_count', 'last_executed', 'next_run_at', 'created_at', 'updated_at']
 
 
 class WorkflowCreateSerializer(serializers.ModelSerializer):
@@ -59,6 +70,18 @@ class WorkflowCreateSerializer(serializers.ModelSerializer):
             'project_filter', 'is_active', 'conditions', 'actions'
         ]
     
+    def validate(self, data):
+        from .scheduling import CronSchedule, ScheduleError
+        
+        trigger_type = data.get('trigger_type', getattr(self.instance, 'trigger_type', None))
+        if trigger_type == 'schedule':
+            trigger_config = data.get('trigger_config', getattr(self.instance, 'trigger_config', {}))
+            try:
+                CronSchedule.from_trigger_config(trigger_config or {}).next_after(timezone.now())
+            except ScheduleError as e:
+                raise serializers.ValidationError({'trigger_config': str(e)})
+        return data
+    
     def create(self, validated_data):
         conditions_data = validated_data.pop('conditions', [])
         actions_data = validated_data.pop('actions', [])
@@ -82,7 +105,17 @@ class WorkflowExecutionSerializer(serializers.ModelSerializer):
         model = WorkflowExecution
         fields = [
             'id', 'workflow', 'workflow_name', 'status', 'trigger_data',
-            'result_data', 'started_at', 'completed_at'
+            'result_data', 'enqueued_at', 'queue_latency_ms', 'started_at', 'completed_at',
+            'duration_ms'
+        ]
+
+
+class WorkflowExecutionDailyStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WorkflowExecutionDailyStats
+        fields = [
+            'id', 'workflow', 'date', 'total', 'completed', 'failed', 'skipped',
+            'avg_duration_ms', 'max_duration_ms', 'avg_queue_latency_ms'
         ]
 
 
@@ -103,6 +136,47 @@ class TaskDependencySerializer(serializers.ModelSerializer):
             'created_at'
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None and 'predecessor' in self.fields:
+            # Only the requester's company's tasks can be linked
+            from tasks.models import Task
+            tasks = Task.objects.filter(project__company=request.user.company)
+            self.fields['predecessor'].queryset = tasks
+            self.fields['successor'].queryset = tasks
+
+    def validate(self, data):
+        """Reject self-dependencies and cycles."""
+        from .dependency_graph import DependencyGraph
+
+        predecessor = data.get('predecessor', getattr(self.instance, 'predecessor', None))
+        successor = data.get('successor', getattr(self.instance, 'successor', None))
+        if predecessor == successor:
+            raise serializers.ValidationError("A task cannot depend on itself.")
+
+        endpoints_changed = self.instance is None or (
+            (self.instance.predecessor_id, self.instance.successor_id) != (predecessor.id, successor.id)
+        )
+        if endpoints_changed:
+            graph = DependencyGraph.for_tasks([predecessor.id, successor.id], company_id=predecessor.project.company_id)
+            if self.instance is not None:
+                # The edge being changed goes away, so it cannot close a loop
+                graph.remove_edge(self.instance.predecessor_id, self.instance.successor_id)
+            if graph.would_create_cycle(predecessor.id, successor.id):
+                raise serializers.ValidationError("This dependency would create a circular dependency.")
+        return data
+
+
+class TaskDependencyBulkItemSerializer(serializers.Serializer):
+    """One item of a bulk create; task ids are resolved and checked by the view in one query."""
+
+    predecessor = serializers.IntegerField()
+    successor = serializers.IntegerField()
+    dependency_type = serializers.ChoiceField(choices=TaskDependency.DEPENDENCY_TYPES, default='finish_to_start')
+    lag_days = serializers.IntegerField(default=0)
+    auto_adjust_dates = serializers.BooleanField(default=True)
+
 
 class DependencyBottleneckSerializer(serializers.ModelSerializer):
     task_title = serializers.CharField(source='task.title', read_only=True)
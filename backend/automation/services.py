@@ -3,20 +3,180 @@ Workflow automation services.
 Handles execution of workflow actions and triggers.
 """
 import json
-import requests
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.core.mail import send_mail
 from django.conf import settings
-from datetime import timedelta
+from django.db import transaction
+from datetime import date, datetime, timedelta
+
+from .http_client import OutboundRequest, get_http_client
+from .templating import RenderContext, WORKFLOW_TEMPLATE_VARIABLES
+
+
+def serialize_context(context, compact=False):
+    """
+    Reduce a workflow context to JSON-safe values.
+    
+    Model instances are replaced by their ids (``task`` becomes ``task_id``)
+    so the context can be stored on WorkflowExecution or sent to Celery.
+    With ``compact`` only the ids are kept.
+    """
+    data = {}
+    for key, value in context.items():
+        if isinstance(value, models.Model):
+            data[f'{key}_id'] = value.pk
+        elif compact and not key.endswith('_id'):
+            continue
+        elif isinstance(value, (datetime, date)):
+            data[key] = value.isoformat()
+        else:
+            data[key] = value
+    return data
+
+
+class ExecutionLogBuffer:
+    """
+    Collects WorkflowExecution rows from batch jobs and writes them with
+    bulk_create, together with one counter update per workflow.
+    
+    Use as a context manager; it flushes every ``batch_size`` executions
+    and on exit.
+    """
+    
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.executions = []
+        self.completed = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+    
+    def add(self, execution):
+        self.executions.append(execution)
+        if execution.status == 'completed':
+            workflow_id = execution.workflow_id
+            count, _ = self.completed.get(workflow_id, (0, None))
+            self.completed[workflow_id] = (count + 1, execution.completed_at)
+        if len(self.executions) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        from .models import Workflow, WorkflowExecution
+        
+        if self.executions:
+            WorkflowExecution.objects.bulk_create(self.executions, batch_size=self.batch_size)
+        for workflow_id, (count, last_executed) in self.completed.items():
+            Workflow.objects.filter(id=workflow_id).update(
+                execution_count=models.F('execution_count') + count,
+                last_executed=last_executed
+            )
+        self.executions = []
+        self.completed = {}
+
+
+def hydrate_contexts(contexts):
+    """
+    Turn JSON workflow contexts back into execution contexts.
+    
+    ``task_id`` and ``user_id`` are replaced by loaded instances, using one
+    query per model for the whole batch.
+    """
+    from tasks.models import Task
+    from users.models import User
+    
+    task_ids = {c['task_id'] for c in contexts if c.get('task_id')}
+    user_ids = {c['user_id'] for c in contexts if c.get('user_id')}
+    tasks = Task.objects.select_related(
+        'project__company', 'assigned_to__manager', 'created_by__manager'
+    ).in_bulk(task_ids) if task_ids else {}
+    users = User.objects.in_bulk(user_ids) if user_ids else {}
+    
+    hydrated = []
+    for context in contexts:
+        context = dict(context)
+        if 'task_id' in context:
+            context['task'] = tasks.get(context.pop('task_id'))
+        if 'user_id' in context:
+            context['user'] = users.get(context.pop('user_id'))
+        hydrated.append(context)
+    return hydrated
 
 
 class WorkflowActionExecutor:
     """Executes individual workflow actions."""
     
-    def __init__(self, action, context, execution):
+    # Actions that only make an outbound HTTP call; consecutive ones are sent concurrently
+    OUTBOUND_ACTIONS = {'send_slack', 'send_teams', 'send_webhook'}
+    
+    def __init__(self, action, context, execution, render_context=None):
         self.action = action
         self.context = context
         self.execution = execution
+        self.render_context = render_context or RenderContext(context, WORKFLOW_TEMPLATE_VARIABLES)
+    
+    @classmethod
+    def execute_all(cls, actions, context, execution):
+        """
+        Execute actions in order, sending each run of consecutive outbound
+        actions as one concurrent batch through the shared HTTP client.
+        """
+        # Template variables are resolved once and shared by every action
+        render_context = RenderContext(context, WORKFLOW_TEMPLATE_VARIABLES)
+        batch = []
+        for action in actions:
+            if action.action_type in cls.OUTBOUND_ACTIONS:
+                batch.append(action)
+                continue
+            cls._send_outbound_batch(batch, context, execution, render_context)
+            batch = []
+            action.execute(context, execution, render_context=render_context)
+        cls._send_outbound_batch(batch, context, execution, render_context)
+    
+    @classmethod
+    def _send_outbound_batch(cls, actions, context, execution, render_context=None):
+        """Prepare requests on this thread (DB access) and send them in parallel."""
+        if not actions:
+            return
+        
+        prepared = []
+        for action in actions:
+            request = cls(action, context, execution, render_context).build_outbound_request()
+            if request:
+                prepared.append((action, request))
+        
+        client = get_http_client()
+        responses = client.send_many([request for _, request in prepared])
+        
+        results = execution.result_data.setdefault('outbound', [])
+        for (action, _), response in zip(prepared, responses):
+            results.append({
+                'action_id': action.id,
+                'destination': client.destination(response.url),
+                'ok': response.ok,
+                'status_code': response.status_code,
+                'elapsed_ms': round(response.elapsed_ms, 2),
+                'error': response.error,
+            })
+    
+    def build_outbound_request(self):
+        """Build the HTTP request for an outbound action, or None if it cannot be sent."""
+        builders = {
+            'send_slack': self._build_slack_request,
+            'send_teams': self._build_teams_request,
+            'send_webhook': self._build_webhook_request,
+        }
+        builder = builders.get(self.action.action_type)
+        return builder() if builder else None
+    
+    def _send_outbound(self, request):
+        """Send a single prepared request through the shared client."""
+        if not request:
+            return False
+        return get_http_client().send(request).ok
     
     def execute(self):
         """Execute the action based on its type."""
@@ -53,15 +213,20 @@ class WorkflowActionExecutor:
         task = self.context.get('task')
         recipients = self._get_recipients(config)
         
-        for user in recipients:
-            Notification.objects.create(
+        title = self._render_template(config.get('title', 'Workflow Notification'))
+        message = self._render_template(config.get('message', ''))
+        
+        Notification.objects.bulk_create([
+            Notification(
                 user=user,
                 notification_type=config.get('notification_type', 'reminder'),
-                title=self._render_template(config.get('title', 'Workflow Notification')),
-                message=self._render_template(config.get('message', '')),
+                title=title,
+                message=message,
                 link=config.get('link', f'/tasks/{task.id}' if task else ''),
                 priority=config.get('priority', 'normal')
             )
+            for user in recipients
+        ])
         return True
     
     def _send_email(self):
@@ -84,13 +249,17 @@ class WorkflowActionExecutor:
     
     def _send_slack(self):
         """Send Slack message."""
+        return self._send_outbound(self._build_slack_request())
+    
+    def _build_slack_request(self):
+        """Build the Slack chat.postMessage request."""
         from .models import ChatIntegration
         
         config = self.action.config
         task = self.context.get('task')
         
         if not task or not task.project.company:
-            return False
+            return None
         
         try:
             integration = ChatIntegration.objects.get(
@@ -99,7 +268,7 @@ class WorkflowActionExecutor:
                 is_active=True
             )
         except ChatIntegration.DoesNotExist:
-            return False
+            return None
         
         channel = config.get('channel') or integration.default_channel_id
         message = self._render_template(config.get('message', ''))
@@ -119,25 +288,28 @@ class WorkflowActionExecutor:
             }]
         }
         
-        response = requests.post(
-            'https://slack.com/api/chat.postMessage',
+        return OutboundRequest(
+            url='https://slack.com/api/chat.postMessage',
             headers={
                 'Authorization': f'Bearer {integration.access_token}',
                 'Content-Type': 'application/json'
             },
             json=payload
         )
-        return response.ok
     
     def _send_teams(self):
         """Send Microsoft Teams message."""
+        return self._send_outbound(self._build_teams_request())
+    
+    def _build_teams_request(self):
+        """Build the Teams incoming-webhook request."""
         from .models import ChatIntegration
         
         config = self.action.config
         task = self.context.get('task')
         
         if not task or not task.project.company:
-            return False
+            return None
         
         try:
             integration = ChatIntegration.objects.get(
@@ -146,7 +318,7 @@ class WorkflowActionExecutor:
                 is_active=True
             )
         except ChatIntegration.DoesNotExist:
-            return False
+            return None
         
         webhook_url = config.get('webhook_url') or integration.default_channel_id
         message = self._render_template(config.get('message', ''))
@@ -172,16 +344,19 @@ class WorkflowActionExecutor:
             }]
         }
         
-        response = requests.post(webhook_url, json=payload)
-        return response.ok
+        return OutboundRequest(url=webhook_url, json=payload)
     
     def _send_webhook(self):
         """Send generic webhook."""
+        return self._send_outbound(self._build_webhook_request())
+    
+    def _build_webhook_request(self):
+        """Build the generic webhook request."""
         config = self.action.config
         url = config.get('url')
         
         if not url:
-            return False
+            return None
         
         payload = {
             'event': self.action.workflow.trigger_type,
@@ -189,11 +364,10 @@ class WorkflowActionExecutor:
             'data': self._serialize_context()
         }
         
-        headers = config.get('headers', {})
+        headers = dict(config.get('headers', {}))
         headers['Content-Type'] = 'application/json'
         
-        response = requests.post(url, json=payload, headers=headers)
-        return response.ok
+        return OutboundRequest(url=url, json=payload, headers=headers)
     
     def _update_task_status(self):
         """Update task status."""
@@ -468,28 +642,7 @@ class WorkflowActionExecutor:
     
     def _render_template(self, template):
         """Render template with context variables."""
-        if not template:
-            return ''
-        
-        task = self.context.get('task')
-        user = self.context.get('user')
-        
-        replacements = {
-            '{{task_title}}': task.title if task else '',
-            '{{task_status}}': task.status if task else '',
-            '{{task_priority}}': task.priority if task else '',
-            '{{task_deadline}}': str(task.deadline) if task and task.deadline else '',
-            '{{assignee_name}}': task.assigned_to.name if task and task.assigned_to else 'Unassigned',
-            '{{project_name}}': task.project.title if task else '',
-            '{{user_name}}': user.name if user else '',
-            '{{timestamp}}': timezone.now().strftime('%Y-%m-%d %H:%M'),
-        }
-        
-        result = template
-        for key, value in replacements.items():
-            result = result.replace(key, str(value))
-        
-        return result
+        return self.render_context.render(template)
     
     def _get_priority_color(self, priority):
         """Get color code for priority."""
@@ -533,7 +686,72 @@ class WorkflowTriggerService:
     """Service to check and trigger workflows."""
     
     @staticmethod
-    def trigger_task_status_change(task, old_status, new_status, user=None):
+    def enqueue(trigger_name, **params):
+        """
+        Queue a trigger for the workflow worker once the current transaction commits.
+        
+        ``params`` must be JSON-safe (pass ids, not model instances); the
+        request that caused the trigger never waits on workflow matching or
+        on any outbound action.
+        """
+        from .tasks import dispatch_workflow_trigger
+        
+        enqueued_at = timezone.now().isoformat()
+        transaction.on_commit(
+            lambda: dispatch_workflow_trigger.delay(trigger_name, params, enqueued_at)
+        )
+    
+    @classmethod
+    def dispatch(cls, trigger_name, params, enqueued_at=None):
+        """Load the objects referenced by a queued trigger and run it."""
+        from tasks.models import Task
+        from progress.models import ProgressUpdate
+        from users.models import User
+        
+        if isinstance(enqueued_at, str):
+            enqueued_at = parse_datetime(enqueued_at)
+        
+        user_ids = [
+            params[key] for key in ('user_id', 'old_assignee_id', 'new_assignee_id')
+            if params.get(key)
+        ]
+        users = User.objects.in_bulk(user_ids) if user_ids else {}
+        user = users.get(params.get('user_id'))
+        
+        if trigger_name == 'progress_update':
+            progress_update = ProgressUpdate.objects.select_related(
+                'user', 'task__project__company', 'task__assigned_to', 'task__created_by'
+            ).filter(id=params.get('progress_update_id')).first()
+            if progress_update:
+                cls.trigger_progress_update(progress_update, user, enqueued_at=enqueued_at)
+            return
+        
+        task = Task.objects.select_related(
+            'project__company', 'assigned_to__manager', 'created_by__manager'
+        ).filter(id=params.get('task_id')).first()
+        if not task:
+            return
+        
+        if trigger_name == 'task_created':
+            cls.trigger_task_created(task, user, enqueued_at=enqueued_at)
+        elif trigger_name == 'task_status_change':
+            cls.trigger_task_status_change(
+                task, params.get('old_status'), params.get('new_status'), user,
+                enqueued_at=enqueued_at
+            )
+        elif trigger_name == 'task_assigned':
+            cls.trigger_task_assigned(
+                task,
+                users.get(params.get('old_assignee_id')),
+                users.get(params.get('new_assignee_id')),
+                user,
+                enqueued_at=enqueued_at
+            )
+        elif trigger_name == 'task_overdue':
+            cls.trigger_task_overdue(task, enqueued_at=enqueued_at)
+    
+    @staticmethod
+    def trigger_task_status_change(task, old_status, new_status, user=None, enqueued_at=None):
         """Trigger workflows for task status change."""
         from .models import Workflow
         
@@ -564,10 +782,10 @@ class WorkflowTriggerService:
                 'old_status': old_status,
                 'new_status': new_status,
             }
-            workflow.execute(context)
+            workflow.execute(context, enqueued_at=enqueued_at)
     
     @staticmethod
-    def trigger_task_created(task, user=None):
+    def trigger_task_created(task, user=None, enqueued_at=None):
         """Trigger workflows for task creation."""
         from .models import Workflow
         
@@ -584,10 +802,10 @@ class WorkflowTriggerService:
                 'task': task,
                 'user': user,
             }
-            workflow.execute(context)
+            workflow.execute(context, enqueued_at=enqueued_at)
     
     @staticmethod
-    def trigger_task_assigned(task, old_assignee, new_assignee, user=None):
+    def trigger_task_assigned(task, old_assignee, new_assignee, user=None, enqueued_at=None):
         """Trigger workflows for task assignment."""
         from .models import Workflow
         
@@ -606,10 +824,10 @@ class WorkflowTriggerService:
                 'old_assignee': old_assignee,
                 'new_assignee': new_assignee,
             }
-            workflow.execute(context)
+            workflow.execute(context, enqueued_at=enqueued_at)
     
     @staticmethod
-    def trigger_task_overdue(task):
+    def trigger_task_overdue(task, enqueued_at=None):
         """Trigger workflows for overdue tasks."""
         from .models import Workflow
         
@@ -625,10 +843,10 @@ class WorkflowTriggerService:
             context = {
                 'task': task,
             }
-            workflow.execute(context)
+            workflow.execute(context, enqueued_at=enqueued_at)
     
     @staticmethod
-    def trigger_progress_update(progress_update, user=None):
+    def trigger_progress_update(progress_update, user=None, enqueued_at=None):
         """Trigger workflows for progress updates."""
         from .models import Workflow
         
@@ -648,136 +866,210 @@ class WorkflowTriggerService:
                 'progress_update': progress_update,
                 'user': user or progress_update.user,
             }
-            workflow.execute(context)
+            workflow.execute(context, enqueued_at=enqueued_at)
 
 
 class DependencyManager:
     """Manages task dependencies and timeline calculations."""
     
+    # Also bounds staleness from changes made without save signals
+    CRITICAL_PATH_CACHE_TIMEOUT = 60 * 60
+    
     def __init__(self, project):
         self.project = project
     
     def recalculate_from_task(self, task):
         """Recalculate timeline starting from a task."""
-        from .models import TaskDependency
-        from collections import deque
-        
-        # BFS to update all dependent tasks
-        queue = deque([task])
-        visited = set()
-        
-        while queue:
-            current_task = queue.popleft()
-            
-            if current_task.id in visited:
-                continue
-            visited.add(current_task.id)
-            
-            # Get successor dependencies
-            dependencies = TaskDependency.objects.filter(
-                predecessor=current_task,
-                auto_adjust_dates=True
-            )
-            
-            for dep in dependencies:
-                successor = dep.successor
-                new_deadline = self._calculate_deadline(dep, current_task)
-                
-                if new_deadline and (not successor.deadline or new_deadline > successor.deadline):
-                    successor.deadline = new_deadline
-                    successor.save()
-                
-                queue.append(successor)
-    
-    def _calculate_deadline(self, dependency, predecessor):
-        """Calculate deadline for successor based on dependency type."""
-        from datetime import timedelta
-        
-        if dependency.dependency_type == 'finish_to_start':
-            # Successor can't start until predecessor finishes
-            base_date = predecessor.completed_at or predecessor.deadline
-            if base_date:
-                return base_date + timedelta(days=dependency.lag_days)
-        
-        elif dependency.dependency_type == 'start_to_start':
-            # Successor can't start until predecessor starts
-            base_date = predecessor.started_at or timezone.now()
-            return base_date + timedelta(days=dependency.lag_days)
-        
-        elif dependency.dependency_type == 'finish_to_finish':
-            # Successor can't finish until predecessor finishes
-            base_date = predecessor.completed_at or predecessor.deadline
-            if base_date:
-                return base_date + timedelta(days=dependency.lag_days)
-        
-        return None
+        return self.recalculate_from_tasks([task.id])
+    
+    def recalculate_from_tasks(self, task_ids, dry_run=False, graph=None):
+        """
+        Push deadlines forward from the given tasks through their successors.
+        
+        The project's dependency graph is loaded once, dates are propagated
+        in topological order and changed deadlines are written in one batch
+        (bypassing per-task save signals), followed by a single
+        ``timeline_updated`` event for the project. With ``dry_run`` nothing
+        is written. Returns the changed deadlines as ``{task_id: deadline}``.
+        """
+        from tasks.models import Task
+        from .dependency_graph import DependencyGraph, bump_graph_version
+        
+        graph = graph or DependencyGraph.for_project(self.project)
+        changed = graph.propagate_deadlines(task_ids)
+        if changed and not dry_run:
+            with transaction.atomic():
+                Task.objects.bulk_update(
+                    [Task(id=task_id, deadline=deadline) for task_id, deadline in changed.items()],
+                    ['deadline'],
+                    batch_size=500,
+                )
+                Task.objects.filter(id__in=changed).update(updated_at=timezone.now())
+            # Cross-project edges can move tasks of linked projects too
+            for project_id in {self.project.id} | {graph.nodes[task_id].project_id for task_id in changed}:
+                bump_graph_version(project_id)
+            self._broadcast_timeline_change(task_ids, changed)
+        return changed
+    
+    def recalculate_project(self, dry_run=False):
+        """
+        Recalculate the whole project's timeline in one topological pass.
+        
+        Returns the old and new deadline of every task that moves; with
+        ``dry_run`` the changes are only proposed, not written.
+        """
+        from .dependency_graph import DependencyGraph
+        
+        graph = DependencyGraph.for_project(self.project)
+        previous = {task_id: node.deadline for task_id, node in graph.nodes.items()}
+        project_task_ids = [
+            task_id for task_id, node in graph.nodes.items() if node.project_id == self.project.id
+        ]
+        changed = self.recalculate_from_tasks(project_task_ids, dry_run=dry_run, graph=graph)
+        
+        return [
+            {
+                'task_id': task_id,
+                'title': graph.nodes[task_id].title,
+                'old_deadline': previous[task_id],
+                'new_deadline': deadline,
+                'shift_days': round((deadline - previous[task_id]).total_seconds() / 86400, 2)
+                if previous[task_id] else None,
+            }
+            for task_id, deadline in changed.items()
+        ]
+    
+    def critical_path(self):
+        """Critical path schedule for the project, cached per graph version."""
+        from django.core.cache import cache
+        from .dependency_graph import DependencyGraph, graph_version
+        
+        cache_key = f'critical_path:{self.project.id}:{graph_version(self.project.id)}'
+        result = cache.get(cache_key)
+        if result is None:
+            result = DependencyGraph.for_project(self.project).critical_path()
+            cache.set(cache_key, result, self.CRITICAL_PATH_CACHE_TIMEOUT)
+        return result
+    
+    def _broadcast_timeline_change(self, source_task_ids, changed):
+        """Send one timeline_updated event to the project's channel group after commit."""
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+        
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        event = {
+            'type': 'timeline_updated',
+            'project_id': self.project.id,
+            'source_task_ids': list(source_task_ids),
+            'changed_count': len(changed),
+            'changes': [
+                {'task_id': task_id, 'deadline': deadline.isoformat()}
+                for task_id, deadline in changed.items()
+            ],
+            'timestamp': timezone.now().isoformat(),
+        }
+        transaction.on_commit(
+            lambda: async_to_sync(channel_layer.group_send)(f'project_{self.project.id}', event)
+        )
     
     def detect_bottlenecks(self):
         """Detect potential bottlenecks in the project."""
-        from .models import TaskDependency, DependencyBottleneck
+        return self.detect_bottlenecks_for_projects([self.project])[0]
+    
+    @classmethod
+    def detect_bottlenecks_for_projects(cls, projects):
+        """
+        Detect bottlenecks across several projects with bulk writes.
+        
+        Candidates and their blocking counts come from one grouped query;
+        each project's graph is loaded once for cascade delays. Open
+        bottlenecks are updated and new ones created in bulk, and open
+        bottlenecks on tasks that no longer qualify are resolved in a single
+        UPDATE. Returns ``(bottlenecks, resolved_count)``.
+        """
+        from django.db.models import Count
+        from .models import DependencyBottleneck
+        from .dependency_graph import DependencyGraph
         from tasks.models import Task
         
-        tasks = Task.objects.filter(
-            project=self.project,
-            status__in=['open', 'in_progress', 'blocked']
-        )
+        projects = {project.id: project for project in projects}
         
-        bottlenecks = []
+        # Open tasks that two or more tasks depend on (threshold for bottleneck)
+        tasks = list(Task.objects.filter(
+            project_id__in=projects,
+            status__in=['open', 'in_progress', 'blocked']
+        ).annotate(
+            blocking_count=Count('successor_dependencies')
+        ).filter(blocking_count__gte=2).select_related('assigned_to'))
         
+        tasks_by_project = {}
         for task in tasks:
-            # Count how many tasks depend on this one
-            blocking_count = TaskDependency.objects.filter(predecessor=task).count()
-            
-            if blocking_count >= 2:  # Threshold for bottleneck
-                # Calculate cascade delay
-                cascade_delay = self._calculate_cascade_delay(task)
-                
-                # Determine severity
-                if blocking_count >= 5 or cascade_delay >= 10:
-                    severity = 'critical'
-                elif blocking_count >= 3 or cascade_delay >= 5:
-                    severity = 'high'
-                elif blocking_count >= 2 or cascade_delay >= 2:
-                    severity = 'medium'
-                else:
-                    severity = 'low'
-                
-                # Check for existing bottleneck
-                bottleneck, created = DependencyBottleneck.objects.update_or_create(
-                    task=task,
-                    is_resolved=False,
-                    defaults={
-                        'severity': severity,
-                        'blocking_count': blocking_count,
-                        'cascade_delay_days': cascade_delay,
-                        'delay_probability': self._calculate_delay_probability(task),
-                        'suggested_actions': self._generate_bottleneck_suggestions(task, blocking_count),
-                    }
+            tasks_by_project.setdefault(task.project_id, []).append(task)
+        cascade_delays = {}
+        for project_id, project_tasks in tasks_by_project.items():
+            cascade_delays.update(
+                DependencyGraph.for_project(projects[project_id]).cascade_delays(
+                    [task.id for task in project_tasks]
                 )
-                bottlenecks.append(bottleneck)
-        
-        return bottlenecks
-    
-    def _calculate_cascade_delay(self, task):
-        """Calculate potential cascade delay if task is late."""
-        from .models import TaskDependency
+            )
         
-        total_delay = 0
-        visited = set()
-        stack = [(task, 0)]
+        now = timezone.now()
+        existing = {
+            bottleneck.task_id: bottleneck
+            for bottleneck in DependencyBottleneck.objects.filter(
+                task_id__in=[task.id for task in tasks], is_resolved=False
+            )
+        }
+        to_create, to_update = [], []
         
-        while stack:
-            current, depth = stack.pop()
-            if current.id in visited:
-                continue
-            visited.add(current.id)
+        for task in tasks:
+            manager = cls(projects[task.project_id])
+            blocking_count = task.blocking_count
+            cascade_delay = cascade_delays.get(task.id, 0)
             
-            deps = TaskDependency.objects.filter(predecessor=current)
-            for dep in deps:
-                total_delay += dep.lag_days + 1  # +1 for minimum transition time
-                stack.append((dep.successor, depth + 1))
-        
-        return total_delay
+            # Determine severity
+            if blocking_count >= 5 or cascade_delay >= 10:
+                severity = 'critical'
+            elif blocking_count >= 3 or cascade_delay >= 5:
+                severity = 'high'
+            elif blocking_count >= 2 or cascade_delay >= 2:
+                severity = 'medium'
+            else:
+                severity = 'low'
+            
+            fields = {
+                'severity': severity,
+                'blocking_count': blocking_count,
+                'cascade_delay_days': cascade_delay,
+                'delay_probability': manager._calculate_delay_probability(task),
+                'suggested_actions': manager._generate_bottleneck_suggestions(task, blocking_count),
+            }
+            bottleneck = existing.get(task.id)
+            if bottleneck:
+                for name, value in fields.items():
+                    setattr(bottleneck, name, value)
+                bottleneck.updated_at = now
+                to_update.append(bottleneck)
+            else:
+                to_create.append(DependencyBottleneck(task=task, **fields))
+        
+        with transaction.atomic():
+            DependencyBottleneck.objects.bulk_update(
+                to_update,
+                ['severity', 'blocking_count', 'cascade_delay_days', 'delay_probability',
+                 'suggested_actions', 'updated_at'],
+                batch_size=500,
+            )
+            created = DependencyBottleneck.objects.bulk_create(to_create, batch_size=500)
+            resolved_count = DependencyBottleneck.objects.filter(
+                task__project_id__in=projects, is_resolved=False
+            ).exclude(
+                task_id__in=[task.id for task in tasks]
+            ).update(is_resolved=True, resolved_at=now, updated_at=now)
+        
+        return to_update + created, resolved_count
     
     def _calculate_delay_probability(self, task):
         """Calculate probability of task causing delays."""
@@ -1,7 +1,7 @@
 """
 Django signals for workflow automation triggers.
 """
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -13,48 +13,58 @@ def task_pre_save(sender, instance, **kwargs):
         try:
             old_instance = sender.objects.get(pk=instance.pk)
             instance._old_status = old_instance.status
-            instance._old_assignee = old_instance.assigned_to
+            instance._old_assignee_id = old_instance.assigned_to_id
             instance._old_priority = old_instance.priority
         except sender.DoesNotExist:
             instance._old_status = None
-            instance._old_assignee = None
+            instance._old_assignee_id = None
             instance._old_priority = None
     else:
         instance._old_status = None
-        instance._old_assignee = None
+        instance._old_assignee_id = None
         instance._old_priority = None
 
 
 @receiver(post_save, sender='tasks.Task')
 def task_post_save(sender, instance, created, **kwargs):
-    """Trigger workflows on task save."""
+    """Queue workflow triggers for a task save; they run after commit on the workflow queue."""
     from .services import WorkflowTriggerService
     
     if created:
         # Task created trigger
-        WorkflowTriggerService.trigger_task_created(instance)
+        WorkflowTriggerService.enqueue('task_created', task_id=instance.pk)
     else:
         # Check for status change
         old_status = getattr(instance, '_old_status', None)
         if old_status and old_status != instance.status:
-            WorkflowTriggerService.trigger_task_status_change(
-                instance, old_status, instance.status
+            WorkflowTriggerService.enqueue(
+                'task_status_change',
+                task_id=instance.pk,
+                old_status=old_status,
+                new_status=instance.status
             )
         
         # Check for assignee change
-        old_assignee = getattr(instance, '_old_assignee', None)
-        if old_assignee != instance.assigned_to:
-            WorkflowTriggerService.trigger_task_assigned(
-                instance, old_assignee, instance.assigned_to
+        old_assignee_id = getattr(instance, '_old_assignee_id', None)
+        if old_assignee_id != instance.assigned_to_id:
+            WorkflowTriggerService.enqueue(
+                'task_assigned',
+                task_id=instance.pk,
+                old_assignee_id=old_assignee_id,
+                new_assignee_id=instance.assigned_to_id
             )
 
 
 @receiver(post_save, sender='progress.ProgressUpdate')
 def progress_update_post_save(sender, instance, created, **kwargs):
-    """Trigger workflows on progress update."""
+    """Queue workflow triggers for a new progress update."""
     if created:
         from .services import WorkflowTriggerService
-        WorkflowTriggerService.trigger_progress_update(instance)
+        WorkflowTriggerService.enqueue(
+            'progress_update',
+            progress_update_id=instance.pk,
+            user_id=instance.user_id
+        )
 
 
 @receiver(post_save, sender='automation.TaskDependency')
@@ -64,3 +74,24 @@ def dependency_post_save(sender, instance, created, **kwargs):
         from .services import DependencyManager
         manager = DependencyManager(instance.predecessor.project)
         manager.recalculate_from_task(instance.predecessor)
+
+
+@receiver(post_save, sender='tasks.Task')
+@receiver(post_delete, sender='tasks.Task')
+def task_graph_changed(sender, instance, **kwargs):
+    """Invalidate cached dependency-graph results for the task's project."""
+    from .dependency_graph import bump_graph_version
+    bump_graph_version(instance.project_id)
+
+
+@receiver(post_save, sender='automation.TaskDependency')
+@receiver(post_delete, sender='automation.TaskDependency')
+def dependency_graph_changed(sender, instance, **kwargs):
+    """Invalidate cached dependency-graph results for both linked projects."""
+    from tasks.models import Task
+    from .dependency_graph import bump_graph_version
+    project_ids = Task.objects.filter(
+        id__in=[instance.predecessor_id, instance.successor_id]
+    ).values_list('project_id', flat=True)
+    for project_id in set(project_ids):
+        bump_graph_version(project_id)
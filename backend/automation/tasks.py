@@ -5,6 +5,7 @@ from celery import shared_task
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from datetime import timedelta
 
 
@@ -186,16 +187,61 @@ def check_blocked_and_escalate():
 
 
 @shared_task
-def detect_bottlenecks():
-    """Detect bottlenecks in all active projects."""
+def detect_bottlenecks(projects_per_shard=50):
+    """
+    Detect bottlenecks in all active projects.
+    
+    Work is split into per-company shards of at most ``projects_per_shard``
+    projects that run in parallel; a chord callback summarizes the results.
+    """
+    from celery import chord
+    from projects.models import Project
+    
+    projects_by_company = {}
+    for company_id, project_id in Project.objects.filter(
+        status='active'
+    ).values_list('company_id', 'id').order_by('company_id', 'id'):
+        projects_by_company.setdefault(company_id, []).append(project_id)
+    
+    shards = [
+        project_ids[start:start + projects_per_shard]
+        for project_ids in projects_by_company.values()
+        for start in range(0, len(project_ids), projects_per_shard)
+    ]
+    if not shards:
+        return summarize_bottleneck_detection([])
+    
+    chord(
+        detect_bottlenecks_for_projects.s(project_ids) for project_ids in shards
+    )(summarize_bottleneck_detection.s())
+    return {'shards': len(shards)}
+
+
+@shared_task
+def detect_bottlenecks_for_projects(project_ids):
+    """Detect bottlenecks for one shard of projects."""
     from .services import DependencyManager
     from projects.models import Project
     
-    active_projects = Project.objects.filter(status='active')
+    projects = list(Project.objects.filter(id__in=project_ids, status='active'))
+    bottlenecks, resolved = DependencyManager.detect_bottlenecks_for_projects(projects)
     
-    for project in active_projects:
-        manager = DependencyManager(project)
-        manager.detect_bottlenecks()
+    return {
+        'projects': len(projects),
+        'bottlenecks': len(bottlenecks),
+        'critical': sum(1 for bottleneck in bottlenecks if bottleneck.severity == 'critical'),
+        'resolved': resolved,
+    }
+
+
+@shared_task
+def summarize_bottleneck_detection(shard_results):
+    """Combine per-shard bottleneck detection results."""
+    summary = {'shards': len(shard_results), 'projects': 0, 'bottlenecks': 0, 'critical': 0, 'resolved': 0}
+    for result in shard_results:
+        for key in ('projects', 'bottlenecks', 'critical', 'resolved'):
+            summary[key] += result.get(key, 0)
+    return summary
 
 
 @shared_task
@@ -204,11 +250,20 @@ def analyze_team_burnout():
     from .ai_services import BurnoutDetectionService
     from users.models import User
     
-    users = User.objects.filter(is_active=True)
+    users = User.objects.filter(is_active=True).select_related('manager').order_by('id')
     
-    for user in users:
-        service = BurnoutDetectionService(user)
-        service.analyze_burnout_risk(days=14)
+    # Analyze in chunks so each batch of users costs a fixed number of queries
+    chunk_size = 500
+    analyzed = 0
+    last_id = 0
+    while True:
+        chunk = list(users.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        analyzed += len(BurnoutDetectionService.analyze_users(chunk, days=14))
+        last_id = chunk[-1].id
+    
+    return f"Analyzed burnout risk for {analyzed} users"
 
 
 @shared_task
@@ -354,9 +409,9 @@ def process_git_event(repo_id, event_type, event_data):
 def send_daily_standup_messages():
     """Send daily standup summaries to chat integrations."""
     from .models import ChatIntegration
+    from .http_client import get_http_client
     from tasks.models import Task
     from users.models import User
-    import requests
     
     integrations = ChatIntegration.objects.filter(
         is_active=True,
@@ -390,7 +445,7 @@ def send_daily_standup_messages():
         
         # Send to platform
         if integration.platform == 'slack':
-            requests.post(
+            get_http_client().post(
                 'https://slack.com/api/chat.postMessage',
                 headers={
                     'Authorization': f'Bearer {integration.access_token}',
@@ -445,63 +500,267 @@ def sync_calendar_events():
 
 
 @shared_task
-def check_deadline_approaching():
-    """Check for approaching deadlines and trigger workflows."""
-    from .models import Workflow
-    from .services import WorkflowTriggerService
+def check_deadline_approaching(batch_size=100):
+    """
+    Fire deadline_approaching workflows for tasks entering their window.
+    
+    Workflows are loaded first and grouped by company, so companies without
+    such workflows cost nothing. Each company needs one task query bounded
+    by its largest ``hours_before``. Workflow/task pairs that already fired
+    for the current deadline are skipped; the company's workflow rows are
+    locked while firings are read and written, so overlapping beats cannot
+    both fire a pair, and runs are enqueued once the firings are committed.
+    """
+    from collections import defaultdict
+    from .models import Workflow, DeadlineTriggerFiring
     from tasks.models import Task
     
-    # Find tasks with deadlines in the next 24 hours
-    upcoming_deadline = timezone.now() + timedelta(hours=24)
+    now = timezone.now()
     
-    tasks = Task.objects.filter(
-        deadline__lte=upcoming_deadline,
-        deadline__gt=timezone.now(),
-        status__in=['open', 'in_progress']
-    )
+    workflow_ids_by_company = defaultdict(list)
+    for workflow_id, company_id in Workflow.objects.filter(
+        trigger_type='deadline_approaching', is_active=True
+    ).values_list('id', 'company_id'):
+        workflow_ids_by_company[company_id].append(workflow_id)
     
-    for task in tasks:
-        # Get workflows for this trigger
-        workflows = Workflow.objects.filter(
-            company=task.project.company,
-            trigger_type='deadline_approaching',
-            is_active=True
-        )
-        
-        for workflow in workflows:
-            hours_until = (task.deadline - timezone.now()).total_seconds() / 3600
-            config = workflow.trigger_config
+    enqueued_at = timezone.now().isoformat()
+    fired = 0
+    for company_id, workflow_ids in workflow_ids_by_company.items():
+        with transaction.atomic():
+            workflows = list(
+                Workflow.objects.select_for_update().filter(id__in=workflow_ids, is_active=True).order_by('id')
+            )
+            if not workflows:
+                continue
+            max_hours = max(w.trigger_config.get('hours_before', 24) for w in workflows)
+            
+            tasks = list(
+                Task.objects.select_related('project').filter(
+                    project__company_id=company_id,
+                    deadline__gt=now,
+                    deadline__lte=now + timedelta(hours=max_hours),
+                    status__in=['open', 'in_progress']
+                )
+            )
+            if not tasks:
+                continue
             
-            trigger_hours = config.get('hours_before', 24)
+            already_fired = set(
+                DeadlineTriggerFiring.objects.filter(
+                    workflow__in=workflows,
+                    task__in=tasks
+                ).values_list('workflow_id', 'task_id', 'deadline')
+            )
             
-            if hours_until <= trigger_hours:
-                context = {
-                    'task': task,
-                    'hours_until_deadline': hours_until
-                }
-                workflow.execute(context)
+            firings = []
+            runs = []
+            for workflow in workflows:
+                trigger_hours = workflow.trigger_config.get('hours_before', 24)
+                for task in tasks:
+                    if workflow.project_filter_id and workflow.project_filter_id != task.project_id:
+                        continue
+                    hours_until = (task.deadline - now).total_seconds() / 3600
+                    if hours_until > trigger_hours:
+                        continue
+                    if (workflow.id, task.id, task.deadline) in already_fired:
+                        continue
+                    firings.append(DeadlineTriggerFiring(workflow=workflow, task=task, deadline=task.deadline))
+                    runs.append((workflow.id, {'task_id': task.id, 'hours_until_deadline': hours_until}))
+            
+            DeadlineTriggerFiring.objects.bulk_create(firings)
+            transaction.on_commit(lambda runs=runs: [
+                execute_workflow_batch.delay(runs[start:start + batch_size], enqueued_at)
+                for start in range(0, len(runs), batch_size)
+            ])
+            fired += len(runs)
+    
+    # Firings for deadlines that have passed can never match again
+    DeadlineTriggerFiring.objects.filter(deadline__lt=now - timedelta(days=1)).delete()
+    
+    return fired
+
+
+@shared_task
+def run_scheduled_workflows(batch_size=500):
+    """
+    Run schedule-triggered workflows whose next_run_at is due.
+    
+    Only due rows are read (indexed on next_run_at), in batches locked with
+    SKIP LOCKED so concurrent beats never double-run a workflow. Runs missed
+    while beat or the workers were down are caught up, up to
+    SCHEDULED_WORKFLOW_MAX_CATCH_UP per workflow; older ones are coalesced.
+    """
+    from .models import Workflow
+    from .scheduling import ScheduleError
+    
+    max_catch_up = getattr(settings, 'SCHEDULED_WORKFLOW_MAX_CATCH_UP', 3)
+    now = timezone.now()
+    dispatched = 0
+    
+    while True:
+        with transaction.atomic():
+            due = list(
+                Workflow.objects.select_for_update(skip_locked=True).filter(
+                    trigger_type='schedule',
+                    is_active=True,
+                    next_run_at__lte=now
+                ).order_by('next_run_at')[:batch_size]
+            )
+            if not due:
+                break
+            
+            runs = []
+            for workflow in due:
+                try:
+                    schedule = workflow.get_schedule()
+                    occurrences = schedule.latest_between(workflow.next_run_at, now, limit=max_catch_up)
+                    coalesced = schedule.count_between(workflow.next_run_at, now) - len(occurrences)
+                    workflow.next_run_at = schedule.next_after(now)
+                except ScheduleError:
+                    # Unparseable schedule: stop selecting it until it is edited
+                    workflow.next_run_at = None
+                    continue
+                
+                for scheduled_for in occurrences:
+                    runs.append((workflow.id, {
+                        'scheduled': True,
+                        'scheduled_for': scheduled_for.isoformat(),
+                        'coalesced_runs': coalesced,
+                    }))
+            
+            Workflow.objects.bulk_update(due, ['next_run_at'])
+            
+            enqueued_at = timezone.now().isoformat()
+            transaction.on_commit(lambda runs=runs: [
+                execute_workflow.delay(workflow_id, context, enqueued_at)
+                for workflow_id, context in runs
+            ])
+            dispatched += len(runs)
+    
+    return dispatched
 
 
 @shared_task
-def run_scheduled_workflows():
-    """Run workflows with schedule triggers."""
+def execute_workflow(workflow_id, context, enqueued_at=None):
+    """Execute one workflow with a JSON context (ids, not model instances)."""
+    execute_workflow_batch([(workflow_id, context)], enqueued_at)
+
+
+@shared_task
+def execute_workflow_batch(runs, enqueued_at=None):
+    """Execute ``(workflow_id, context)`` pairs, loading workflows and tasks in bulk."""
     from .models import Workflow
+    from .services import ExecutionLogBuffer, hydrate_contexts
+    from django.utils.dateparse import parse_datetime
+    
+    if not runs:
+        return
+    
+    enqueued_at = parse_datetime(enqueued_at) if enqueued_at else None
+    workflows = Workflow.objects.filter(is_active=True).in_bulk({workflow_id for workflow_id, _ in runs})
+    contexts = hydrate_contexts([context for _, context in runs])
+    
+    with ExecutionLogBuffer() as log_buffer:
+        for (workflow_id, _), context in zip(runs, contexts):
+            workflow = workflows.get(workflow_id)
+            if workflow:
+                workflow.execute(context, enqueued_at=enqueued_at, log_buffer=log_buffer)
+
+
+def _merge_average(old_avg, old_count, new_avg, new_count):
+    """Combine two averages weighted by their sample counts."""
+    if old_avg is None or not old_count:
+        return new_avg
+    if new_avg is None:
+        return old_avg
+    return (old_avg * old_count + new_avg * new_count) / (old_count + new_count)
+
+
+@shared_task
+def compact_workflow_executions(retention_days=None, chunk_size=5000):
+    """
+    Roll up and delete WorkflowExecution rows past the retention window.
     
-    workflows = Workflow.objects.filter(
-        trigger_type='schedule',
-        is_active=True
+    Each whole day older than WORKFLOW_EXECUTION_RETENTION_DAYS is
+    aggregated into WorkflowExecutionDailyStats (merged with any existing
+    row) and its raw rows deleted in chunks, one transaction per day.
+    """
+    from datetime import datetime, time
+    from django.db.models import Avg, Count, Max, Q
+    from .models import WorkflowExecution, WorkflowExecutionDailyStats
+    
+    if retention_days is None:
+        retention_days = getattr(settings, 'WORKFLOW_EXECUTION_RETENTION_DAYS', 30)
+    cutoff = (timezone.now() - timedelta(days=retention_days)).replace(
+        hour=0, minute=0, second=0, microsecond=0
     )
     
-    for workflow in workflows:
-        config = workflow.trigger_config
-        
-        # Check if it's time to run
-        schedule_hour = config.get('hour', 9)
-        schedule_minute = config.get('minute', 0)
-        schedule_days = config.get('days', [0, 1, 2, 3, 4])  # Weekdays by default
-        
-        now = timezone.now()
+    deleted = 0
+    for day in WorkflowExecution.objects.filter(started_at__lt=cutoff).dates('started_at', 'day'):
+        day_start = datetime.combine(day, time.min, tzinfo=cutoff.tzinfo)
+        expired = WorkflowExecution.objects.filter(
+            started_at__gte=day_start,
+            started_at__lt=day_start + timedelta(days=1)
+        )
         
-        if now.weekday() in schedule_days:
-            if now.hour == schedule_hour and now.minute == schedule_minute:
-                workflow.execute({'scheduled': True})
+        with transaction.atomic():
+            rows = expired.values('workflow_id').annotate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(status='completed')),
+                failed=Count('id', filter=Q(status='failed')),
+                skipped=Count('id', filter=Q(status='skipped')),
+                avg_duration_ms=Avg('duration_ms'),
+                max_duration_ms=Max('duration_ms'),
+                avg_queue_latency_ms=Avg('queue_latency_ms'),
+            )
+            existing = {
+                stats.workflow_id: stats
+                for stats in WorkflowExecutionDailyStats.objects.select_for_update().filter(date=day)
+            }
+            
+            new_stats, changed_stats = [], []
+            for row in rows:
+                stats = existing.get(row['workflow_id'])
+                if stats is None:
+                    stats = WorkflowExecutionDailyStats(workflow_id=row['workflow_id'], date=day)
+                    new_stats.append(stats)
+                else:
+                    changed_stats.append(stats)
+                
+                stats.avg_duration_ms = _merge_average(
+                    stats.avg_duration_ms, stats.total, row['avg_duration_ms'], row['total']
+                )
+                stats.avg_queue_latency_ms = _merge_average(
+                    stats.avg_queue_latency_ms, stats.total, row['avg_queue_latency_ms'], row['total']
+                )
+                stats.max_duration_ms = max(
+                    (v for v in (stats.max_duration_ms, row['max_duration_ms']) if v is not None),
+                    default=None
+                )
+                stats.total += row['total']
+                stats.completed += row['completed']
+                stats.failed += row['failed']
+                stats.skipped += row['skipped']
+            
+            WorkflowExecutionDailyStats.objects.bulk_create(new_stats)
+            WorkflowExecutionDailyStats.objects.bulk_update(
+                changed_stats,
+                ['total', 'completed', 'failed', 'skipped',
+                 'avg_duration_ms', 'max_duration_ms', 'avg_queue_latency_ms']
+            )
+            
+            while True:
+                ids = list(expired.values_list('id', flat=True)[:chunk_size])
+                if not ids:
+                    break
+                deleted += WorkflowExecution.objects.filter(id__in=ids).delete()[0]
+    
+    return deleted
+
+
+@shared_task
+def dispatch_workflow_trigger(trigger_name, params, enqueued_at=None):
+    """Match and execute workflows for a trigger queued by the automation signals."""
+    from .services import WorkflowTriggerService
+    
+    WorkflowTriggerService.dispatch(trigger_name, params, enqueued_at)
@@ -0,0 +1,138 @@
+"""
+Compiled ``{{placeholder}}`` templates for workflow and notification messages.
+
+A template is parsed once into literal/variable parts (cached by source
+text, so an edited action or rule compiles afresh). Rendering goes through a
+RenderContext, which resolves only the variables a template references and
+remembers them, so one context can render any number of messages without
+touching the database again.
+"""
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+from django.utils import timezone
+
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*([A-Za-z_][\w.]*)\s*\}\}')
+
+_MISSING = object()
+
+# Values a placeholder may render; anything else (model instances, lists of
+# users, ...) renders as an empty string so its __str__ is never exposed
+SCALAR_TYPES = (str, int, float, Decimal, date, datetime, time, timedelta)
+
+# Fields a dotted placeholder may read, by model; relations listed here are
+# followed into their own model's entry. Anything else is never rendered.
+TEMPLATE_FIELDS = {
+    'tasks.task': {
+        'title', 'status', 'priority', 'deadline', 'progress_percentage',
+        'estimated_hours', 'started_at', 'completed_at', 'assigned_to', 'project',
+    },
+    'projects.project': {'title', 'status', 'priority', 'start_date', 'end_date', 'progress_percentage'},
+    'progress.progressupdate': {'task', 'user', 'progress_percentage', 'status', 'hours_worked'},
+    'users.user': {'name'},
+}
+
+
+class CompiledTemplate:
+    """A template split into literal text and variable references."""
+
+    __slots__ = ('source', 'parts', 'variables')
+
+    def __init__(self, source):
+        self.source = source
+        self.parts = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            if match.start() > position:
+                self.parts.append((source[position:match.start()], None))
+            self.parts.append((match.group(0), match.group(1)))
+            position = match.end()
+        if position < len(source):
+            self.parts.append((source[position:], None))
+        self.variables = frozenset(name for _, name in self.parts if name)
+
+    def render(self, values):
+        """Render with resolved values; unknown placeholders are left as written."""
+        output = []
+        for text, name in self.parts:
+            if name is None:
+                output.append(text)
+                continue
+            value = values.get(name, _MISSING)
+            output.append(text if value is _MISSING else str(value))
+        return ''.join(output)
+
+
+@lru_cache(maxsize=2048)
+def compile_template(source):
+    """Parse a template once; repeated sources share the compiled form."""
+    return CompiledTemplate(source or '')
+
+
+class RenderContext:
+    """
+    Lazily resolved template variables for one context.
+
+    ``aliases`` maps flat variable names to callables taking the context;
+    any other name is looked up as a dotted path (``task.title``) on the
+    context values. Each step of a path must be a field listed for its
+    model in TEMPLATE_FIELDS; any other path is left unrendered. Only
+    scalar values are rendered: a path ending on a model instance (such as
+    ``{{task.assigned_to}}`` or ``{{user}}``) renders empty.
+    """
+
+    def __init__(self, context, aliases=None):
+        self.context = context
+        self.aliases = aliases or {}
+        self.values = {}
+
+    def render(self, template):
+        if not template:
+            return ''
+        compiled = compile_template(template)
+        for name in compiled.variables - self.values.keys():
+            self.values[name] = self._lookup(name)
+        return compiled.render(self.values)
+
+    def _lookup(self, name):
+        value = self._resolve(name)
+        if value is _MISSING or isinstance(value, SCALAR_TYPES):
+            return value
+        return ''
+
+    def _resolve(self, name):
+        alias = self.aliases.get(name)
+        if alias is not None:
+            return alias(self.context)
+
+        head, *attributes = name.split('.')
+        value = self.context.get(head, _MISSING)
+        for attribute in attributes:
+            meta = getattr(value, '_meta', None)
+            if meta is None or attribute not in TEMPLATE_FIELDS.get(meta.label_lower, ()):
+                return _MISSING
+            value = getattr(value, attribute)
+        return value
+
+
+def _task_attr(attribute):
+    def resolve(context):
+        task = context.get('task')
+        return getattr(task, attribute) if task else ''
+    return resolve
+
+
+# Variables available to workflow action templates
+WORKFLOW_TEMPLATE_VARIABLES = {
+    'task_title': _task_attr('title'),
+    'task_status': _task_attr('status'),
+    'task_priority': _task_attr('priority'),
+    'task_deadline': lambda c: str(c['task'].deadline) if c.get('task') and c['task'].deadline else '',
+    'assignee_name': lambda c: c['task'].assigned_to.name if c.get('task') and c['task'].assigned_to else 'Unassigned',
+    'project_name': lambda c: c['task'].project.title if c.get('task') else '',
+    'user_name': lambda c: c['user'].name if c.get('user') else '',
+    'timestamp': lambda c: timezone.now().strftime('%Y-%m-%d %H:%M'),
+}
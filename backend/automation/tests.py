@@ -0,0 +1,645 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .dependency_graph import DependencyGraph, Edge, TaskNode
+from .expressions import ExpressionError, compile_condition, compile_expression
+from .http_client import OutboundHTTPClient, OutboundRequest
+from .scheduling import CronSchedule, ScheduleError
+from .templating import RenderContext
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Records each request's client port; ``/slow`` sleeps, ``/fail`` returns 500."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        server = self.server
+        with server.lock:
+            server.client_ports.append(self.client_address[1])
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+
+        if self.path == '/slow':
+            time.sleep(body.get('sleep', 0.5))
+        status = 500 if self.path == '/fail' else 200
+
+        with server.lock:
+            server.active -= 1
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OutboundHTTPClientTests(SimpleTestCase):
+    """Exercise the shared outbound client against a local stub server."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.client_ports = []
+        self.server.active = 0
+        self.server.max_active = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuses_keep_alive_connection(self):
+        client = OutboundHTTPClient(timeout=2)
+        for _ in range(5):
+            self.assertTrue(client.post(f'{self.base_url}/ok', json={}).ok)
+        client.close()
+
+        self.assertEqual(len(self.server.client_ports), 5)
+        self.assertEqual(len(set(self.server.client_ports)), 1)
+
+    def test_timeout_is_enforced_and_recorded(self):
+        client = OutboundHTTPClient(timeout=0.2)
+        response = client.post(f'{self.base_url}/slow', json={'sleep': 1})
+        client.close()
+
+        self.assertFalse(response.ok)
+        self.assertTrue(response.error)
+        self.assertLess(response.elapsed_ms, 1000)
+        stats = client.metrics()[self.base_url]
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['errors'], 1)
+
+    def test_send_many_runs_concurrently_within_bound(self):
+        client = OutboundHTTPClient(timeout=2, max_concurrency=3)
+        batch = [
+            OutboundRequest(url=f'{self.base_url}/slow', json={'sleep': 0.3})
+            for _ in range(6)
+        ]
+        started = time.perf_counter()
+        responses = client.send_many(batch)
+        elapsed = time.perf_counter() - started
+        client.close()
+
+        self.assertTrue(all(response.ok for response in responses))
+        self.assertEqual(self.server.max_active, 3)
+        self.assertLess(elapsed, 6 * 0.3)
+
+    def test_metrics_track_errors_per_destination(self):
+        client = OutboundHTTPClient(timeout=2)
+        client.send_many([
+            OutboundRequest(url=f'{self.base_url}/ok', json={}),
+            OutboundRequest(url=f'{self.base_url}/fail', json={}),
+        ])
+        client.close()
+
+        stats = client.metrics()[self.base_url]
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['last_error'], 'HTTP 500')
+
+
+class RenderContextTests(SimpleTestCase):
+    """Dotted placeholders only reach whitelisted fields."""
+
+    def setUp(self):
+        from projects.models import Project
+        from tasks.models import Task
+        from users.models import User
+
+        assignee = User(name='Alice', email='alice@example.com', password='hash')
+        self.context = {
+            'task': Task(title='Ship it', status='open', assigned_to=assignee, created_by=assignee,
+                         project=Project(title='Launch')),
+        }
+
+    def test_renders_whitelisted_paths(self):
+        rendered = RenderContext(self.context).render('{{task.title}} for {{task.assigned_to.name}} in {{task.project.title}}')
+        self.assertEqual(rendered, 'Ship it for Alice in Launch')
+
+    def test_other_paths_are_left_unrendered(self):
+        for template in (
+            '{{task.assigned_to.password}}',
+            '{{task.assigned_to.email}}',
+            '{{task.created_by.name}}',
+            '{{task.project.company}}',
+            '{{task.__class__}}',
+        ):
+            self.assertEqual(RenderContext(self.context).render(template), template)
+
+    def test_model_values_never_render_their_str(self):
+        user = self.context['task'].assigned_to
+        context = dict(self.context, user=user, new_assignee=user, assignee=user, team_members=[user])
+        rendered = RenderContext(context).render(
+            '{{task.assigned_to}} | {{user}} | {{new_assignee}} | {{assignee}} | {{team_members}} | {{task}}'
+        )
+        self.assertNotIn('alice@example.com', rendered)
+        self.assertEqual(rendered, ' |  |  |  |  | ')
+        self.assertEqual(RenderContext(context).render('{{user.name}}'), 'Alice')
+
+
+class ExpressionTests(SimpleTestCase):
+    """The custom-condition sandbox accepts a safe subset and fails closed."""
+
+    def test_evaluates_supported_syntax(self):
+        predicate = compile_expression("priority in ['high', 'urgent'] and deadline - now() < days(2)")
+        soon = timezone.now() + timedelta(days=1)
+        self.assertTrue(predicate({'priority': 'high', 'deadline': soon}))
+        self.assertFalse(predicate({'priority': 'low', 'deadline': soon}))
+        self.assertTrue(compile_expression('task.status == "open"')({'task.status': 'open'}))
+
+    def test_rejects_unsafe_nodes(self):
+        for source in (
+            "__import__('os').system('true')",
+            'task.__class__',
+            'open("/etc/passwd")',
+            '[x for x in range(10)]',
+            'lambda: 1',
+            '',
+            'x' * 2000,
+        ):
+            with self.assertRaises(ExpressionError, msg=source):
+                compile_expression(source)
+
+    def test_runtime_errors_evaluate_false(self):
+        predicate = compile_expression('deadline - now() < days(2)')
+        self.assertFalse(predicate({'deadline': None}))
+        self.assertFalse(compile_expression('progress_percentage / 0 > 1')({'progress_percentage': 5}))
+        # Repeating strings is refused at run time
+        self.assertFalse(compile_expression("len(title * 1000000) > 0")({'title': 'x'}))
+
+    def test_invalid_custom_condition_fails_closed(self):
+        self.assertFalse(compile_condition('custom', {'expression': 'import os'})({}))
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class CronScheduleTests(SimpleTestCase):
+    """Cron parsing, next occurrences and catch-up windows."""
+
+    def test_parses_fields(self):
+        schedule = CronSchedule.from_cron('*/15 9-17 * * 1-5')
+        self.assertEqual(schedule.minutes, [0, 15, 30, 45])
+        self.assertEqual(schedule.hours, list(range(9, 18)))
+        # Cron Monday-Friday are Python weekdays 0-4
+        self.assertEqual(schedule.weekdays, {0, 1, 2, 3, 4})
+
+    def test_rejects_invalid_expressions(self):
+        for expression in ('* * * *', '60 * * * *', '*/0 * * * *', '5-1 * * * *', 'x * * * *'):
+            with self.assertRaises(ScheduleError, msg=expression):
+                CronSchedule.from_cron(expression)
+        with self.assertRaises(ScheduleError):
+            CronSchedule.from_trigger_config({'hour': 25})
+
+    def test_next_after_skips_to_matching_day(self):
+        schedule = CronSchedule.from_cron('30 9 * * 1')
+        # Friday 2026-10-16 10:00 -> Monday 2026-10-19 09:30
+        self.assertEqual(schedule.next_after(utc(2026, 10, 16, 10, 0)), utc(2026, 10, 19, 9, 30))
+        # Strictly after: an occurrence itself moves on a week
+        self.assertEqual(schedule.next_after(utc(2026, 10, 19, 9, 30)), utc(2026, 10, 26, 9, 30))
+
+    def test_day_of_month_or_weekday(self):
+        # Both restricted: either may match (the 1st, or any Sunday)
+        schedule = CronSchedule.from_cron('0 0 1 * 0')
+        self.assertEqual(schedule.next_after(utc(2026, 10, 19)), utc(2026, 10, 25))
+        self.assertEqual(schedule.next_after(utc(2026, 10, 26)), utc(2026, 11, 1))
+
+    def test_latest_and_count_between(self):
+        schedule = CronSchedule.from_cron('* * * * *')
+        start, end = utc(2025, 1, 1), utc(2026, 1, 1)
+        self.assertEqual(schedule.count_between(start, end), 365 * 24 * 60 + 1)
+        self.assertEqual(
+            schedule.latest_between(start, end, 2), [utc(2025, 12, 31, 23, 59), utc(2026, 1, 1)]
+        )
+
+        weekly = CronSchedule.from_cron('0 9 * * 1')
+        start, end = utc(2026, 10, 5, 9), utc(2026, 10, 20)
+        self.assertEqual(weekly.count_between(start, end), 3)
+        self.assertEqual(weekly.latest_between(start, end, 5), [
+            utc(2026, 10, 5, 9), utc(2026, 10, 12, 9), utc(2026, 10, 19, 9),
+        ])
+
+
+class RunScheduledWorkflowsTests(TestCase):
+    """Due workflows are caught up to the limit and the rest coalesced."""
+
+    def setUp(self):
+        from users.models import Company, User
+
+        self.company = Company.objects.create(name='Acme')
+        self.user = User.objects.create_user(email='a@example.com', password='x', name='A', company=self.company)
+
+    @override_settings(SCHEDULED_WORKFLOW_MAX_CATCH_UP=3)
+    @mock.patch('automation.tasks.execute_workflow.delay')
+    def test_catches_up_and_coalesces_missed_runs(self, delay):
+        from .models import Workflow
+        from .tasks import run_scheduled_workflows
+
+        workflow = Workflow.objects.create(
+            name='Hourly', company=self.company, created_by=self.user,
+            trigger_type='schedule', trigger_config={'cron': '0 * * * *'},
+        )
+        now = utc(2026, 10, 19, 12, 30)
+        last_hour = utc(2026, 10, 19, 12)
+        Workflow.objects.filter(id=workflow.id).update(next_run_at=last_hour - timedelta(hours=9))
+
+        with mock.patch('django.utils.timezone.now', return_value=now), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(run_scheduled_workflows(), 3)
+
+        contexts = [call.args[1] for call in delay.call_args_list]
+        self.assertEqual([c['scheduled_for'] for c in contexts], [
+            (last_hour - timedelta(hours=hours)).isoformat() for hours in (2, 1, 0)
+        ])
+        self.assertTrue(all(c['coalesced_runs'] == 7 for c in contexts))
+        workflow.refresh_from_db()
+        self.assertEqual(workflow.next_run_at, utc(2026, 10, 19, 13))
+
+
+class WorkflowExecuteTests(TestCase):
+    """A failing action keeps the outbound results recorded before it."""
+
+    def setUp(self):
+        from users.models import Company, User
+
+        self.company = Company.objects.create(name='Acme')
+        self.user = User.objects.create_user(email='a@example.com', password='x', name='A', company=self.company)
+
+    def test_failure_keeps_outbound_results(self):
+        from .models import Workflow
+
+        workflow = Workflow.objects.create(
+            name='Hook', company=self.company, created_by=self.user, trigger_type='task_created',
+        )
+        sent = {'action_id': 1, 'ok': True, 'status_code': 200}
+
+        def execute_all(actions, context, execution):
+            execution.result_data.setdefault('outbound', []).append(sent)
+            raise RuntimeError('boom')
+
+        with mock.patch('automation.services.WorkflowActionExecutor.execute_all', side_effect=execute_all):
+            execution = workflow.execute({})
+
+        execution.refresh_from_db()
+        self.assertEqual(execution.status, 'failed')
+        self.assertEqual(execution.result_data, {'outbound': [sent], 'error': 'boom'})
+
+
+def build_graph(durations, edges):
+    """Graph of open tasks with ``{task_id: estimated_hours}`` and ``(pred, succ, type, lag)`` edges."""
+    nodes = {
+        task_id: TaskNode(id=task_id, project_id=1, title=f'T{task_id}', status='open', estimated_hours=hours)
+        for task_id, hours in durations.items()
+    }
+    return DependencyGraph(nodes, [Edge(pred, succ, kind, lag, True) for pred, succ, kind, lag in edges])
+
+
+class CriticalPathTests(SimpleTestCase):
+    """Forward/backward passes give early and late times and slack."""
+
+    def test_diamond(self):
+        # 1 -> 2 -> 4 and 1 -> 3 -> 4; durations in days are hours / 8
+        graph = build_graph({1: 16, 2: 24, 3: 8, 4: 8}, [
+            (1, 2, 'finish_to_start', 0),
+            (1, 3, 'finish_to_start', 0),
+            (2, 4, 'finish_to_start', 0),
+            (3, 4, 'finish_to_start', 0),
+        ])
+        result = graph.critical_path()
+        tasks = {task['task_id']: task for task in result['tasks']}
+
+        self.assertEqual(result['project_duration_days'], 6)
+        self.assertEqual(result['critical_path'], [1, 2, 4])
+        self.assertEqual((tasks[3]['earliest_start'], tasks[3]['latest_start']), (2, 4))
+        self.assertEqual(tasks[3]['slack_days'], 2)
+        self.assertEqual((tasks[4]['earliest_start'], tasks[4]['latest_finish']), (5, 6))
+
+    def test_lag_and_dependency_types(self):
+        graph = build_graph({1: 16, 2: 8, 3: 8}, [
+            (1, 2, 'start_to_start', 1),
+            (1, 3, 'finish_to_finish', 3),
+        ])
+        tasks = {task['task_id']: task for task in graph.critical_path()['tasks']}
+
+        self.assertEqual(tasks[2]['earliest_start'], 1)
+        # Task 3 must finish 3 days after task 1 finishes
+        self.assertEqual(tasks[3]['earliest_finish'], 5)
+        self.assertEqual(tasks[2]['slack_days'], 3)
+
+    def test_cycle_is_reported_not_scheduled(self):
+        graph = build_graph({1: 8, 2: 8, 3: 8}, [
+            (1, 2, 'finish_to_start', 0),
+            (2, 1, 'finish_to_start', 0),
+        ])
+        result = graph.critical_path()
+        self.assertEqual(result['cyclic_task_ids'], [1, 2])
+        self.assertEqual([task['task_id'] for task in result['tasks']], [3])
+
+
+class CascadeDelayTests(SimpleTestCase):
+    """Knock-on delay sums ``lag_days + 1`` over every downstream edge once."""
+
+    def test_shared_downstream_work_is_counted_once(self):
+        # 1 -> 2 -> 4, 1 -> 3 -> 4, 4 -> 5 (lag 2)
+        graph = build_graph({task_id: 8 for task_id in range(1, 6)}, [
+            (1, 2, 'finish_to_start', 0),
+            (1, 3, 'finish_to_start', 0),
+            (2, 4, 'finish_to_start', 0),
+            (3, 4, 'finish_to_start', 0),
+            (4, 5, 'finish_to_start', 2),
+        ])
+        self.assertEqual(graph.cascade_delays(), {1: 7, 2: 4, 3: 4, 4: 3, 5: 0})
+        self.assertEqual(graph.cascade_delays([2]), {2: 4})
+
+    def test_matches_plain_walk(self):
+        edges = [
+            (i, j, 'finish_to_start', (i * j) % 3)
+            for i in range(1, 40) for j in range(i + 1, 40) if (i * 7 + j) % 5 == 0
+        ]
+        graph = build_graph({task_id: 8 for task_id in range(1, 40)}, edges)
+        expected = {
+            task_id: sum(
+                edge.lag_days + 1
+                for node_id in graph.descendants([task_id])
+                for edge in graph.successors[node_id]
+            )
+            for task_id in graph.nodes
+        }
+        self.assertEqual(graph.cascade_delays(), expected)
+
+    def test_tasks_on_cycles_fall_back_to_a_walk(self):
+        graph = build_graph({1: 8, 2: 8, 3: 8}, [
+            (1, 2, 'finish_to_start', 0),
+            (2, 1, 'finish_to_start', 1),
+            (2, 3, 'finish_to_start', 0),
+        ])
+        self.assertEqual(graph.cascade_delays([1, 3]), {1: 4, 3: 0})
+
+
+class DependencyBulkCreateTests(TestCase):
+    """Bulk dependency creation checks tenancy, duplicates and cycles as a batch."""
+
+    url = '/api/automation/dependencies/bulk_create/'
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        from projects.models import Project
+        from tasks.models import Task
+        from users.models import Company, User
+
+        company = Company.objects.create(name='Acme')
+        user = User.objects.create_user(email='a@example.com', password='x', name='A', company=company)
+        project = Project.objects.create(title='P', company=company, created_by=user)
+        self.tasks = [Task.objects.create(title=f'T{i}', project=project, created_by=user) for i in range(4)]
+
+        other = Company.objects.create(name='Other')
+        other_user = User.objects.create_user(email='o@example.com', password='x', name='O', company=other)
+        other_project = Project.objects.create(title='O', company=other, created_by=other_user)
+        self.other_task = Task.objects.create(title='O1', project=other_project, created_by=other_user)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def post(self, pairs):
+        return self.client.post(self.url, {
+            'dependencies': [{'predecessor': pred.id, 'successor': succ.id} for pred, succ in pairs],
+        }, format='json')
+
+    def test_creates_chain(self):
+        from .models import TaskDependency
+
+        a, b, c, _ = self.tasks
+        response = self.post([(a, b), (b, c)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TaskDependency.objects.count(), 2)
+
+    def test_rejects_cycles_and_duplicates_within_batch(self):
+        from .models import TaskDependency
+
+        a, b, c, d = self.tasks
+        TaskDependency.objects.create(predecessor=c, successor=d)
+        response = self.post([(a, b), (b, a), (c, d), (a, a)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('circular', response.data[1]['non_field_errors'][0])
+        self.assertIn('already exists', response.data[2]['non_field_errors'][0])
+        self.assertIn('itself', response.data[3]['non_field_errors'][0])
+        # Nothing from a rejected batch is written
+        self.assertEqual(TaskDependency.objects.count(), 1)
+
+    def test_update_can_reverse_a_dependency(self):
+        from .models import TaskDependency
+
+        a, b, c, _ = self.tasks
+        dependency = TaskDependency.objects.create(predecessor=a, successor=b)
+        TaskDependency.objects.create(predecessor=b, successor=c)
+        url = f'/api/automation/dependencies/{dependency.id}/'
+
+        response = self.client.patch(url, {'predecessor': b.id, 'successor': a.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        dependency.refresh_from_db()
+        self.assertEqual((dependency.predecessor_id, dependency.successor_id), (b.id, a.id))
+
+        # Other edges still count: c -> b would close b -> c -> b
+        response = self.client.patch(url, {'predecessor': c.id, 'successor': b.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_company_tasks_are_not_found(self):
+        from .models import TaskDependency
+
+        a = self.tasks[0]
+        with self.assertNumQueries(1):
+            response = self.post([(a, self.other_task)])
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(TaskDependency.objects.exists())
+
+
+class PlanAssignmentsTests(TestCase):
+    """The greedy planner only assigns tasks that fit a candidate's capacity."""
+
+    def setUp(self):
+        from projects.models import Project
+        from resources.models import UserCapacity
+        from users.models import Company, User
+
+        self.company = Company.objects.create(name='Acme')
+        self.manager = User.objects.create_user(
+            email='m@example.com', password='x', name='M', company=self.company, role='admin'
+        )
+        self.project = Project.objects.create(title='P', company=self.company, created_by=self.manager)
+        self.employees = [
+            User.objects.create_user(email=f'e{i}@example.com', password='x', name=f'E{i}', company=self.company)
+            for i in range(2)
+        ]
+        # One working hour per calendar day each
+        for employee in self.employees:
+            UserCapacity.objects.create(user=employee, hours_per_week=7)
+
+    def task(self, title, hours, deadline=None):
+        from tasks.models import Task
+        return Task.objects.create(
+            title=title, project=self.project, created_by=self.manager,
+            estimated_hours=hours, deadline=deadline,
+        )
+
+    def plan(self, **kwargs):
+        from .ai_services import ResourceAllocationService
+        return ResourceAllocationService(self.company).plan_assignments(**kwargs)
+
+    def test_spreads_work_and_leaves_what_does_not_fit(self):
+        first, second = self.task('A', 10), self.task('B', 10)
+        too_big = self.task('C', 40)
+        too_soon = self.task('D', 8, deadline=timezone.now() + timedelta(days=1))
+
+        plan = self.plan(horizon_days=14)
+
+        assigned = {a['task_id']: a['user_id'] for a in plan['assignments']}
+        self.assertEqual(set(assigned), {first.id, second.id})
+        self.assertNotEqual(assigned[first.id], assigned[second.id])
+        unassigned = {u['task_id']: u['reason'] for u in plan['unassigned']}
+        self.assertEqual(set(unassigned), {too_big.id, too_soon.id})
+        self.assertIn('before the deadline', unassigned[too_soon.id])
+        self.assertIn('14 days', unassigned[too_big.id])
+
+    def test_horizon_is_capped(self):
+        from .ai_services import ResourceAllocationService
+
+        self.task('A', 10)
+        plan = self.plan(horizon_days=10 ** 9)
+        self.assertEqual(len(plan['assignments']), 1)
+        self.assertLessEqual(
+            plan['utilization'][0]['capacity_hours'], ResourceAllocationService.MAX_PLANNING_DAYS
+        )
+
+    def test_apply_assigns_and_audits(self):
+        from audit.models import AuditLog
+        from .ai_services import ResourceAllocationService
+
+        task, taken = self.task('A', 4), self.task('B', 4)
+        taken.assigned_to = self.employees[1]
+        taken.save()
+
+        with mock.patch('automation.services.WorkflowTriggerService.enqueue'):
+            assigned = ResourceAllocationService(self.company).apply_assignments([
+                {'task_id': task.id, 'user_id': self.employees[0].id},
+                {'task_id': taken.id, 'user_id': self.employees[0].id},
+            ], user=self.manager)
+
+        self.assertEqual(assigned, [task.id])
+        task.refresh_from_db()
+        self.assertEqual(task.assigned_to, self.employees[0])
+        entry = AuditLog.objects.get(object_id=str(task.id), action='assign')
+        self.assertEqual(entry.user, self.manager)
+        self.assertEqual(entry.changes['assigned_to'], {'old': None, 'new': self.employees[0].id})
+
+
+class TeamAvailabilityTests(TestCase):
+    """The interval sweep finds windows free for every attendee."""
+
+    def setUp(self):
+        from users.models import Company, User
+
+        company = Company.objects.create(name='Acme')
+        self.alice, self.bob = [
+            User.objects.create_user(email=f'{name}@example.com', password='x', name=name, company=company)
+            for name in ('alice', 'bob')
+        ]
+        # Monday
+        self.start = utc(2026, 10, 19)
+
+    def event(self, user, start, end, event_type='meeting'):
+        from .models import CalendarEvent
+        return CalendarEvent.objects.create(
+            user=user, title='Busy', event_type=event_type, start_time=start, end_time=end
+        )
+
+    def windows(self, days=1, duration_minutes=60):
+        from .ai_services import CalendarSchedulingService
+        return [
+            (window['start'], window['end'])
+            for window in CalendarSchedulingService.find_team_availability(
+                [self.alice, self.bob], duration_minutes=duration_minutes, days=days, start=self.start
+            )
+        ]
+
+    def test_free_windows_merge_overlapping_busy_intervals(self):
+        from .ai_services import CalendarSchedulingService
+
+        busy = [
+            (utc(2026, 10, 19, 10), utc(2026, 10, 19, 12)),
+            (utc(2026, 10, 19, 11), utc(2026, 10, 19, 13)),
+            (utc(2026, 10, 19, 13), utc(2026, 10, 19, 13, 30)),
+            (utc(2026, 10, 19, 14), utc(2026, 10, 19, 14, 30)),
+        ]
+        windows = CalendarSchedulingService._free_windows(
+            busy, utc(2026, 10, 19, 9), utc(2026, 10, 19, 16), timedelta(minutes=30)
+        )
+        self.assertEqual(windows, [
+            (utc(2026, 10, 19, 9), utc(2026, 10, 19, 10)),
+            (utc(2026, 10, 19, 13, 30), utc(2026, 10, 19, 14)),
+            (utc(2026, 10, 19, 14, 30), utc(2026, 10, 19, 16)),
+        ])
+
+    def test_busy_times_of_all_attendees_are_excluded(self):
+        self.event(self.alice, utc(2026, 10, 19, 10), utc(2026, 10, 19, 12))
+        self.event(self.bob, utc(2026, 10, 19, 11), utc(2026, 10, 19, 13))
+        # Reminders and deadlines do not take up time
+        self.event(self.bob, utc(2026, 10, 19, 15), utc(2026, 10, 19, 16), event_type='reminder')
+
+        self.assertEqual(self.windows(), [
+            (utc(2026, 10, 19, 9), utc(2026, 10, 19, 10)),
+            (utc(2026, 10, 19, 13), utc(2026, 10, 19, 18)),
+        ])
+
+    def test_custom_work_hours_and_time_off(self):
+        from datetime import time as clock
+        from resources.models import UserCapacity
+
+        UserCapacity.objects.create(
+            user=self.alice, work_day_start=clock(8), work_day_end=clock(16), time_off_days=['2026-10-20']
+        )
+        UserCapacity.objects.create(user=self.bob, work_day_start=clock(10), work_day_end=clock(19))
+
+        # Overlap of 8-16 and 10-19 on Monday; Tuesday off for Alice
+        self.assertEqual(self.windows(days=3), [
+            (utc(2026, 10, 19, 10), utc(2026, 10, 19, 16)),
+            (utc(2026, 10, 21, 10), utc(2026, 10, 21, 16)),
+        ])
+
+    def test_weekends_and_short_gaps_are_skipped(self):
+        self.event(self.alice, utc(2026, 10, 23, 9, 30), utc(2026, 10, 23, 18))
+        # Friday leaves only 30 minutes; Saturday and Sunday are off
+        self.assertEqual(self.windows(days=7), [
+            (utc(2026, 10, day, 9), utc(2026, 10, day, 18)) for day in (19, 20, 21, 22)
+        ])
+
+    def test_view_rejects_non_integer_user_ids(self):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        url = '/api/automation/schedule-suggestions/team_availability/'
+        for user_ids in (['abc'], [None], 'abc'):
+            response = client.post(url, {'user_ids': user_ids}, format='json')
+            self.assertEqual(response.status_code, 400, user_ids)
+
+        response = client.post(url, {'user_ids': [str(self.alice.id), self.bob.id], 'days': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.data['user_ids']), [self.alice.id, self.bob.id])
@@ -7,6 +7,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
 
 from .models import (
@@ -24,8 +25,9 @@ from .models import (
 )
 from .serializers import (
     WorkflowSerializer, WorkflowCreateSerializer, WorkflowExecutionSerializer,
+    WorkflowExecutionDailyStatsSerializer,
     WorkflowConditionSerializer, WorkflowActionSerializer,
-    TaskDependencySerializer, DependencyBottleneckSerializer,
+    TaskDependencySerializer, TaskDependencyBulkItemSerializer, DependencyBottleneckSerializer,
     EscalationRuleSerializer, EscalationSerializer,
     CalendarEventSerializer, ScheduleSuggestionSerializer,
     ChatIntegrationSerializer,
@@ -95,6 +97,14 @@ class WorkflowViewSet(viewsets.ModelViewSet):
         
         return Response(WorkflowExecutionSerializer(executions, many=True).data)
     
+    @action(detail=True, methods=['get'])
+    def daily_stats(self, request, pk=None):
+        """Get rolled-up daily execution stats for a workflow."""
+        workflow = self.get_object()
+        stats = workflow.daily_stats.all()[:90]
+        
+        return Response(WorkflowExecutionDailyStatsSerializer(stats, many=True).data)
+    
     @action(detail=True, methods=['post'])
     def add_condition(self, request, pk=None):
         """Add a condition to the workflow."""
@@ -143,6 +153,8 @@ class TaskDependencyViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = TaskDependencySerializer
     
+    BULK_CREATE_LIMIT = 1000
+    
     def get_queryset(self):
         user = self.request.user
         return TaskDependency.objects.filter(
@@ -165,12 +177,84 @@ class TaskDependencyViewSet(viewsets.ModelViewSet):
         })
     
     @action(detail=False, methods=['post'])
-    def recalculate_timeline(self, request):
-        """Recalculate timeline for a project."""
+    def bulk_create(self, request):
+        """Create a batch of dependencies, validated together against one graph load."""
+        from projects.models import Project
         from tasks.models import Task
+        from .dependency_graph import DependencyGraph, Edge, bump_graph_version
         from .services import DependencyManager
         
-        project_id = request.data.get('project_id')
+        items = request.data.get('dependencies')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'dependencies must be a non-empty list'}, status=400)
+        if len(items) > self.BULK_CREATE_LIMIT:
+            return Response({'error': f'At most {self.BULK_CREATE_LIMIT} dependencies per request'}, status=400)
+        
+        serializer = TaskDependencyBulkItemSerializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+        
+        # Resolve every task once; unknown or other companies' tasks stop here, before any graph is read
+        task_ids = {item[key] for item in items for key in ('predecessor', 'successor')}
+        tasks = Task.objects.filter(project__company=request.user.company).in_bulk(task_ids)
+        if len(tasks) != len(task_ids):
+            return Response({'error': 'Tasks not found'}, status=404)
+        
+        # Each accepted item joins the graph, so later items are checked against earlier ones
+        graph = DependencyGraph.for_tasks(task_ids, company_id=request.user.company_id)
+        errors = []
+        for item in items:
+            predecessor_id, successor_id = item['predecessor'], item['successor']
+            if predecessor_id == successor_id:
+                errors.append({'non_field_errors': ['A task cannot depend on itself.']})
+            elif graph.has_edge(predecessor_id, successor_id):
+                errors.append({'non_field_errors': ['This dependency already exists.']})
+            elif graph.would_create_cycle(predecessor_id, successor_id):
+                errors.append({'non_field_errors': ['This dependency would create a circular dependency.']})
+            else:
+                errors.append({})
+                graph.add_edge(Edge(
+                    predecessor_id, successor_id, item['dependency_type'], item['lag_days'], item['auto_adjust_dates']
+                ))
+        if any(errors):
+            return Response(errors, status=400)
+        
+        with transaction.atomic():
+            created = TaskDependency.objects.bulk_create([
+                TaskDependency(
+                    predecessor=tasks[item['predecessor']],
+                    successor=tasks[item['successor']],
+                    dependency_type=item['dependency_type'],
+                    lag_days=item['lag_days'],
+                    auto_adjust_dates=item['auto_adjust_dates'],
+                )
+                for item in items
+            ])
+        
+        # bulk_create skips save signals: invalidate cached results and shift dates here
+        roots_by_project = {}
+        for item in items:
+            predecessor, successor = tasks[item['predecessor']], tasks[item['successor']]
+            roots_by_project.setdefault(predecessor.project_id, set())
+            roots_by_project.setdefault(successor.project_id, set())
+            if item['auto_adjust_dates']:
+                roots_by_project[predecessor.project_id].add(predecessor.id)
+        for project in Project.objects.filter(id__in=roots_by_project):
+            bump_graph_version(project.id)
+            if roots_by_project[project.id]:
+                DependencyManager(project).recalculate_from_tasks(roots_by_project[project.id])
+        
+        dependencies = TaskDependency.objects.filter(
+            id__in=[dependency.id for dependency in created]
+        ).select_related('predecessor', 'successor')
+        return Response(TaskDependencySerializer(dependencies, many=True).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['get'])
+    def critical_path(self, request):
+        """Critical path, earliest/latest dates and slack for a project's tasks."""
+        from .services import DependencyManager
+        
+        project_id = request.query_params.get('project_id')
         if not project_id:
             return Response({'error': 'project_id required'}, status=400)
         
@@ -180,19 +264,32 @@ class TaskDependencyViewSet(viewsets.ModelViewSet):
         except Project.DoesNotExist:
             return Response({'error': 'Project not found'}, status=404)
         
-        manager = DependencyManager(project)
+        return Response(DependencyManager(project).critical_path())
+    
+    @action(detail=False, methods=['post'])
+    def recalculate_timeline(self, request):
+        """Recalculate timeline for a project, or preview the changes with dry_run."""
+        from .services import DependencyManager
         
-        # Start from tasks without predecessors
-        root_tasks = Task.objects.filter(
-            project=project
-        ).exclude(
-            id__in=TaskDependency.objects.values_list('successor_id', flat=True)
-        )
+        project_id = request.data.get('project_id')
+        if not project_id:
+            return Response({'error': 'project_id required'}, status=400)
+        
+        try:
+            from projects.models import Project
+            project = Project.objects.get(id=project_id, company=request.user.company)
+        except Project.DoesNotExist:
+            return Response({'error': 'Project not found'}, status=404)
         
-        for task in root_tasks:
-            manager.recalculate_from_task(task)
+        dry_run = str(request.data.get('dry_run', 'false')).lower() == 'true'
+        changes = DependencyManager(project).recalculate_project(dry_run=dry_run)
         
-        return Response({'status': 'Timeline recalculated'})
+        return Response({
+            'status': 'Timeline preview' if dry_run else 'Timeline recalculated',
+            'dry_run': dry_run,
+            'changed_count': len(changes),
+            'changes': changes,
+        })
 
 
 class DependencyBottleneckViewSet(viewsets.ReadOnlyModelViewSet):
@@ -361,6 +458,9 @@ class ScheduleSuggestionViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = ScheduleSuggestionSerializer
     
+    # Longest horizon searched by team_availability
+    MAX_AVAILABILITY_DAYS = 90
+    
     def get_queryset(self):
         return ScheduleSuggestion.objects.filter(
             user=self.request.user,
@@ -389,6 +489,33 @@ class ScheduleSuggestionViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(ScheduleSuggestionSerializer(suggestion).data)
         return Response({'error': 'No available slots found'}, status=404)
     
+    @action(detail=False, methods=['post'])
+    def team_availability(self, request):
+        """Find free windows common to a set of users: {"user_ids", "duration_minutes", "days"}."""
+        from users.models import User
+        from .ai_services import CalendarSchedulingService
+        
+        user_ids = request.data.get('user_ids') or []
+        if not isinstance(user_ids, list):
+            return Response({'error': 'user_ids must be a list'}, status=400)
+        try:
+            user_ids = {int(user_id) for user_id in user_ids}
+            duration_minutes = int(request.data.get('duration_minutes', 60))
+            days = min(int(request.data.get('days', 30)), self.MAX_AVAILABILITY_DAYS)
+        except (TypeError, ValueError):
+            return Response({'error': 'user_ids, duration_minutes and days must be integers'}, status=400)
+        if not user_ids or duration_minutes <= 0 or days <= 0:
+            return Response({'error': 'user_ids, a positive duration_minutes and days are required'}, status=400)
+        
+        users = list(User.objects.filter(id__in=user_ids, company=request.user.company, is_active=True))
+        if len(users) != len(user_ids):
+            return Response({'error': 'Unknown users in user_ids'}, status=404)
+        
+        windows = CalendarSchedulingService.find_team_availability(
+            users, duration_minutes=duration_minutes, days=days
+        )
+        return Response({'user_ids': [user.id for user in users], 'windows': windows})
+    
     @action(detail=True, methods=['post'])
     def accept(self, request, pk=None):
         """Accept a schedule suggestion."""
@@ -1114,6 +1241,59 @@ class ResourceAllocationSuggestionViewSet(viewsets.ReadOnlyModelViewSet):
         
         return Response(ResourceAllocationSuggestionSerializer(suggestions, many=True).data)
     
+    @action(detail=False, methods=['post'])
+    def plan_assignments(self, request):
+        """Propose assignees for unassigned open tasks of the company or a project."""
+        from .ai_services import ResourceAllocationService
+        from projects.models import Project
+        
+        if not request.user.is_manager and not request.user.is_admin:
+            return Response({'error': 'Managers only'}, status=403)
+        
+        project = None
+        project_id = request.data.get('project_id')
+        if project_id:
+            try:
+                project = Project.objects.get(id=project_id, company=request.user.company)
+            except (Project.DoesNotExist, ValueError, TypeError):
+                return Response({'error': 'Project not found'}, status=404)
+        
+        try:
+            horizon_days = min(max(1, int(request.data.get('horizon_days', 14))),
+                               ResourceAllocationService.MAX_PLANNING_DAYS)
+        except (TypeError, ValueError):
+            return Response({'error': 'horizon_days must be an integer'}, status=400)
+        
+        service = ResourceAllocationService(request.user.company)
+        return Response(service.plan_assignments(project=project, horizon_days=horizon_days))
+    
+    @action(detail=False, methods=['post'])
+    def apply_assignments(self, request):
+        """Apply a plan from plan_assignments: {"assignments": [{"task_id", "user_id"}, ...]}."""
+        from .ai_services import ResourceAllocationService
+        
+        if not request.user.is_manager and not request.user.is_admin:
+            return Response({'error': 'Managers only'}, status=403)
+        
+        assignments = request.data.get('assignments')
+        if not isinstance(assignments, list) or not all(
+            isinstance(a, dict) and 'task_id' in a and 'user_id' in a for a in assignments
+        ):
+            return Response({'error': 'assignments must be a list of {task_id, user_id}'}, status=400)
+        
+        service = ResourceAllocationService(request.user.company)
+        try:
+            assigned = service.apply_assignments(assignments, user=request.user)
+        except (TypeError, ValueError):
+            return Response({'error': 'task_id and user_id must be integers'}, status=400)
+        requested = {str(a['task_id']) for a in assignments}
+        
+        return Response({
+            'assigned': len(assigned),
+            'task_ids': assigned,
+            'skipped': sorted(requested - {str(task_id) for task_id in assigned}),
+        })
+    
     @action(detail=False, methods=['post'])
     def recommend_assignee(self, request):
         """Get assignee recommendations for a task."""
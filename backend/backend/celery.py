@@ -53,6 +53,11 @@ app.conf.beat_schedule = {
         'task': 'automation.tasks.detect_bottlenecks',
         'schedule': crontab(hour=8, minute=0),
     },
+    # Generate last week's summaries for everyone early on Monday
+    'generate-weekly-summaries': {
+        'task': 'ai_insights.tasks.generate_weekly_summaries',
+        'schedule': crontab(hour=5, minute=30, day_of_week=1),
+    },
     # Analyze burnout risk weekly on Monday
     'analyze-burnout': {
         'task': 'automation.tasks.analyze_team_burnout',
@@ -83,6 +88,21 @@ app.conf.beat_schedule = {
         'task': 'automation.tasks.run_scheduled_workflows',
         'schedule': crontab(minute='*'),
     },
+    # Roll up and prune old workflow execution logs daily
+    'compact-workflow-executions': {
+        'task': 'automation.tasks.compact_workflow_executions',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    # Retrain completion-time models nightly, before predictions are refreshed
+    'train-completion-models': {
+        'task': 'ai_insights.tasks.train_completion_models',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    # Refresh completion predictions for open tasks daily
+    'predict-open-tasks': {
+        'task': 'ai_insights.tasks.predict_open_tasks',
+        'schedule': crontab(hour=5, minute=0),
+    },
     # Sync calendar events every 15 minutes
     'sync-calendar-events': {
         'task': 'automation.tasks.sync_calendar_events',
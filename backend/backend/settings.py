@@ -207,6 +207,35 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Workflow executions get their own queue so slow outbound actions
+# (Slack, Teams, webhooks) never hold up web requests or other jobs.
+WORKFLOW_QUEUE = config('WORKFLOW_QUEUE', default='workflows')
+CELERY_TASK_ROUTES = {
+    'automation.tasks.dispatch_workflow_trigger': {'queue': WORKFLOW_QUEUE},
+    'automation.tasks.execute_workflow': {'queue': WORKFLOW_QUEUE},
+    'automation.tasks.execute_workflow_batch': {'queue': WORKFLOW_QUEUE},
+}
+
+# Workflow execution log: days of raw rows kept before rollup into daily
+# stats, and whether trigger_data keeps only object ids
+WORKFLOW_EXECUTION_RETENTION_DAYS = config('WORKFLOW_EXECUTION_RETENTION_DAYS', default=30, cast=int)
+WORKFLOW_EXECUTION_COMPACT = config('WORKFLOW_EXECUTION_COMPACT', default=False, cast=bool)
+
+# Missed scheduled-workflow runs replayed after downtime (older ones are coalesced)
+SCHEDULED_WORKFLOW_MAX_CATCH_UP = config('SCHEDULED_WORKFLOW_MAX_CATCH_UP', default=3, cast=int)
+
+# Per-company completion-time models: artifact directory, versions kept per
+# company, models held in memory per worker, and completed tasks needed to train
+COMPLETION_MODEL_DIR = config('COMPLETION_MODEL_DIR', default=str(BASE_DIR / 'ml_models'))
+COMPLETION_MODEL_KEEP_VERSIONS = config('COMPLETION_MODEL_KEEP_VERSIONS', default=3, cast=int)
+COMPLETION_MODEL_CACHE_SIZE = config('COMPLETION_MODEL_CACHE_SIZE', default=32, cast=int)
+COMPLETION_MODEL_MIN_SAMPLES = config('COMPLETION_MODEL_MIN_SAMPLES', default=30, cast=int)
+
+# Outbound HTTP (Slack, Teams, webhooks) sent by workflow actions
+OUTBOUND_HTTP_TIMEOUT = config('OUTBOUND_HTTP_TIMEOUT', default=5.0, cast=float)
+OUTBOUND_HTTP_POOL_SIZE = config('OUTBOUND_HTTP_POOL_SIZE', default=10, cast=int)
+OUTBOUND_HTTP_MAX_CONCURRENCY = config('OUTBOUND_HTTP_MAX_CONCURRENCY', default=4, cast=int)
+
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -35,6 +35,22 @@ def trigger_webhooks(event_type, payload, company):
             send_webhook.delay(str(delivery.id))
 
 
+def trigger_webhooks_many(event_type, payloads, company):
+    """trigger_webhooks for a batch of payloads of one event type, with one endpoint query."""
+    webhooks = [
+        webhook for webhook in WebhookEndpoint.objects.filter(company=company, is_active=True)
+        if event_type in (webhook.events or []) or 'all' in (webhook.events or [])
+    ]
+    deliveries = WebhookDelivery.objects.bulk_create([
+        WebhookDelivery(webhook=webhook, event_type=event_type, payload=payload, status='pending')
+        for webhook in webhooks
+        for payload in payloads
+    ])
+    for delivery in deliveries:
+        send_webhook.delay(str(delivery.id))
+    return deliveries
+
+
 def send_webhook_sync(delivery_id):
     """Send webhook synchronously (for development)."""
     try:
@@ -119,7 +135,12 @@ def task_webhook_trigger(sender, instance, created, **kwargs):
     if not created and instance.status == 'completed':
         event_type = 'task.completed'
     
-    payload = {
+    trigger_webhooks(event_type, task_payload(instance, event_type), instance.project.company)
+
+
+def task_payload(instance, event_type):
+    """Webhook payload for a task event."""
+    return {
         'event': event_type,
         'timestamp': timezone.now().isoformat(),
         'data': {
@@ -133,8 +154,6 @@ def task_webhook_trigger(sender, instance, created, **kwargs):
             'deadline': instance.deadline.isoformat() if instance.deadline else None,
         }
     }
-    
-    trigger_webhooks(event_type, payload, instance.project.company)
 
 
 @receiver(post_delete, sender=Task)
@@ -7,6 +7,7 @@ from django.utils import timezone
 
 from tasks.models import Task
 from progress.models import ProgressUpdate
+from automation.templating import RenderContext
 
 from .models import NotificationRule, NotificationDelivery
 
@@ -63,6 +64,11 @@ def send_notification(rule, context):
     """
     recipients = get_recipients(rule, context)
     
+    # Render once; every recipient and channel gets the same text
+    render_context = RenderContext(context)
+    title = render_context.render(rule.name)
+    message = render_context.render(rule.message_template or rule.name)
+    
     for recipient in recipients:
         for channel in rule.channels:
             # Create delivery record
@@ -70,8 +76,8 @@ def send_notification(rule, context):
                 rule=rule,
                 recipient=recipient,
                 channel=channel,
-                title=format_message(rule.name, context),
-                message=format_message(rule.message_template or rule.name, context),
+                title=title,
+                message=message,
                 related_object_type=context.get('object_type', ''),
                 related_object_id=str(context.get('object_id', '')),
                 action_url=context.get('action_url', ''),
@@ -131,20 +137,6 @@ def get_recipients(rule, context):
     return list(set(recipients))
 
 
-def format_message(template, context):
-    """Format message template with context values."""
-    message = template
-    
-    for key, value in context.items():
-        if hasattr(value, 'title'):
-            message = message.replace(f'{{{{{key}.title}}}}', value.title)
-        if hasattr(value, 'name'):
-            message = message.replace(f'{{{{{key}.name}}}}', value.name)
-        message = message.replace(f'{{{{{key}}}}}', str(value))
-    
-    return message
-
-
 def send_in_app(delivery):
     """Create in-app notification."""
     from users.models import Notification
@@ -0,0 +1,42 @@
+"""
+Score progress updates that have no stored sentiment yet.
+
+Usage:
+    python manage.py backfill_sentiment
+    python manage.py backfill_sentiment --rescore --batch-size 5000
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from progress.models import ProgressUpdate
+from progress.sentiment import score_update
+
+
+class Command(BaseCommand):
+    help = 'Store sentiment scores on progress updates that have not been scored.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--rescore', action='store_true', help='Rescore every update, e.g. after a lexicon change')
+
+    def handle(self, *args, **options):
+        updates = ProgressUpdate.objects.only('id', 'work_done', 'blockers').order_by('id')
+        if not options['rescore']:
+            updates = updates.filter(sentiment_scored_at__isnull=True)
+
+        scored = 0
+        last_id = 0
+        while True:
+            batch = list(updates.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            now = timezone.now()
+            for update in batch:
+                update.sentiment_score = score_update(update)
+                update.sentiment_scored_at = now
+            ProgressUpdate.objects.bulk_update(batch, ['sentiment_score', 'sentiment_scored_at'])
+            scored += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f'Scored {scored} updates')
+
+        self.stdout.write(self.style.SUCCESS(f'Done: {scored} progress updates scored'))
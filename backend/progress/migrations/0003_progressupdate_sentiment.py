@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("progress", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="progressupdate",
+            name="sentiment_score",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="progressupdate",
+            name="sentiment_scored_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 
 
@@ -43,6 +43,10 @@ class ProgressUpdate(models.Model):
     # Links and references
     links = models.TextField(blank=True, help_text="Links to PRs, docs, etc. (one per line)")
     
+    # Sentiment, scored asynchronously after each save (-1 to 1, null if no signal)
+    sentiment_score = models.FloatField(null=True, blank=True)
+    sentiment_scored_at = models.DateTimeField(null=True, blank=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -55,10 +59,29 @@ class ProgressUpdate(models.Model):
     def __str__(self):
         return f"{self.task.title} - {self.progress_percentage}% by {self.user.name}"
     
+    # Fields the sentiment score is computed from
+    SENTIMENT_FIELDS = ('work_done', 'blockers')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._scored_text = instance._sentiment_text()
+        return instance
+    
+    def _sentiment_text(self):
+        return tuple(self.__dict__.get(field) for field in self.SENTIMENT_FIELDS)
+    
     def save(self, *args, **kwargs):
         """Update task progress when saving."""
+        text_changed = self._state.adding or getattr(self, '_scored_text', None) != self._sentiment_text()
         super().save(*args, **kwargs)
         
+        # Score the text once the update is committed, on creation or when the text changes
+        if text_changed:
+            from .tasks import score_progress_update_sentiment
+            transaction.on_commit(lambda: score_progress_update_sentiment.delay(self.pk))
+            self._scored_text = self._sentiment_text()
+        
         # Update the task's progress percentage
         self.task.progress_percentage = self.progress_percentage
         
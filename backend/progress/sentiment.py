@@ -0,0 +1,46 @@
+"""
+Lexicon sentiment scoring for progress update text.
+
+Updates are scored once, after they are saved, and the score is stored on
+the row so analytics can average it in the database. The lexicon is
+domain-specific ("blocked", "stuck", "ahead") and compiled into a single
+regular expression, so scoring an update is one pass over its text.
+"""
+import re
+
+
+POSITIVE_WORDS = (
+    'completed', 'done', 'finished', 'great', 'good', 'excellent',
+    'progress', 'achieved', 'success', 'ahead', 'smooth'
+)
+NEGATIVE_WORDS = (
+    'blocked', 'stuck', 'issue', 'problem', 'delayed', 'difficult',
+    'challenge', 'failed', 'behind', 'overdue', 'struggle', 'frustrated'
+)
+
+# Whole lexicon words or their plurals: "issues" counts, "issued" and "doneness" do not
+LEXICON_PATTERN = re.compile(
+    r'\b(?:(?P<positive>{})|(?P<negative>{}))s?\b'.format('|'.join(POSITIVE_WORDS), '|'.join(NEGATIVE_WORDS)),
+    re.IGNORECASE,
+)
+
+
+def score_text(text):
+    """
+    Score text from -1 (negative) to 1 (positive) by the distinct lexicon
+    words it contains, or None when it contains none.
+    """
+    positive, negative = set(), set()
+    for match in LEXICON_PATTERN.finditer(text):
+        if match.group('positive'):
+            positive.add(match.group('positive').lower())
+        else:
+            negative.add(match.group('negative').lower())
+    if not positive and not negative:
+        return None
+    return (len(positive) - len(negative)) / (len(positive) + len(negative))
+
+
+def score_update(update):
+    """Sentiment of a progress update's work description and blockers."""
+    return score_text(f'{update.work_done} {update.blockers}')
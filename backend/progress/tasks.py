@@ -131,3 +131,20 @@ def send_progress_update_notification(progress_update_id):
             )
     except ProgressUpdate.DoesNotExist:
         pass
+
+
+@shared_task
+def score_progress_update_sentiment(progress_update_id):
+    """Store the sentiment score of a saved progress update."""
+    from progress.models import ProgressUpdate
+    from progress.sentiment import score_update
+    
+    update = ProgressUpdate.objects.filter(id=progress_update_id).only('work_done', 'blockers').first()
+    if update is None:
+        return
+    
+    # Queryset update, so scoring does not re-run ProgressUpdate.save
+    ProgressUpdate.objects.filter(id=progress_update_id).update(
+        sentiment_score=score_update(update),
+        sentiment_scored_at=timezone.now()
+    )
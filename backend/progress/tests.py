@@ -1,2 +1,52 @@
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from .sentiment import score_text
+
+
+class ScoreTextTests(SimpleTestCase):
+
+    def test_matches_whole_words_and_plurals(self):
+        self.assertEqual(score_text('Fixed two issues'), -1.0)
+        self.assertIsNone(score_text('Invoice issued, checked doneness'))
+        self.assertEqual(score_text('Done, no problems left'), 0.0)
+
+
+class ProgressUpdateSentimentTests(TestCase):
+
+    def setUp(self):
+        from projects.models import Project
+        from tasks.models import Task
+        from users.models import Company, User
+
+        company = Company.objects.create(name='Acme')
+        self.user = User.objects.create_user(email='a@example.com', password='x', name='A', company=company)
+        project = Project.objects.create(title='P', company=company, created_by=self.user)
+        self.task = Task.objects.create(title='T', project=project, created_by=self.user)
+
+        # Workflow triggers from the task save are not under test
+        patcher = mock.patch('automation.tasks.dispatch_workflow_trigger.delay')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_scores_on_create_and_text_change_only(self):
+        from .models import ProgressUpdate
+
+        with mock.patch('progress.tasks.score_progress_update_sentiment.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                update = ProgressUpdate.objects.create(
+                    task=self.task, user=self.user, progress_percentage=10, work_done='Good start'
+                )
+            self.assertEqual(delay.call_count, 1)
+
+            update = ProgressUpdate.objects.get(pk=update.pk)
+            with self.captureOnCommitCallbacks(execute=True):
+                update.hours_worked = 2
+                update.save()
+            self.assertEqual(delay.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                update.blockers = 'Stuck on review'
+                update.save()
+            self.assertEqual(delay.call_count, 2)
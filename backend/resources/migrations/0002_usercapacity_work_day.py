@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:45
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resources", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usercapacity",
+            name="work_day_end",
+            field=models.TimeField(default=datetime.time(18, 0)),
+        ),
+        migrations.AddField(
+            model_name="usercapacity",
+            name="work_day_start",
+            field=models.TimeField(default=datetime.time(9, 0)),
+        ),
+    ]
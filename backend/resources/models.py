@@ -4,6 +4,7 @@ Models for Resource Allocation, Capacity Planning, Budget and Cost Tracking.
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
+from datetime import time
 from decimal import Decimal
 import uuid
 
@@ -128,6 +129,10 @@ class UserCapacity(models.Model):
         help_text="List of dates when user is unavailable"
     )
     
+    # Working day, in the server's time zone, used when scheduling
+    work_day_start = models.TimeField(default=time(9, 0))
+    work_day_end = models.TimeField(default=time(18, 0))
+    
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
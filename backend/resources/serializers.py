@@ -34,7 +34,8 @@ class UserCapacitySerializer(serializers.ModelSerializer):
         model = UserCapacity
         fields = [
             'id', 'user', 'user_name', 'hours_per_week', 'hourly_rate',
-            'billable_rate', 'skills', 'time_off_days', 'allocated_hours',
+            'billable_rate', 'skills', 'time_off_days', 'work_day_start', 'work_day_end',
+            'allocated_hours',
             'available_hours', 'is_over_allocated', 'updated_at'
         ]
         read_only_fields = ['id', 'updated_at']